@@ -8,23 +8,60 @@ Scripts auxiliares para medir rendimiento y memoria.
 Herramientas incluidas:
 - cProfile: Análisis de tiempo por función
 - timeit: Micro-benchmarks de rendimiento
-- Comparación Streaming vs Pandas
+- Comparación Streaming vs Pandas vs NumPy (float y centavos enteros)
+- Matriz de benchmarks (motores × filas × chunksize) con mediana/IQR,
+  salida JSON y comparación contra una línea base
+- Memoria pico por motor (tracemalloc + RSS) en subprocesos aislados
+- Escalado por workers (1..N) y throughput de lectura/parseo/agregación
+- Desglose de tiempo por etapa de cada motor (`MetricasEtapas`)
 
 Uso:
     python profiling.py --cprofile      # Ejecutar cProfile
     python profiling.py --timeit        # Ejecutar timeit
+    python profiling.py --matrix        # Matriz de benchmarks
     python profiling.py --all           # Ejecutar todo
 """
 import argparse
 import cProfile
+import csv
+import json
+import multiprocessing
+import platform
 import pstats
+import statistics
+import sys
+import time
 import timeit
+import tracemalloc
 import os
-from ventas import generar_csv_ventas, analizar_ventas_streaming, analizar_ventas_pandas
-
-
-def verificar_o_generar_datos(archivo="ventas.csv", num_registros=10000):
-    """Verifica si existe el archivo de datos, si no lo genera"""
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource as _resource
+except ImportError:  # Windows
+    _resource = None
+from ventas import (
+    generar_csv_ventas,
+    generar_csv_ventas_bulk,
+    analizar_ventas_streaming,
+    analizar_ventas_pandas,
+    analizar_ventas_numpy,
+    analizar_ventas_parallel,
+    MetricasEtapas,
+    _agregar_filas,
+    _cabecera_y_bloques,
+    _columnas_desde_cabecera,
+    _filas_de_bloques,
+    _ruta_sidecar,
+)
+
+
+def verificar_o_generar_datos(archivo="ventas.csv", num_registros=10000, bulk=False):
+    """Verifica si existe el archivo de datos, si no lo genera
+
+    Con bulk=True lo genera con `generar_csv_ventas_bulk` repartido en
+    todos los núcleos (para archivos de millones de filas).
+    """
     try:
         with open(archivo, 'r') as f:
             # Contar líneas para verificar
@@ -33,7 +70,10 @@ def verificar_o_generar_datos(archivo="ventas.csv", num_registros=10000):
             return lineas
     except FileNotFoundError:
         print(f"Generando archivo '{archivo}' con {num_registros:,} registros...")
-        generar_csv_ventas(archivo, num_registros, seed=42)
+        if bulk:
+            generar_csv_ventas_bulk(archivo, num_registros, seed=42, shards=os.cpu_count() or 1)
+        else:
+            generar_csv_ventas(archivo, num_registros, seed=42)
         print(f"Archivo '{archivo}' generado.")
         return num_registros
 
@@ -111,52 +151,569 @@ def run_timeit(archivo="ventas.csv", num_registros=10000, repeticiones=5, chunks
     print(f"\n📊 Configuración:")
     print(f"   • Registros: {num_registros:,}")
     print(f"   • Repeticiones: {repeticiones}")
-    print(f"   • Chunksize (pandas): {chunksize:,}")
+    print(f"   • Chunksize (pandas/numpy): {chunksize:,}")
     print()
 
     # Setup común (sin generación de datos, ya existen)
     setup = f"""
-from ventas import analizar_ventas_streaming, analizar_ventas_pandas
+from ventas import analizar_ventas_streaming, analizar_ventas_pandas, analizar_ventas_numpy
 """
 
-    # --- STREAMING ---
-    print("🌊 Midiendo Streaming...")
-    stmt_streaming = f"analizar_ventas_streaming('{archivo}')"
-    t_streaming = timeit.timeit(stmt=stmt_streaming, setup=setup, number=repeticiones)
-    promedio_streaming = t_streaming / repeticiones
-
-    print(f"   ✓ Tiempo total: {t_streaming:.4f}s")
-    print(f"   ✓ Promedio: {promedio_streaming:.6f}s por ejecución")
-
-    # --- PANDAS ---
-    print(f"\n📦 Midiendo Pandas (chunksize={chunksize:,})...")
-    stmt_pandas = f"analizar_ventas_pandas('{archivo}', chunksize={chunksize})"
-    t_pandas = timeit.timeit(stmt=stmt_pandas, setup=setup, number=repeticiones)
-    promedio_pandas = t_pandas / repeticiones
-
-    print(f"   ✓ Tiempo total: {t_pandas:.4f}s")
-    print(f"   ✓ Promedio: {promedio_pandas:.6f}s por ejecución")
+    motores = [
+        ("🌊 Streaming", f"analizar_ventas_streaming('{archivo}')"),
+        ("📦 Pandas", f"analizar_ventas_pandas('{archivo}', chunksize={chunksize})"),
+        ("🔢 NumPy", f"analizar_ventas_numpy('{archivo}', chunksize={chunksize})"),
+        # Modo de punto fijo: precios en centavos enteros, sumas exactas
+        ("🌊 Streaming ¢", f"analizar_ventas_streaming('{archivo}', centavos=True)"),
+        ("📦 Pandas ¢", f"analizar_ventas_pandas('{archivo}', chunksize={chunksize}, centavos=True)"),
+        ("🔢 NumPy ¢", f"analizar_ventas_numpy('{archivo}', chunksize={chunksize}, centavos=True)"),
+    ]
+
+    promedios = {}
+    for nombre, stmt in motores:
+        print(f"{nombre}: midiendo...")
+        try:
+            t_total = timeit.timeit(stmt=stmt, setup=setup, number=repeticiones)
+        except RuntimeError as e:
+            # pandas / numpy son opcionales
+            print(f"   ✗ Omitido: {e}")
+            continue
+        promedios[nombre] = t_total / repeticiones
+        print(f"   ✓ Tiempo total: {t_total:.4f}s")
+        print(f"   ✓ Promedio: {promedios[nombre]:.6f}s por ejecución")
+
+    if not promedios:
+        return
 
     # --- COMPARACIÓN ---
     print("\n" + "=" * 70)
     print("COMPARACIÓN DE RENDIMIENTO")
     print("=" * 70)
 
-    diferencia_ms = abs(promedio_streaming - promedio_pandas) * 1000
-
     print(f"\n{'Estrategia':<20} {'Tiempo Promedio':<20} {'Velocidad Relativa'}")
     print("-" * 70)
 
-    if promedio_streaming < promedio_pandas:
-        factor = promedio_pandas / promedio_streaming
-        print(f"{'🌊 Streaming':<20} {promedio_streaming:.6f}s        ✅ Ganador ({factor:.2f}x más rápido)")
-        print(f"{'📦 Pandas':<20} {promedio_pandas:.6f}s        {factor:.2f}x más lento")
+    mejor = min(promedios.values())
+    for nombre, promedio in sorted(promedios.items(), key=lambda kv: kv[1]):
+        factor = promedio / mejor
+        if promedio == mejor:
+            print(f"{nombre:<20} {promedio:.6f}s        ✅ Ganador")
+        else:
+            print(f"{nombre:<20} {promedio:.6f}s        {factor:.2f}x más lento")
+
+    diferencia_ms = (max(promedios.values()) - mejor) * 1000
+    print(f"\n📏 Diferencia absoluta (más lento vs ganador): {diferencia_ms:.2f}ms")
+
+
+# --- Matriz de benchmarks ----------------------------------------------------
+
+# nombre -> (función, usa chunksize). Los motores sin chunksize se miden una
+# sola vez por tamaño de archivo.
+MOTORES_MATRIZ = {
+    "streaming": (analizar_ventas_streaming, False),
+    "parallel": (analizar_ventas_parallel, False),
+    "pandas": (analizar_ventas_pandas, True),
+    "numpy": (analizar_ventas_numpy, True),
+}
+
+TAMANOS_MATRIZ = (10_000, 100_000, 1_000_000, 10_000_000)
+CHUNKSIZES_MATRIZ = (10_000, 50_000, 200_000)
+
+
+# --- Memoria por motor -------------------------------------------------------
+
+_MB = 1024 * 1024
+
+
+def _rss_pico_mb(quien):
+    """Pico de RSS (MB) según getrusage; None si `resource` no existe."""
+    if _resource is None:
+        return None
+    pico = _resource.getrusage(quien).ru_maxrss
+    # Linux reporta KB; macOS, bytes
+    return pico / _MB if sys.platform == "darwin" else pico / 1024
+
+
+def _medir_memoria_hijo(motor, archivo, chunksize):
+    """Corre un motor una vez dentro del subproceso y mide su memoria.
+
+    El RSS pico se toma antes y después de la corrida. Al desempaquetar esta
+    función el hijo ya importó profiling y ventas (con pandas/numpy, que
+    ventas importa a nivel de módulo), así que la base es el intérprete +
+    imports y el delta es solo el análisis. tracemalloc se
+    activa solo durante la corrida. Cubre el heap de Python y NumPy, pero no
+    el parser C de pandas ni el pool de memoria de pyarrow; para esos motores
+    cuenta el RSS.
+    """
+    funcion, usa_chunksize = MOTORES_MATRIZ[motor]
+    kwargs = {"chunksize": chunksize} if usa_chunksize else {}
+    rss_base = _rss_pico_mb(_resource.RUSAGE_SELF if _resource else None)
+    tracemalloc.start()
+    try:
+        funcion(archivo, **kwargs)
+        _, pico_traced = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    rss_pico = _rss_pico_mb(_resource.RUSAGE_SELF if _resource else None)
+    return {
+        "pico_traced_mb": pico_traced / _MB,
+        "rss_base_mb": rss_base,
+        "rss_pico_mb": rss_pico,
+        "rss_delta_mb": None if rss_pico is None else rss_pico - rss_base,
+        # workers de analizar_ventas_parallel: el mayor pico entre los hijos
+        "rss_hijos_mb": _rss_pico_mb(_resource.RUSAGE_CHILDREN) if _resource else None,
+    }
+
+
+def medir_memoria(motor, archivo, chunksize=None, num_registros=None):
+    """Mide memoria pico de un motor en un subproceso nuevo (spawn).
+
+    Cada medición arranca un intérprete limpio: el pico de RSS es monótono
+    dentro de un proceso, así que medir varios motores en el mismo proceso
+    (o en un fork del que ya corrió otros) contaminaría los resultados.
+
+    Args:
+        motor (str): Clave de `MOTORES_MATRIZ`.
+        archivo (str): CSV a analizar.
+        chunksize (int, optional): Para los motores que lo usan.
+        num_registros (int, optional): Filas del archivo, para `mb_por_fila`.
+
+    Returns:
+        dict: pico_traced_mb, rss_base_mb, rss_pico_mb, rss_delta_mb,
+        rss_hijos_mb y, si se da `num_registros`, mb_por_fila (sobre el mayor
+        entre el pico trazado y el delta de RSS). Los campos de RSS son None
+        en plataformas sin `resource`.
+
+    Raises:
+        RuntimeError: Si el motor no está disponible en el entorno.
+    """
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as pool:
+        medida = pool.submit(_medir_memoria_hijo, motor, archivo, chunksize).result()
+    if num_registros:
+        pico = max(medida["pico_traced_mb"], medida["rss_delta_mb"] or 0.0)
+        medida["mb_por_fila"] = pico / num_registros
+    return medida
+
+
+def _archivo_matriz(num_registros, directorio="."):
+    """Devuelve la ruta del CSV de `num_registros` filas, generándolo si falta.
+
+    Usa `generar_csv_ventas_bulk` con semilla fija para que todas las
+    corridas (y la línea base) midan exactamente los mismos datos. Si quedó
+    un sidecar `.vcol` de otra corrida se borra: streaming y parallel lo
+    usarían y la matriz mediría el acierto de caché en lugar del parseo.
+    """
+    ruta = os.path.join(directorio, f"ventas_bench_{num_registros}.csv")
+    if not os.path.exists(ruta):
+        print(f"Generando '{ruta}' con {num_registros:,} registros...")
+        generar_csv_ventas_bulk(ruta, num_registros, seed=42)
+    sidecar = _ruta_sidecar(ruta)
+    if os.path.exists(sidecar):
+        print(f"Eliminando sidecar '{sidecar}' para medir el parseo del CSV")
+        os.remove(sidecar)
+    return ruta
+
+
+def _estadisticas_tiempos(tiempos, num_registros):
+    """Resume una lista de tiempos de pared (segundos).
+
+    Returns:
+        dict: mediana, cuartiles, IQR, mínimo y filas por segundo (sobre la
+        mediana), además de los tiempos crudos.
+    """
+    mediana = statistics.median(tiempos)
+    if len(tiempos) > 1:
+        q1, _, q3 = statistics.quantiles(tiempos, n=4, method="inclusive")
     else:
-        factor = promedio_streaming / promedio_pandas
-        print(f"{'🌊 Streaming':<20} {promedio_streaming:.6f}s        {factor:.2f}x más lento")
-        print(f"{'📦 Pandas':<20} {promedio_pandas:.6f}s        ✅ Ganador ({factor:.2f}x más rápido)")
+        q1 = q3 = mediana
+    return {
+        "mediana_s": mediana,
+        "q1_s": q1,
+        "q3_s": q3,
+        "iqr_s": q3 - q1,
+        "min_s": min(tiempos),
+        "filas_por_s": num_registros / mediana if mediana > 0 else float("inf"),
+        "tiempos_s": tiempos,
+    }
+
+
+def _clave_resultado(resultado):
+    return (resultado["motor"], resultado["filas"], resultado["chunksize"])
+
+
+def run_matriz(motores=tuple(MOTORES_MATRIZ), tamanos=TAMANOS_MATRIZ,
+               chunksizes=CHUNKSIZES_MATRIZ, repeticiones=5, calentamiento=1,
+               directorio=".", salida=None, memoria=False):
+    """Ejecuta la matriz motores × filas × chunksize y devuelve los resultados.
+
+    Cada combinación corre `calentamiento` veces sin medir (caché de páginas,
+    imports perezosos de pandas/numpy, pool de procesos) y luego
+    `repeticiones` veces midiendo tiempo de pared con `time.perf_counter`.
+
+    Args:
+        motores (Iterable[str]): Claves de `MOTORES_MATRIZ` a medir.
+        tamanos (Iterable[int]): Cantidades de filas de los CSV de prueba.
+        chunksizes (Iterable[int]): Chunksizes para los motores que lo usan.
+        repeticiones (int): Corridas medidas por combinación.
+        calentamiento (int): Corridas descartadas previas a la medición.
+        directorio (str): Carpeta donde se generan/reutilizan los CSV.
+        salida (str, optional): Ruta del JSON a escribir con los resultados.
+        memoria (bool): Si True, agrega a cada combinación una medición de
+            memoria pico (`medir_memoria`) en un subproceso aparte; no
+            afecta a los tiempos.
+
+    Returns:
+        dict: {"meta": {...}, "resultados": [...], "omitidos": [...]}; cada
+        resultado indica en "ruta" qué camino se midió ("parseo": el CSV
+        se parsea, nunca se responde desde el sidecar).
+
+    Raises:
+        ValueError: Si un motor no existe o `repeticiones` < 1.
+    """
+    desconocidos = [m for m in motores if m not in MOTORES_MATRIZ]
+    if desconocidos:
+        raise ValueError(f"Motores desconocidos: {', '.join(desconocidos)}")
+    if repeticiones < 1:
+        raise ValueError("repeticiones debe ser >= 1")
 
-    print(f"\n📏 Diferencia absoluta: {diferencia_ms:.2f}ms")
+    print("\n" + "=" * 70)
+    print("MATRIZ DE BENCHMARKS")
+    print("=" * 70)
+
+    resultados, omitidos = [], []
+    for num_registros in tamanos:
+        archivo = _archivo_matriz(num_registros, directorio)
+        for motor in motores:
+            if any(o["motor"] == motor for o in omitidos):
+                continue
+            funcion, usa_chunksize = MOTORES_MATRIZ[motor]
+            for chunksize in (chunksizes if usa_chunksize else (None,)):
+                kwargs = {"chunksize": chunksize} if usa_chunksize else {}
+                etiqueta = f"{motor} n={num_registros:,}" + (f" chunk={chunksize:,}" if usa_chunksize else "")
+                try:
+                    for _ in range(calentamiento):
+                        funcion(archivo, **kwargs)
+                    tiempos = []
+                    for _ in range(repeticiones):
+                        t0 = time.perf_counter()
+                        funcion(archivo, **kwargs)
+                        tiempos.append(time.perf_counter() - t0)
+                except RuntimeError as e:
+                    # pandas / numpy son opcionales
+                    print(f"   ✗ {etiqueta}: omitido ({e})")
+                    omitidos.append({"motor": motor, "motivo": str(e)})
+                    break
+                # Se mide siempre el parseo del CSV (sin sidecar)
+                fila = {"motor": motor, "filas": num_registros, "chunksize": chunksize,
+                        "ruta": "parseo"}
+                fila.update(_estadisticas_tiempos(tiempos, num_registros))
+                if memoria:
+                    fila["memoria"] = medir_memoria(motor, archivo, chunksize, num_registros)
+                resultados.append(fila)
+                print(f"   ✓ {etiqueta}: mediana {fila['mediana_s']:.4f}s "
+                      f"(IQR {fila['iqr_s']:.4f}s) · {fila['filas_por_s']:,.0f} filas/s")
+
+    informe = {
+        "meta": {
+            "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+            "repeticiones": repeticiones,
+            "calentamiento": calentamiento,
+        },
+        "resultados": resultados,
+        "omitidos": omitidos,
+    }
+    _imprimir_matriz(resultados)
+    if salida:
+        with open(salida, "w", encoding="utf-8") as f:
+            json.dump(informe, f, indent=2)
+        print(f"\n💾 Resultados guardados en '{salida}'")
+    return informe
+
+
+def _imprimir_matriz(resultados):
+    if not resultados:
+        return
+    con_memoria = "memoria" in resultados[0]
+    cabecera = f"\n{'Motor':<11} {'Filas':>11} {'Chunk':>9} {'Mediana':>10} {'IQR':>9} {'Filas/s':>14}"
+    if con_memoria:
+        cabecera += f" {'Traced MB':>10} {'ΔRSS MB':>9} {'MB/fila':>9}"
+    print(cabecera)
+    print("-" * (len(cabecera) - 1))
+    for r in resultados:
+        chunk = f"{r['chunksize']:,}" if r["chunksize"] else "-"
+        linea = (f"{r['motor']:<11} {r['filas']:>11,} {chunk:>9} {r['mediana_s']:>9.4f}s "
+                 f"{r['iqr_s']:>8.4f}s {r['filas_por_s']:>14,.0f}")
+        if con_memoria:
+            m = r["memoria"]
+            delta = f"{m['rss_delta_mb']:.1f}" if m["rss_delta_mb"] is not None else "-"
+            linea += f" {m['pico_traced_mb']:>10.1f} {delta:>9} {m['mb_por_fila']:>9.1e}"
+        print(linea)
+
+
+def comparar_con_base(actual, base, umbral=0.10):
+    """Compara dos informes de `run_matriz` y devuelve las regresiones.
+
+    Una combinación (motor, filas, chunksize) presente en ambos informes es
+    regresión si su mediana actual supera a la de la base en más de
+    `umbral` (fracción) *y* en más del IQR de la base, para no marcar ruido
+    de medición como regresión.
+
+    Args:
+        actual (dict): Informe recién medido.
+        base (dict): Informe de referencia (p. ej. cargado de baseline.json).
+        umbral (float): Tolerancia relativa. Default: 0.10 (10%)
+
+    Returns:
+        List[dict]: Una entrada por regresión con medianas y `ratio`.
+    """
+    referencia = {_clave_resultado(r): r for r in base.get("resultados", [])}
+    regresiones = []
+    for r in actual.get("resultados", []):
+        b = referencia.get(_clave_resultado(r))
+        if b is None or b["mediana_s"] <= 0:
+            continue
+        ratio = r["mediana_s"] / b["mediana_s"]
+        if ratio > 1 + umbral and r["mediana_s"] - b["mediana_s"] > b.get("iqr_s", 0.0):
+            regresiones.append({
+                "motor": r["motor"], "filas": r["filas"], "chunksize": r["chunksize"],
+                "base_s": b["mediana_s"], "actual_s": r["mediana_s"], "ratio": ratio,
+            })
+    return regresiones
+
+
+def _lista_enteros(texto):
+    """Parsea '10000,100000' (admite sufijos k/M: '10k,1M') a lista de int."""
+    valores = []
+    for parte in texto.split(","):
+        parte = parte.strip().lower()
+        factor = 1
+        if parte.endswith("k"):
+            factor, parte = 1_000, parte[:-1]
+        elif parte.endswith("m"):
+            factor, parte = 1_000_000, parte[:-1]
+        valores.append(int(parte) * factor)
+    return valores
+
+
+# --- Escalado por workers ----------------------------------------------------
+
+_TAM_LECTURA_CRUDA = 8 << 20
+
+
+def _mediana_tiempo(funcion, repeticiones):
+    """Mediana de `repeticiones` corridas de `funcion()` y su último resultado."""
+    tiempos, resultado = [], None
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - t0)
+    return statistics.median(tiempos), resultado
+
+
+def _leer_crudo(archivo):
+    """Lee el archivo completo en bloques fijos sin interpretarlo; devuelve los bytes."""
+    buffer = bytearray(_TAM_LECTURA_CRUDA)
+    total = 0
+    with open(archivo, "rb", buffering=0) as f:
+        while True:
+            leidos = f.readinto(buffer)
+            if not leidos:
+                return total
+            total += leidos
+
+
+def _parsear_sin_agregar(archivo):
+    """Recorre todas las filas tipadas (lectura + parseo) sin acumularlas."""
+    n = 0
+    with _cabecera_y_bloques(archivo) as (cabecera, bloques):
+        if not cabecera:
+            return 0
+        for _ in _filas_de_bloques(bloques, _columnas_desde_cabecera(cabecera)):
+            n += 1
+    return n
+
+
+def _filas_en_memoria(archivo, limite):
+    """Primeras `limite` filas ya parseadas, para medir solo la agregación."""
+    filas = []
+    with _cabecera_y_bloques(archivo) as (cabecera, bloques):
+        if not cabecera:
+            return filas
+        for fila in _filas_de_bloques(bloques, _columnas_desde_cabecera(cabecera)):
+            filas.append(fila)
+            if len(filas) >= limite:
+                break
+    return filas
+
+
+def run_scaling(archivo="ventas.csv", num_registros=1_000_000, max_workers=None,
+                repeticiones=3, muestra_agregado=1_000_000, salida_json=None, salida_csv=None):
+    """Mide dónde deja de escalar el análisis: disco, parseo o agregación.
+
+    Sobre el mismo archivo mide por separado:
+
+    - lectura cruda (MB/s): `readinto` en bloques de 8 MB, sin parsear;
+    - parseo (filas/s): lectura + `_filas_de_bloques` sin acumular;
+    - agregación (filas/s): `_agregar_filas` sobre hasta `muestra_agregado`
+      filas ya parseadas en memoria;
+
+    y luego `analizar_ventas_parallel` con 1..`max_workers` workers, con
+    speedup (t1 / tN) y eficiencia paralela (speedup / N).
+
+    Args:
+        archivo (str): CSV a medir; si no existe se genera con el
+            generador bulk en paralelo.
+        num_registros (int): Filas a generar si el archivo no existe.
+        max_workers (int, optional): Máximo de workers. Default: os.cpu_count()
+        repeticiones (int): Corridas por medición (se reporta la mediana).
+        muestra_agregado (int): Filas usadas para medir la agregación aislada.
+        salida_json (str, optional): Ruta del JSON con etapas y curva.
+        salida_csv (str, optional): Ruta del CSV con la curva (una fila por N).
+
+    Returns:
+        dict: {"meta", "etapas", "curva"}
+
+    Note:
+        La lectura cruda sale de la caché de páginas si el archivo se leyó
+        hace poco; para medir el disco en frío hay que vaciarla antes (p. ej.
+        `echo 3 > /proc/sys/vm/drop_caches` en Linux).
+    """
+    filas = verificar_o_generar_datos(archivo, num_registros, bulk=True)
+    max_workers = max_workers or os.cpu_count() or 1
+    tam_mb = os.path.getsize(archivo) / _MB
+
+    print("\n" + "=" * 70)
+    print(f"ESCALADO POR WORKERS (1..{max_workers})")
+    print("=" * 70)
+
+    t_lectura, _ = _mediana_tiempo(lambda: _leer_crudo(archivo), repeticiones)
+    t_parseo, filas = _mediana_tiempo(lambda: _parsear_sin_agregar(archivo), repeticiones)
+    muestra = _filas_en_memoria(archivo, muestra_agregado)
+    t_agregado, _ = _mediana_tiempo(lambda filas_muestra=muestra: _agregar_filas(filas_muestra), repeticiones)
+    del muestra
+
+    etapas = {
+        "tam_mb": tam_mb,
+        "filas": filas,
+        "lectura_mb_por_s": tam_mb / t_lectura,
+        # techo de filas/s si todo el tiempo fuera leer el archivo
+        "lectura_filas_por_s": filas / t_lectura,
+        "parseo_filas_por_s": filas / t_parseo,
+        "agregado_filas_por_s": min(filas, muestra_agregado) / t_agregado,
+    }
+    etapas["etapa_limitante"] = min(("lectura", "parseo", "agregado"),
+                                    key=lambda e: etapas[f"{e}_filas_por_s"])
+    print(f"📥 Lectura cruda: {etapas['lectura_mb_por_s']:,.0f} MB/s "
+          f"({etapas['lectura_filas_por_s']:,.0f} filas/s equivalentes)")
+    print(f"🔤 Parseo:        {etapas['parseo_filas_por_s']:,.0f} filas/s")
+    print(f"➕ Agregación:    {etapas['agregado_filas_por_s']:,.0f} filas/s")
+    print(f"🔎 Etapa limitante (por worker): {etapas['etapa_limitante']}")
+
+    curva = []
+    for workers in range(1, max_workers + 1):
+        t, _ = _mediana_tiempo(lambda: analizar_ventas_parallel(archivo, workers=workers), repeticiones)
+        curva.append({"workers": workers, "mediana_s": t, "filas_por_s": filas / t,
+                      "mb_por_s": tam_mb / t})
+    for punto in curva:
+        punto["speedup"] = curva[0]["mediana_s"] / punto["mediana_s"]
+        punto["eficiencia"] = punto["speedup"] / punto["workers"]
+
+    print(f"\n{'Workers':>8} {'Mediana':>10} {'Filas/s':>14} {'MB/s':>8} {'Speedup':>8} {'Eficiencia':>11}")
+    print("-" * 64)
+    for p in curva:
+        print(f"{p['workers']:>8} {p['mediana_s']:>9.4f}s {p['filas_por_s']:>14,.0f} "
+              f"{p['mb_por_s']:>8.1f} {p['speedup']:>7.2f}x {p['eficiencia']:>10.0%}")
+
+    informe = {
+        "meta": {
+            "archivo": archivo,
+            "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "repeticiones": repeticiones,
+        },
+        "etapas": etapas,
+        "curva": curva,
+    }
+    if salida_json:
+        with open(salida_json, "w", encoding="utf-8") as f:
+            json.dump(informe, f, indent=2)
+        print(f"\n💾 Resultados guardados en '{salida_json}'")
+    if salida_csv:
+        with open(salida_csv, "w", newline="", encoding="utf-8") as f:
+            escritor = csv.DictWriter(f, fieldnames=list(curva[0]))
+            escritor.writeheader()
+            escritor.writerows(curva)
+        print(f"💾 Curva guardada en '{salida_csv}'")
+    return informe
+
+
+# --- Desglose por etapa ------------------------------------------------------
+
+# Motores que aceptan `metricas=`
+MOTORES_ETAPAS = ("streaming", "pandas", "numpy")
+
+
+def run_etapas(archivo="ventas.csv", num_registros=10000, motores=MOTORES_ETAPAS,
+               chunksize=50000, repeticiones=3, salida=None):
+    """Desglosa el tiempo de cada motor en lectura, parseo, agregado y combinación.
+
+    Cada repetición usa un `MetricasEtapas` nuevo; se reporta la repetición
+    con menor tiempo total (la menos afectada por ruido externo).
+
+    Args:
+        archivo (str): CSV a medir; se genera si no existe.
+        num_registros (int): Filas a generar si el archivo no existe.
+        motores (Iterable[str]): Subconjunto de `MOTORES_ETAPAS`.
+        chunksize (int): Chunksize de pandas/numpy.
+        repeticiones (int): Corridas por motor.
+        salida (str, optional): Ruta del JSON con el desglose por motor.
+
+    Returns:
+        dict: motor -> `MetricasEtapas.a_dict()` de la mejor repetición.
+    """
+    desconocidos = [m for m in motores if m not in MOTORES_ETAPAS]
+    if desconocidos:
+        raise ValueError(f"Motores sin métricas por etapa: {', '.join(desconocidos)}")
+    verificar_o_generar_datos(archivo, num_registros)
+
+    print("\n" + "=" * 70)
+    print("DESGLOSE POR ETAPA")
+    print("=" * 70)
+
+    desglose = {}
+    for motor in motores:
+        funcion, usa_chunksize = MOTORES_MATRIZ[motor]
+        kwargs = {"chunksize": chunksize} if usa_chunksize else {}
+        mejor = None
+        try:
+            for _ in range(repeticiones):
+                metricas = MetricasEtapas()
+                funcion(archivo, metricas=metricas, **kwargs)
+                if mejor is None or metricas.total_segundos < mejor.total_segundos:
+                    mejor = metricas
+        except RuntimeError as e:
+            # pandas / numpy son opcionales
+            print(f"\n{motor}: ✗ omitido ({e})")
+            continue
+        desglose[motor] = mejor.a_dict()
+
+        print(f"\n{motor} ({mejor.total_segundos:.4f}s)")
+        print(f"  {'Etapa':<15} {'Segundos':>9} {'%':>6} {'Filas/s':>13} {'MB/s':>8}")
+        for etapa, d in desglose[motor].items():
+            filas_s = f"{d['filas_por_s']:,.0f}" if d["filas_por_s"] else "-"
+            mb_s = f"{d['mb_por_s']:.1f}" if d["mb_por_s"] else "-"
+            print(f"  {etapa:<15} {d['segundos']:>9.4f} {d['porcentaje']:>5.1f}% {filas_s:>13} {mb_s:>8}")
+
+    if salida:
+        with open(salida, "w", encoding="utf-8") as f:
+            json.dump(desglose, f, indent=2)
+        print(f"\n💾 Desglose guardado en '{salida}'")
+    return desglose
 
 
 def run_all(archivo="ventas.csv", num_registros=10000, repeticiones=5, chunksize_timeit=50000, chunksize_cprofile=5000):
@@ -191,6 +748,11 @@ Ejemplos de uso:
   python profiling.py --timeit --n 50000 --reps 10  # timeit con 50K registros
   python profiling.py --all                         # Ejecutar todo
   python profiling.py --all --n 100000              # Todo con 100K registros
+  python profiling.py --matrix --sizes 10k,1M --json base.json
+  python profiling.py --matrix --sizes 10k,1M --compare base.json --threshold 0.15
+  python profiling.py --memory --sizes 100k,1M,10M  # matriz + memoria pico
+  python profiling.py --stages --archivo big.csv --json etapas.json
+  python profiling.py --scaling --archivo big.csv --n 10000000 --max-workers 8 --json esc.json --csv esc.csv
 
 Herramientas adicionales (ejecutar por separado):
   python -m memory_profiler ventas.py analizar ventas.csv
@@ -206,6 +768,12 @@ Herramientas adicionales (ejecutar por separado):
                         help="Ejecutar timeit (micro-benchmark)")
     parser.add_argument("--all", action="store_true",
                         help="Ejecutar todas las herramientas")
+    parser.add_argument("--scaling", action="store_true",
+                        help="Escalado 1..N workers y throughput de lectura/parseo/agregación")
+    parser.add_argument("--stages", action="store_true",
+                        help="Desglosar el tiempo de cada motor por etapa (lectura/parseo/agregado/combinación)")
+    parser.add_argument("--matrix", action="store_true",
+                        help="Ejecutar la matriz de benchmarks (motores × filas × chunksize)")
 
     # Parámetros de configuración
     parser.add_argument("--archivo", type=str, default="ventas.csv",
@@ -215,17 +783,90 @@ Herramientas adicionales (ejecutar por separado):
     parser.add_argument("--reps", type=int, default=5,
                         help="Número de repeticiones para timeit (default: 5)")
     parser.add_argument("--chunksize-timeit", type=int, default=50000,
-                        help="Chunk size para pandas en timeit (default: 50000)")
+                        help="Chunk size para pandas/numpy en timeit (default: 50000)")
     parser.add_argument("--chunksize-cprofile", type=int, default=5000,
                         help="Chunk size para pandas en cProfile (default: 5000)")
 
+    # Parámetros de la matriz
+    parser.add_argument("--engines", type=str, default=",".join(MOTORES_MATRIZ),
+                        help="Motores de la matriz separados por coma (default: todos)")
+    parser.add_argument("--sizes", type=_lista_enteros, default=list(TAMANOS_MATRIZ),
+                        help="Filas por archivo, p. ej. 10k,100k,1M (default: 10k..10M)")
+    parser.add_argument("--chunksizes", type=_lista_enteros, default=list(CHUNKSIZES_MATRIZ),
+                        help="Chunksizes para pandas/numpy (default: 10k,50k,200k)")
+    parser.add_argument("--warmup", type=int, default=1,
+                        help="Corridas de calentamiento no medidas (default: 1)")
+    parser.add_argument("--memory", action="store_true",
+                        help="Agregar a la matriz la memoria pico por motor (subproceso aislado)")
+    parser.add_argument("--json", type=str, default=None,
+                        help="Guardar los resultados de la matriz en este JSON")
+    parser.add_argument("--max-workers", type=int, default=None,
+                        help="Máximo de workers para --scaling (default: núcleos)")
+    parser.add_argument("--csv", type=str, default=None,
+                        help="Guardar la curva de --scaling en este CSV")
+    parser.add_argument("--compare", type=str, default=None,
+                        help="JSON de línea base; sale con código 1 si hay regresiones")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Regresión relativa tolerada con --compare (default: 0.10)")
+
     args = parser.parse_args()
 
     # Si no se especifica nada, mostrar ayuda
-    if not (args.cprofile or args.timeit or args.all):
+    args.matrix = args.matrix or args.memory
+    if not (args.cprofile or args.timeit or args.all or args.matrix or args.scaling or args.stages):
         parser.print_help()
         return
 
+    if args.stages:
+        run_etapas(
+            archivo=args.archivo,
+            num_registros=args.n,
+            motores=[m.strip() for m in args.engines.split(",") if m.strip() in MOTORES_ETAPAS],
+            chunksize=args.chunksize_timeit,
+            repeticiones=args.reps,
+            salida=None if (args.matrix or args.scaling) else args.json,
+        )
+        if not (args.cprofile or args.timeit or args.all or args.matrix or args.scaling):
+            return
+
+    if args.scaling:
+        run_scaling(
+            archivo=args.archivo,
+            num_registros=args.n,
+            max_workers=args.max_workers,
+            repeticiones=args.reps,
+            salida_json=None if args.matrix else args.json,
+            salida_csv=args.csv,
+        )
+        if not (args.cprofile or args.timeit or args.all or args.matrix):
+            return
+
+    if args.matrix:
+        informe = run_matriz(
+            motores=[m.strip() for m in args.engines.split(",") if m.strip()],
+            tamanos=args.sizes,
+            chunksizes=args.chunksizes,
+            repeticiones=args.reps,
+            calentamiento=args.warmup,
+            salida=args.json,
+            memoria=args.memory,
+        )
+        if args.compare:
+            with open(args.compare, encoding="utf-8") as f:
+                base = json.load(f)
+            regresiones = comparar_con_base(informe, base, args.threshold)
+            if regresiones:
+                print(f"\n❌ {len(regresiones)} regresión(es) sobre '{args.compare}' "
+                      f"(umbral {args.threshold:.0%}):")
+                for r in regresiones:
+                    chunk = f" chunk={r['chunksize']:,}" if r["chunksize"] else ""
+                    print(f"   • {r['motor']} n={r['filas']:,}{chunk}: "
+                          f"{r['base_s']:.4f}s → {r['actual_s']:.4f}s ({r['ratio']:.2f}x)")
+                sys.exit(1)
+            print(f"\n✅ Sin regresiones sobre '{args.compare}' (umbral {args.threshold:.0%})")
+        if not (args.cprofile or args.timeit or args.all):
+            return
+
     # Ejecutar herramientas solicitadas
     if args.all:
         run_all(
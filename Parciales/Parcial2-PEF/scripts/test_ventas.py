@@ -1,20 +1,52 @@
 # tests/test_ventas.py
 import os
+import bz2
 import csv
-import math
+import gzip
+import lzma
 import pytest
 
 from ventas import (
     generar_csv_ventas,
+    generar_csv_ventas_bulk,
     analizar_ventas_streaming,
     analizar_ventas_pandas,
+    analizar_ventas_numpy,
+    analizar_ventas_parallel,
+    analizar_ventas_incremental,
+    analizar_por_producto,
+    analizar_ventas_particiones,
     VentasMetrics,
+    FiltroVentas,
+    parsear_rango_ids,
+    VentasParcial,
+    _centavos,
+    indexar_ventas,
+    analizar_ventas_almacen,
+    EstimadoresVentas,
+    SketchCuantiles,
+    ContadorDistintos,
     _iter_csv_filas,
+    _iter_csv_filas_dict,
+    _rangos_de_bytes,
+    construir_sidecar,
+    _chunksize_por_presupuesto,
+    _bloques_gzip_paralelo,
 )
+import ventas
 
 HERE = os.path.dirname(__file__)
 ROOT = os.path.abspath(os.path.join(HERE, ".."))
 
+# Motores con dependencias opcionales: se saltean con motivo si falta la
+# dependencia; si está instalada, un RuntimeError del motor es un fallo.
+requiere_numpy = pytest.mark.skipif(ventas._np is None, reason="numpy no está instalado")
+requiere_pandas = pytest.mark.skipif(ventas._pd is None, reason="pandas no está instalado")
+MOTORES_OPCIONALES = [
+    pytest.param(analizar_ventas_numpy, id="numpy", marks=requiere_numpy),
+    pytest.param(analizar_ventas_pandas, id="pandas", marks=requiere_pandas),
+]
+
 
 def test_generar_csv(tmp_path):
     ruta = tmp_path / "ventas.csv"
@@ -41,6 +73,18 @@ def test_iterador_tipos(tmp_path):
     assert isinstance(cant1, int)
 
 
+def test_iterador_mmap_coincide_con_dictreader(tmp_path):
+    ruta = tmp_path / "ventas.csv"
+    generar_csv_ventas(str(ruta), num_registros=200, seed=5)
+    assert list(_iter_csv_filas(str(ruta))) == list(_iter_csv_filas_dict(str(ruta)))
+
+    # columnas en otro orden, comillas y archivo vacío
+    ruta.write_text('Cantidad,Producto,ID_Venta,Precio_Unitario\n3,"Silla, Gamer",1,10.5\n', encoding="utf-8")
+    assert list(_iter_csv_filas(str(ruta))) == [(1, "Silla, Gamer", 10.5, 3)]
+    ruta.write_text("", encoding="utf-8")
+    assert list(_iter_csv_filas(str(ruta))) == []
+
+
 def test_analizar_streaming(tmp_path):
     ruta = tmp_path / "ventas.csv"
     generar_csv_ventas(str(ruta), num_registros=1000, seed=7)
@@ -58,4 +102,646 @@ def test_analizar_pandas(tmp_path):
     generar_csv_ventas(str(ruta), num_registros=1000, seed=7)
     m = analizar_ventas_pandas(str(ruta), chunksize=200)
     assert m.num_registros == 1000
-    assert m.ventas_totales > 0
\ No newline at end of file
+    assert m.ventas_totales > 0
+
+def test_rangos_alineados_a_lineas(tmp_path):
+    ruta = tmp_path / "ventas.csv"
+    generar_csv_ventas(str(ruta), num_registros=500, seed=3)
+    cabecera, rangos = _rangos_de_bytes(str(ruta), 7)
+    contenido = ruta.read_bytes()
+    assert rangos[0][0] == len(cabecera)
+    assert rangos[-1][1] == len(contenido)
+    for (_, fin), (inicio, _) in zip(rangos, rangos[1:]):
+        assert fin == inicio
+        assert contenido[fin - 1:fin] == b"\n"
+
+
+def test_analizar_parallel_coincide_con_streaming(tmp_path):
+    ruta = tmp_path / "ventas.csv"
+    generar_csv_ventas(str(ruta), num_registros=2000, seed=11)
+    esperado = analizar_ventas_streaming(str(ruta))
+    assert analizar_ventas_parallel(str(ruta), workers=1) == esperado
+    assert analizar_ventas_parallel(str(ruta), workers=3) == esperado
+
+
+def test_sidecar_columnar(tmp_path, monkeypatch):
+    ruta = tmp_path / "ventas.csv"
+    generar_csv_ventas(str(ruta), num_registros=1500, seed=9)
+    esperado = analizar_ventas_streaming(str(ruta))
+    assert analizar_ventas_streaming(str(ruta), cache=True) == esperado
+    assert (tmp_path / "ventas.csv.vcol").exists()
+
+    # con sidecar válido no se vuelve a parsear el CSV
+    def _no_parsear(_):
+        raise AssertionError("se parseó el CSV teniendo sidecar")
+    monkeypatch.setattr(ventas, "_iter_csv_filas", _no_parsear)
+    assert analizar_ventas_streaming(str(ruta)) == esperado
+    # la agregación sobre el sidecar va por tramos; con tramos chicos
+    # el resultado no cambia
+    monkeypatch.setattr(ventas, "_FILAS_POR_VOLCADO", 256)
+    assert analizar_ventas_streaming(str(ruta)) == esperado
+    monkeypatch.undo()
+
+    # si el CSV cambia el sidecar se invalida solo
+    with open(ruta, "a", encoding="utf-8") as f:
+        f.write("1501,Laptop,100.0,1000\n")
+    m = analizar_ventas_streaming(str(ruta))
+    assert m.num_registros == 1501
+    assert m.producto_mas_vendido == "Laptop"
+    assert construir_sidecar(str(ruta)) == str(ruta) + ".vcol"
+    assert analizar_ventas_streaming(str(ruta)) == m
+
+
+def test_analizar_incremental(tmp_path, monkeypatch):
+    ruta = tmp_path / "ventas.csv"
+    extra = tmp_path / "extra.csv"
+    generar_csv_ventas(str(ruta), num_registros=800, seed=2)
+    generar_csv_ventas(str(extra), num_registros=300, seed=4)
+    cola = extra.read_bytes().split(b"\n", 1)[1]
+
+    m = analizar_ventas_incremental(str(ruta))
+    assert m == analizar_ventas_streaming(str(ruta))
+
+    # filas nuevas más una línea todavía incompleta: solo se leen las nuevas
+    with open(ruta, "ab") as f:
+        f.write(cola + b"1101,Laptop,10")
+    filas_leidas = []
+    original = ventas._filas_de_bloques
+    monkeypatch.setattr(ventas, "_filas_de_bloques",
+                        lambda *args: (filas_leidas.append(f) or f for f in original(*args)))
+    m = analizar_ventas_incremental(str(ruta))
+    assert len(filas_leidas) == 300
+    assert m.num_registros == 1100
+
+    with open(ruta, "ab") as f:
+        f.write(b".0,2\r\n")
+    m = analizar_ventas_incremental(str(ruta))
+    assert len(filas_leidas) == 301
+    esperado = analizar_ventas_streaming(str(ruta))
+    assert m.num_registros == esperado.num_registros == 1101
+    assert m.ventas_totales == pytest.approx(esperado.ventas_totales)
+    assert m.cantidad_mas_vendida == esperado.cantidad_mas_vendida
+
+    # si el prefijo cambia se vuelve a escanear todo
+    generar_csv_ventas(str(ruta), num_registros=50, seed=8)
+    del filas_leidas[:]
+    m = analizar_ventas_incremental(str(ruta))
+    assert len(filas_leidas) == 50
+    assert m == analizar_ventas_streaming(str(ruta))
+
+
+def test_analizar_por_producto(tmp_path):
+    ruta = tmp_path / "ventas.csv"
+    generar_csv_ventas(str(ruta), num_registros=1200, seed=13)
+    filas = list(_iter_csv_filas(str(ruta)))
+
+    r = analizar_por_producto(str(ruta))
+    assert r.num_registros == 1200
+    for prod, e in r.productos.items():
+        propias = [f for f in filas if f[1] == prod]
+        assert e.ventas == len(propias)
+        assert e.unidades == sum(f[3] for f in propias)
+        assert e.precio_min == min(f[2] for f in propias)
+        assert e.precio_max == max(f[2] for f in propias)
+        assert e.ingresos == pytest.approx(sum(f[2] * f[3] for f in propias))
+        assert e.precio_promedio == pytest.approx(sum(f[2] for f in propias) / len(propias))
+    assert r.a_parcial().a_metrics() == analizar_ventas_streaming(str(ruta))
+
+    en_paralelo = analizar_por_producto(str(ruta), workers=3)
+    assert list(en_paralelo.productos) == list(r.productos)
+    for prod, e in en_paralelo.productos.items():
+        assert (e.ventas, e.unidades, e.precio_min, e.precio_max) == \
+            (r.productos[prod].ventas, r.productos[prod].unidades,
+             r.productos[prod].precio_min, r.productos[prod].precio_max)
+        assert e.ingresos == pytest.approx(r.productos[prod].ingresos)
+
+
+def test_analizar_numpy(tmp_path):
+    pytest.importorskip("numpy")
+    ruta = tmp_path / "ventas.csv"
+    generar_csv_ventas(str(ruta), num_registros=1000, seed=7)
+    esperado = analizar_ventas_streaming(str(ruta))
+    m = analizar_ventas_numpy(str(ruta), chunksize=128)
+    assert m.num_registros == esperado.num_registros
+    assert m.ventas_totales == pytest.approx(esperado.ventas_totales)
+    assert (m.producto_mas_vendido, m.cantidad_mas_vendida) == \
+        (esperado.producto_mas_vendido, esperado.cantidad_mas_vendida)
+
+
+def test_generar_bulk_reproducible(tmp_path, monkeypatch):
+    monkeypatch.setattr(ventas, "_FILAS_POR_SEGMENTO", 100)
+    uno = tmp_path / "uno.csv"
+    tres = tmp_path / "tres.csv"
+    assert generar_csv_ventas_bulk(str(uno), num_registros=1050, seed=5) == [str(uno)]
+    generar_csv_ventas_bulk(str(tres), num_registros=1050, seed=5, shards=3)
+    assert uno.read_bytes() == tres.read_bytes()
+    assert not list(tmp_path.glob("*.part*"))
+
+    filas = list(_iter_csv_filas(str(uno)))
+    assert [f[0] for f in filas] == list(range(1, 1051))
+    assert all(20.50 <= f[2] <= 850.99 and 1 <= f[3] <= 10 for f in filas)
+
+    partes = generar_csv_ventas_bulk(str(tmp_path / "p.csv"), num_registros=1050, seed=5,
+                                     shards=3, separar=True)
+    assert len(partes) == 3
+    assert [f for p in partes for f in _iter_csv_filas(p)] == filas
+
+    # sin NumPy: otra secuencia, mismo formato y rangos
+    monkeypatch.setattr(ventas, "_np", None)
+    generar_csv_ventas_bulk(str(uno), num_registros=1050, seed=5, shards=3)
+    filas = list(_iter_csv_filas(str(uno)))
+    assert [f[0] for f in filas] == list(range(1, 1051))
+    assert all(20.50 <= f[2] <= 850.99 and 1 <= f[3] <= 10 for f in filas)
+
+
+def test_sketch_cuantiles_y_distintos():
+    valores = [((i * 7919) % 10007) / 3 + 1 for i in range(20_000)]
+    sketch = SketchCuantiles(error_relativo=0.01)
+    mitad_a, mitad_b = SketchCuantiles(0.01), SketchCuantiles(0.01)
+    for i, v in enumerate(valores):
+        sketch.agregar(v)
+        (mitad_a if i % 2 else mitad_b).agregar(v)
+    ordenados = sorted(valores)
+    for q in (0.5, 0.95, 0.99):
+        exacto = ordenados[int(q * (len(ordenados) - 1))]
+        assert abs(sketch.cuantil(q) - exacto) <= 0.01 * exacto + 1e-9
+    assert mitad_a.combinar(mitad_b) == sketch
+
+    hll = ContadorDistintos.desde_error(0.02)
+    assert hll.error_estandar <= 0.02
+    otro = ContadorDistintos(hll.precision)
+    for i in range(50_000):
+        (hll if i < 30_000 else otro).agregar(i)
+        otro.agregar(i % 100)
+    hll.combinar(otro)
+    assert abs(hll.estimar() - 50_000) <= 4 * hll.error_estandar * 50_000
+
+
+def test_estimadores_streaming_y_parallel(tmp_path):
+    ruta = tmp_path / "ventas.csv"
+    generar_csv_ventas(str(ruta), num_registros=3000, seed=21)
+    est = EstimadoresVentas.con_errores(0.01, 0.02)
+    analizar_ventas_streaming(str(ruta), estimadores=est)
+    r = est.resumen()
+    assert round(r["productos_distintos"]) == 10
+    assert abs(r["ids_distintos"] - 3000) <= 4 * est.ids.error_estandar * 3000
+    tickets = sorted(p * c for _, _, p, c in _iter_csv_filas(str(ruta)))
+    assert r["ticket_p95"] == pytest.approx(tickets[int(0.95 * 2999)], rel=0.011)
+
+    en_paralelo = EstimadoresVentas.con_errores(0.01, 0.02)
+    analizar_ventas_parallel(str(ruta), workers=3, estimadores=en_paralelo)
+    assert en_paralelo == est
+
+
+@pytest.mark.parametrize("parser", ["c", "pyarrow"])
+def test_analizar_pandas_presupuesto_memoria(tmp_path, parser):
+    pytest.importorskip("pandas")
+    if parser == "pyarrow":
+        pytest.importorskip("pyarrow")
+    ruta = tmp_path / "ventas.csv"
+    generar_csv_ventas(str(ruta), num_registros=5000, seed=17)
+    assert _chunksize_por_presupuesto(str(ruta), 1) < _chunksize_por_presupuesto(str(ruta), 8)
+
+    esperado = analizar_ventas_streaming(str(ruta))
+    m = analizar_ventas_pandas(str(ruta), mem_budget_mb=0.05, parser=parser)
+    assert m.num_registros == esperado.num_registros
+    assert m.ventas_totales == pytest.approx(esperado.ventas_totales)
+    assert (m.producto_mas_vendido, m.cantidad_mas_vendida) == \
+        (esperado.producto_mas_vendido, esperado.cantidad_mas_vendida)
+
+
+def _csv_comprimido(tmp_path, formato):
+    ruta = tmp_path / "ventas.csv"
+    generar_csv_ventas(str(ruta), num_registros=4000, seed=31)
+    crudo = ruta.read_bytes()
+    comprimido = tmp_path / ("ventas.csv." + formato.split("-")[0])
+    if formato == "gz-multi":
+        comprimido.write_bytes(b"".join(gzip.compress(crudo[i:i + 7000])
+                                        for i in range(0, len(crudo), 7000)))
+    else:
+        modulo = {"gz": gzip, "bz2": bz2, "xz": lzma}[formato]
+        comprimido.write_bytes(modulo.compress(crudo))
+    return ruta, comprimido
+
+
+@pytest.mark.parametrize("formato", ["gz", "gz-multi", "bz2", "xz"])
+def test_entrada_comprimida(tmp_path, formato):
+    ruta, comprimido = _csv_comprimido(tmp_path, formato)
+    esperado = analizar_ventas_streaming(str(ruta))
+    assert analizar_ventas_streaming(str(comprimido)) == esperado
+    m = analizar_ventas_parallel(str(comprimido), workers=2)
+    assert m.num_registros == esperado.num_registros
+    assert m.ventas_totales == pytest.approx(esperado.ventas_totales)
+    assert analizar_por_producto(str(comprimido)) == analizar_por_producto(str(ruta))
+    with pytest.raises(ValueError):
+        analizar_ventas_incremental(str(comprimido))
+
+
+@pytest.mark.parametrize("motor", MOTORES_OPCIONALES)
+@pytest.mark.parametrize("formato", ["gz", "gz-multi", "bz2", "xz"])
+def test_entrada_comprimida_motores_opcionales(tmp_path, formato, motor):
+    ruta, comprimido = _csv_comprimido(tmp_path, formato)
+    esperado = analizar_ventas_streaming(str(ruta))
+    m = motor(str(comprimido), chunksize=1000)
+    assert m.num_registros == esperado.num_registros
+    assert m.ventas_totales == pytest.approx(esperado.ventas_totales)
+
+
+def test_gzip_multimiembro_con_falsos_positivos(tmp_path):
+    # Miembros sin compresión cuyo contenido incluye la firma gzip: el
+    # descompresor paralelo debe descartar esos cortes falsos.
+    miembros = [b"\x1f\x8b\x08\x00" * 50 + bytes([i]) * 1000 for i in range(6)]
+    ruta = tmp_path / "datos.gz"
+    ruta.write_bytes(b"".join(gzip.compress(m, compresslevel=0) for m in miembros))
+    assert b"".join(_bloques_gzip_paralelo(str(ruta), 3)) == b"".join(miembros)
+
+    ruta.write_bytes(ruta.read_bytes()[:-5])
+    with pytest.raises(ValueError):
+        b"".join(_bloques_gzip_paralelo(str(ruta), 3))
+
+
+def test_gzip_un_miembro_se_entrega_en_trozos(tmp_path, monkeypatch):
+    # Un solo miembro con firmas falsas cada 1 KB: todo menos el primer
+    # segmento se infla fuera del pool y debe salir en trozos acotados.
+    monkeypatch.setattr(ventas, "_TAM_BLOQUE_DESCOMPRESION", 4096)
+    contenido = (b"\x1f\x8b\x08\x00" + b"x" * 996) * 200
+    ruta = tmp_path / "datos.gz"
+    ruta.write_bytes(gzip.compress(contenido, compresslevel=0))
+    trozos = list(_bloques_gzip_paralelo(str(ruta), 3))
+    assert b"".join(trozos) == contenido
+    assert len(trozos) > 1 and max(map(len, trozos)) <= 4096
+
+
+def test_analizar_particiones_con_cache(tmp_path, monkeypatch):
+    dias = tmp_path / "dias"
+    dias.mkdir()
+    for i in range(3):
+        generar_csv_ventas(str(dias / f"2024-05-0{i + 1}.csv"), num_registros=500, seed=i)
+    with open(dias / "2024-05-03.csv", "rb") as f:
+        (dias / "2024-05-03.csv.gz").write_bytes(gzip.compress(f.read()))
+    os.remove(dias / "2024-05-03.csv")
+    (dias / "notas.txt").write_text("no es un csv")
+
+    unido = tmp_path / "todo.csv"
+    generar_csv_ventas(str(unido), num_registros=500, seed=0)
+    with open(unido, "a", encoding="utf-8") as f:
+        for i in (1, 2):
+            tmp = tmp_path / f"tmp{i}.csv"
+            generar_csv_ventas(str(tmp), num_registros=500, seed=i)
+            f.writelines(open(tmp, encoding="utf-8").readlines()[1:])
+    esperado = analizar_ventas_streaming(str(unido))
+
+    parseados = []
+    original = ventas._parcial_de_archivo
+    monkeypatch.setattr(ventas, "_parcial_de_archivo",
+                        lambda nombre, *args: parseados.append(os.path.basename(nombre))
+                        or original(nombre, *args))
+
+    m = analizar_ventas_particiones(str(dias), workers=1)
+    assert m.num_registros == 1500
+    assert m.ventas_totales == pytest.approx(esperado.ventas_totales)
+    assert (m.producto_mas_vendido, m.cantidad_mas_vendida) == \
+        (esperado.producto_mas_vendido, esperado.cantidad_mas_vendida)
+    assert len(parseados) == 3
+
+    # Solo se vuelve a parsear el día modificado
+    parseados.clear()
+    generar_csv_ventas(str(dias / "2024-05-02.csv"), num_registros=200, seed=9)
+    assert analizar_ventas_particiones(str(dias), workers=1).num_registros == 1200
+    assert parseados == ["2024-05-02.csv"]
+
+    # Dos globs sobre el mismo directorio no se pisan el cache
+    parseados.clear()
+    analizar_ventas_particiones(str(dias / "2024-05-01.csv"), workers=1)
+    analizar_ventas_particiones(str(dias / "2024-05-0[23].csv*"), workers=1)
+    analizar_ventas_particiones(str(dias), workers=1)
+    assert parseados == []
+    # ...pero se podan las entradas de archivos borrados
+    os.remove(dias / "2024-05-01.csv")
+    analizar_ventas_particiones(str(dias / "2024-05-02.csv"), workers=1)
+    cacheados = ventas._leer_cache_particiones(str(dias / ventas._CACHE_PARTICIONES))
+    assert sorted(os.path.basename(r) for r in cacheados) == ["2024-05-02.csv", "2024-05-03.csv.gz"]
+    assert parseados == []
+
+    monkeypatch.undo()
+    m = analizar_ventas_particiones(str(dias / "2024-05-0[23].csv*"), workers=2, cache=None)
+    assert m.num_registros == 700
+    with pytest.raises(FileNotFoundError):
+        analizar_ventas_particiones(str(tmp_path / "vacio-*.csv"))
+
+
+def test_particion_con_corchetes_en_el_nombre(tmp_path):
+    ruta = tmp_path / "ventas[2024].csv"
+    generar_csv_ventas(str(ruta), num_registros=300, seed=4)
+    # El archivo existe: no se expande "[2024]" como clase de caracteres
+    assert ventas._resolver_particiones(str(ruta)) == [str(ruta)]
+    assert analizar_ventas_particiones(str(ruta), cache=None).num_registros == 300
+
+
+def test_filtros_en_todos_los_motores(tmp_path):
+    ruta = tmp_path / "ventas.csv"
+    generar_csv_ventas(str(ruta), num_registros=3000, seed=13)
+    assert parsear_rango_ids("100:2000") == (100, 2000)
+    assert parsear_rango_ids(":50") == (None, 50)
+    with pytest.raises(ValueError):
+        parsear_rango_ids("9:1")
+
+    filtro = FiltroVentas(frozenset({"Laptop", "Mouse"}), precio_min=50, id_min=100, id_max=2000)
+    filas = [f for f in _iter_csv_filas(str(ruta)) if filtro.acepta(f[0], f[1], f[2])]
+    assert 0 < len(filas) < 3000
+    assert list(_iter_csv_filas(str(ruta), filtro)) == filas
+    esperado = ventas._agregar_filas(filas).a_metrics()
+
+    assert analizar_ventas_streaming(str(ruta), filtro=filtro) == esperado
+    m = analizar_ventas_parallel(str(ruta), workers=2, filtro=filtro)
+    assert m.num_registros == esperado.num_registros
+    assert m.ventas_totales == pytest.approx(esperado.ventas_totales)
+    assert analizar_por_producto(str(ruta), filtro=filtro).num_registros == len(filas)
+    assert analizar_ventas_incremental(str(ruta), filtro=filtro) == esperado
+    # Un checkpoint con otro filtro no se reutiliza
+    assert analizar_ventas_incremental(str(ruta)) == analizar_ventas_streaming(str(ruta))
+
+
+@pytest.mark.parametrize("motor", MOTORES_OPCIONALES)
+def test_filtros_motores_opcionales(tmp_path, motor):
+    ruta = tmp_path / "ventas.csv"
+    generar_csv_ventas(str(ruta), num_registros=3000, seed=13)
+    filtro = FiltroVentas(frozenset({"Laptop", "Mouse"}), precio_min=50, id_min=100, id_max=2000)
+    esperado = analizar_ventas_streaming(str(ruta), filtro=filtro)
+    m = motor(str(ruta), chunksize=700, filtro=filtro)
+    assert m.num_registros == esperado.num_registros
+    assert m.ventas_totales == pytest.approx(esperado.ventas_totales)
+    assert (m.producto_mas_vendido, m.cantidad_mas_vendida) == \
+        (esperado.producto_mas_vendido, esperado.cantidad_mas_vendida)
+
+
+def test_modo_centavos_exacto_en_todos_los_motores(tmp_path):
+    assert [_centavos(t) for t in (b"12.34", b"7", b"7.5", b"-0.50", "3.10", b"4.200")] == \
+        [1234, 700, 750, -50, 310, 420]
+    with pytest.raises(ValueError):
+        _centavos(b"1.234")
+    with pytest.raises(ValueError):
+        VentasParcial(1.0, 1, {"a": 1}).combinar(VentasParcial(100, 1, {"a": 1}, centavos=True))
+
+    ruta = tmp_path / "ventas.csv"
+    generar_csv_ventas(str(ruta), num_registros=4000, seed=8)
+    esperado = sum(_centavos(p) * int(c) for _, _, p, c in
+                   (linea.split(",") for linea in ruta.read_text().splitlines()[1:]))
+    assert ventas._agregar_filas(_iter_csv_filas(str(ruta), centavos=True), centavos=True).suma_ventas == esperado
+
+    m = analizar_ventas_streaming(str(ruta), centavos=True)
+    assert m.ventas_totales == esperado / 100
+    assert m.promedio_por_venta == round(esperado / 400_000, 2)
+    resultados = [
+        analizar_ventas_parallel(str(ruta), workers=3, centavos=True),
+        analizar_ventas_incremental(str(ruta), centavos=True),
+        analizar_ventas_streaming(str(ruta), centavos=True,
+                                  filtro=FiltroVentas(precio_min=0)),
+    ]
+    assert all(r == m for r in resultados)
+
+    construir_sidecar(str(ruta))
+    assert analizar_ventas_streaming(str(ruta), centavos=True) == m
+
+
+@pytest.mark.parametrize("motor", MOTORES_OPCIONALES)
+def test_modo_centavos_motores_opcionales(tmp_path, motor):
+    ruta = tmp_path / "ventas.csv"
+    generar_csv_ventas(str(ruta), num_registros=4000, seed=8)
+    m = analizar_ventas_streaming(str(ruta), centavos=True)
+    assert all(motor(str(ruta), chunksize=k, centavos=True) == m for k in (333, 4000))
+
+
+@pytest.mark.parametrize("motor", ["streaming", "parallel", "numpy", "pandas"])
+def test_modo_centavos_limites_de_precio_exactos(tmp_path, motor):
+    if motor in ("numpy", "pandas"):
+        pytest.importorskip(motor)
+    ruta = tmp_path / "ventas.csv"
+    ruta.write_text("ID_Venta,Producto,Precio_Unitario,Cantidad\n"
+                    "1,a,4.34,1\n2,b,4.35,2\n3,c,4.36,3\n")
+    analizar = {
+        "streaming": analizar_ventas_streaming,
+        "parallel": lambda r, **kw: analizar_ventas_parallel(r, workers=2, **kw),
+        "numpy": analizar_ventas_numpy,
+        "pandas": analizar_ventas_pandas,
+    }[motor]
+    # 4.35 * 100 == 434.99999999999994: el borde tiene que quedar dentro
+    for filtro, esperado in ((FiltroVentas(precio_max=4.35), 2),
+                             (FiltroVentas(precio_min=4.35), 2),
+                             (FiltroVentas(precio_min=4.35, precio_max=4.35), 1)):
+        flotante = analizar(str(ruta), filtro=filtro)
+        exacto = analizar(str(ruta), filtro=filtro, centavos=True)
+        assert flotante.num_registros == exacto.num_registros == esperado
+        assert flotante == exacto
+
+
+def test_almacen_indexado(tmp_path, monkeypatch):
+    monkeypatch.setattr(ventas, "_REGISTROS_POR_BLOQUE", 100)
+    ruta = tmp_path / "ventas.csv"
+    generar_csv_ventas(str(ruta), num_registros=3000, seed=5)
+    almacen = indexar_ventas(str(ruta))
+    assert ventas.es_almacen(almacen) and not ventas.es_almacen(str(ruta))
+
+    m = analizar_ventas_almacen(almacen)
+    esperado = analizar_ventas_streaming(str(ruta))
+    assert (m.num_registros, m.producto_mas_vendido, m.cantidad_mas_vendida) == \
+        (esperado.num_registros, esperado.producto_mas_vendido, esperado.cantidad_mas_vendida)
+    assert m.ventas_totales == pytest.approx(esperado.ventas_totales)
+    assert analizar_ventas_almacen(almacen, centavos=True) == analizar_ventas_streaming(str(ruta), centavos=True)
+
+    bloques_leidos = []
+    original = ventas._agregar_bloque_almacen
+    monkeypatch.setattr(ventas, "_agregar_bloque_almacen",
+                        lambda registros, *args: bloques_leidos.append(len(registros)) or original(registros, *args))
+    filtro = FiltroVentas(frozenset({"Monitor"}), precio_min=100, id_min=1000, id_max=1500)
+    m = analizar_ventas_almacen(almacen, filtro, centavos=True)
+    assert m == analizar_ventas_streaming(str(ruta), filtro=filtro, centavos=True)
+    # solo los bloques de Monitor que se solapan con los IDs 1000-1500
+    assert 0 < len(bloques_leidos) <= 2
+    monkeypatch.undo()
+
+    # si el CSV de origen cambia, la consulta vuelve a indexarlo
+    with open(ruta, "a", encoding="utf-8") as f:
+        f.write("3001,Laptop,100.0,1000\n")
+    m = analizar_ventas_almacen(almacen)
+    assert m.num_registros == 3001 and m.producto_mas_vendido == "Laptop"
+    assert ventas._leer_meta_almacen(almacen)["origen"] == ventas._clave_csv(str(ruta))
+    # sin el CSV de origen el almacén sigue respondiendo solo
+    os.remove(ruta)
+    assert analizar_ventas_almacen(almacen) == m
+
+
+def test_matriz_benchmarks_y_regresiones(tmp_path):
+    import json
+    import profiling
+
+    salida = tmp_path / "base.json"
+    # Un sidecar de una corrida anterior no debe colarse en los tiempos
+    generar_csv_ventas_bulk(str(tmp_path / "ventas_bench_500.csv"), 500, seed=42)
+    construir_sidecar(str(tmp_path / "ventas_bench_500.csv"))
+    informe = profiling.run_matriz(motores=["streaming"], tamanos=[500], chunksizes=[100],
+                                   repeticiones=3, calentamiento=1,
+                                   directorio=str(tmp_path), salida=str(salida))
+    (r,) = informe["resultados"]
+    assert (r["motor"], r["filas"], r["chunksize"], r["ruta"]) == ("streaming", 500, None, "parseo")
+    assert not (tmp_path / "ventas_bench_500.csv.vcol").exists()
+    assert len(r["tiempos_s"]) == 3 and r["q1_s"] <= r["mediana_s"] <= r["q3_s"]
+    assert json.loads(salida.read_text())["resultados"][0]["mediana_s"] == r["mediana_s"]
+
+    base = {"resultados": [dict(r, mediana_s=1.0, iqr_s=0.05)]}
+    lento = {"resultados": [dict(r, mediana_s=1.2)]}
+    ruido = {"resultados": [dict(r, mediana_s=1.08)]}
+    (regresion,) = profiling.comparar_con_base(lento, base, umbral=0.10)
+    assert regresion["ratio"] == pytest.approx(1.2)
+    assert profiling.comparar_con_base(ruido, base, umbral=0.10) == []
+    assert profiling.comparar_con_base(lento, base, umbral=0.25) == []
+    assert profiling._lista_enteros("10k,1M,500") == [10_000, 1_000_000, 500]
+
+
+def test_medir_memoria_en_subproceso(tmp_path):
+    import profiling
+
+    ruta = tmp_path / "ventas.csv"
+    generar_csv_ventas(str(ruta), num_registros=2000, seed=3)
+    medida = profiling.medir_memoria("streaming", str(ruta), num_registros=2000)
+    assert medida["pico_traced_mb"] > 0
+    assert medida["mb_por_fila"] == pytest.approx(
+        max(medida["pico_traced_mb"], medida["rss_delta_mb"] or 0.0) / 2000)
+    if medida["rss_pico_mb"] is not None:
+        assert medida["rss_pico_mb"] >= medida["rss_base_mb"] > 0
+
+
+def test_escalado_por_workers(tmp_path):
+    import json
+    import profiling
+
+    ruta = tmp_path / "ventas.csv"
+    generar_csv_ventas(str(ruta), num_registros=3000, seed=4)
+    informe = profiling.run_scaling(str(ruta), max_workers=2, repeticiones=1,
+                                    salida_json=str(tmp_path / "e.json"),
+                                    salida_csv=str(tmp_path / "e.csv"))
+    etapas, curva = informe["etapas"], informe["curva"]
+    assert etapas["filas"] == 3000
+    assert etapas["etapa_limitante"] in ("lectura", "parseo", "agregado")
+    assert [p["workers"] for p in curva] == [1, 2]
+    assert curva[0]["speedup"] == 1.0
+    assert curva[1]["eficiencia"] == pytest.approx(curva[1]["speedup"] / 2)
+    assert json.loads((tmp_path / "e.json").read_text())["curva"] == curva
+    with open(tmp_path / "e.csv", newline="") as f:
+        assert [int(r["workers"]) for r in csv.DictReader(f)] == [1, 2]
+
+
+def _ocupado(segundos):
+    import time
+    fin = time.process_time() + segundos
+    while time.process_time() < fin:
+        pass
+
+
+@pytest.mark.parametrize("senal", [True, False])
+def test_muestreador_pilas(tmp_path, senal):
+    import signal
+    if senal and not hasattr(signal, "setitimer"):
+        pytest.skip("sin setitimer")
+    with ventas.MuestreadorPilas(hz=500, senal=senal) as m:
+        _ocupado(0.2)
+    assert m.muestras > 10
+
+    ruta = m.guardar_colapsado(str(tmp_path / "perfil.folded"))
+    lineas = open(ruta, encoding="utf-8").read().splitlines()
+    pila, n = lineas[0].rsplit(" ", 1)
+    assert "_ocupado (test_ventas.py:" in pila and int(n) > 0
+    assert sum(int(l.rsplit(" ", 1)[1]) for l in lineas) == m.muestras
+
+    (nombre, propias, inclusivas), *_ = m.top(5)
+    assert nombre.startswith("_ocupado") and propias == inclusivas > m.muestras // 2
+    if senal:
+        assert signal.getsignal(signal.SIGPROF) != m._al_senal
+
+
+@pytest.mark.parametrize("motor,kwargs,etapas", [
+    pytest.param(analizar_ventas_streaming, {}, ["lectura", "parseo", "agregado", "combinacion"],
+                 id="streaming"),
+    pytest.param(analizar_ventas_numpy, {"chunksize": 500}, ["lectura", "parseo", "agregado", "combinacion"],
+                 id="numpy", marks=requiere_numpy),
+    pytest.param(analizar_ventas_pandas, {"chunksize": 500}, ["lectura_parseo", "agregado", "combinacion"],
+                 id="pandas", marks=requiere_pandas),
+    pytest.param(analizar_ventas_pandas, {"chunksize": 500, "parser": "c"},
+                 ["lectura_parseo", "agregado", "combinacion"], id="pandas-c", marks=requiere_pandas),
+])
+@pytest.mark.parametrize("comprimido", [False, True], ids=["csv", "gz"])
+def test_metricas_por_etapa_por_motor(tmp_path, motor, kwargs, etapas, comprimido):
+    plano = tmp_path / "ventas.csv"
+    generar_csv_ventas(str(plano), num_registros=3000, seed=6)
+    crudo = plano.read_bytes()
+    ruta = plano
+    if comprimido:
+        ruta = tmp_path / "ventas.csv.gz"
+        ruta.write_bytes(gzip.compress(crudo))
+    # lo leído es el cuerpo descomprimido, igual en todos los motores
+    bytes_cuerpo = len(crudo) - len(crudo.split(b"\n", 1)[0]) - 1
+    filtro = FiltroVentas(frozenset({"Laptop", "Mouse"}), precio_min=50)
+    sin_medir = motor(str(ruta), filtro=filtro, **kwargs)
+    m = ventas.MetricasEtapas()
+    assert motor(str(ruta), filtro=filtro, metricas=m, **kwargs) == sin_medir
+    assert list(m.etapas) == etapas
+    d = m.a_dict()
+    assert sum(e["porcentaje"] for e in d.values()) == pytest.approx(100)
+    assert d["agregado"]["filas"] == sin_medir.num_registros
+    assert d[etapas[0]]["bytes"] == bytes_cuerpo
+
+
+def test_metricas_por_etapa(tmp_path):
+    import profiling
+
+    ruta = tmp_path / "ventas.csv"
+    generar_csv_ventas(str(ruta), num_registros=3000, seed=6)
+
+    # con sidecar el streaming responde desde la cache
+    construir_sidecar(str(ruta))
+    m = ventas.MetricasEtapas()
+    analizar_ventas_streaming(str(ruta), metricas=m)
+    assert list(m.etapas) == ["cache"] and m.etapas["cache"].filas == 3000
+    os.remove(ventas._ruta_sidecar(str(ruta)))
+
+    total = ventas.MetricasEtapas()
+    total.combinar(m).combinar(m)
+    assert total.etapas["cache"].llamadas == 2 and total.etapas["cache"].filas == 6000
+
+    desglose = profiling.run_etapas(str(ruta), motores=["streaming"], repeticiones=2)
+    assert list(desglose["streaming"]) == ["lectura", "parseo", "agregado", "combinacion"]
+
+
+@pytest.mark.parametrize("motor,kwargs", [
+    pytest.param(analizar_ventas_streaming, {}, id="streaming"),
+    pytest.param(analizar_ventas_numpy, {"chunksize": 500}, id="numpy", marks=requiere_numpy),
+    pytest.param(analizar_ventas_pandas, {"chunksize": 500, "parser": "c"}, id="pandas", marks=requiere_pandas),
+    pytest.param(analizar_ventas_parallel, {"workers": 1}, id="parallel-1"),
+    pytest.param(analizar_ventas_parallel, {"workers": 2}, id="parallel-2"),
+])
+def test_reporte_de_progreso_por_motor(tmp_path, motor, kwargs):
+    ruta = tmp_path / "ventas.csv"
+    generar_csv_ventas(str(ruta), num_registros=5000, seed=8)
+    estados = []
+    progreso = ventas.ReporteProgreso(intervalo=0.001, salida=estados.append)
+    m = motor(str(ruta), progreso=progreso, **kwargs)
+    assert m == motor(str(ruta), **kwargs)
+    final = estados[-1]
+    assert final["final"] and final["porcentaje"] == 100.0 and final["eta_s"] == 0.0
+    assert final["filas"] == 5000 and 0 < final["bytes"] <= os.path.getsize(ruta)
+    porcentajes = [e["porcentaje"] for e in estados]
+    assert porcentajes == sorted(porcentajes)
+
+
+def test_reporte_de_progreso(tmp_path):
+    ruta = tmp_path / "ventas.csv"
+    generar_csv_ventas(str(ruta), num_registros=5000, seed=8)
+
+    # comprimido: sin total conocido no hay porcentaje ni ETA
+    gz = tmp_path / "ventas.csv.gz"
+    gz.write_bytes(gzip.compress(ruta.read_bytes()))
+    estados = []
+    analizar_ventas_streaming(str(gz), progreso=ventas.ReporteProgreso(salida=estados.append))
+    assert estados[-1]["porcentaje"] is None and estados[-1]["eta_s"] is None
+    assert estados[-1]["filas"] == 5000
+    assert "ETA" not in ventas._formatear_progreso(estados[-1])
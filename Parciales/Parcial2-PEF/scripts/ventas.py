@@ -6,20 +6,53 @@ ventas.py
 Proyecto 1 – Procesamiento de Datos de Ventas.
 
 Este módulo implementa un sistema completo de generación y análisis de datos
-de ventas desde archivos CSV. Proporciona dos estrategias de procesamiento
-optimizadas: streaming (línea por línea) y batching con pandas (por bloques).
+de ventas desde archivos CSV. Proporciona cuatro estrategias de procesamiento
+optimizadas: streaming (línea por línea), batching con pandas (por bloques),
+bloques parseados a arrays NumPy y paralela (rangos de bytes procesados en un
+pool de procesos).
 
 Módulos principales:
     - generar_csv_ventas: Genera archivos CSV sintéticos con datos aleatorios
+    - generar_csv_ventas_bulk: Generación masiva por bloques, opcionalmente en shards
     - analizar_ventas_streaming: Análisis eficiente con memoria constante O(1)
     - analizar_ventas_pandas: Análisis por bloques con operaciones vectorizadas
+    - analizar_ventas_numpy: Análisis por bloques con arrays NumPy y bincount
+    - analizar_ventas_parallel: Análisis multinúcleo por rangos de bytes
+    - analizar_ventas_incremental: Análisis de solo la cola nueva de un CSV
+    - analizar_por_producto: Estadísticas por producto en una sola pasada
 
 Fecha: Octubre 2025
 """
+import bz2
 import csv
+import glob
+import gzip
+import hashlib
+import io
+import json
+import lzma
+import math
+import mmap
+import operator
+import os
+import queue
 import random
-from dataclasses import dataclass
-from typing import Dict, Iterable, Tuple, Optional
+import re
+import shutil
+import signal
+import struct
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from dataclasses import asdict, dataclass, field
+from itertools import compress
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Tuple, Optional
 
 # Usar:
 try:
@@ -33,6 +66,18 @@ try:
 except Exception:
     _pd = None
 
+try:
+    import numpy as _np
+except Exception:
+    _np = None
+
+try:
+    import pyarrow as _pa
+    import pyarrow.compute as _pc
+    import pyarrow.csv as _pacsv
+except Exception:
+    _pa = _pc = _pacsv = None
+
 
 PRODUCTOS_PREDETERMINADOS = [
     "Laptop", "Mouse", "Teclado", "Monitor", "Webcam",
@@ -59,6 +104,690 @@ class VentasMetrics:
     num_registros: int
 
 
+@dataclass
+class VentasParcial:
+    """
+    Agregado parcial y combinable de un análisis de ventas.
+
+    Contiene solo sumas y conteos, de modo que dos parciales calculados sobre
+    porciones disjuntas del archivo pueden combinarse sin perder información.
+    Es el valor que devuelve cada worker del motor paralelo.
+
+    Attributes:
+        suma_ventas (float): Suma de precio × cantidad de la porción. Si
+            `centavos` es True es un `int` exacto en centavos.
+        num_registros (int): Registros procesados en la porción
+        cantidades_por_producto (Dict[str, int]): Unidades vendidas por producto,
+            en orden de primera aparición
+        centavos (bool): Si la suma está en centavos enteros (modo de punto
+            fijo, ver `_centavos`)
+    """
+    suma_ventas: float = 0.0
+    num_registros: int = 0
+    cantidades_por_producto: Dict[str, int] = field(default_factory=dict)
+    centavos: bool = False
+
+    def combinar(self, otro: "VentasParcial") -> "VentasParcial":
+        """
+        Acumula `otro` sobre este parcial (in-place) y lo devuelve.
+
+        Combinar en el orden del archivo conserva el orden de primera aparición
+        de los productos, por lo que los empates del producto más vendido se
+        resuelven igual que en el análisis streaming.
+
+        Raises:
+            ValueError: Si se mezclan parciales en centavos y en punto
+                flotante (un parcial vacío adopta el modo del otro)
+        """
+        if otro.centavos != self.centavos and otro.num_registros:
+            if self.num_registros:
+                raise ValueError("No se pueden combinar parciales en centavos y en punto flotante.")
+            self.centavos, self.suma_ventas = otro.centavos, (0 if otro.centavos else 0.0)
+        self.suma_ventas += otro.suma_ventas
+        self.num_registros += otro.num_registros
+        cantidades = self.cantidades_por_producto
+        for prod, cnt in otro.cantidades_por_producto.items():
+            cantidades[prod] = cantidades.get(prod, 0) + cnt
+        return self
+
+    def a_metrics(self) -> VentasMetrics:
+        """Convierte el agregado en las métricas finales."""
+        if self.num_registros == 0:
+            return VentasMetrics(0.0, 0.0, "", 0, 0)
+
+        producto_top, cant_top = max(self.cantidades_por_producto.items(), key=lambda kv: kv[1])
+        if self.centavos:
+            # División exacta de enteros: el resultado solo depende de la suma
+            ventas_totales = self.suma_ventas / 100
+            promedio = self.suma_ventas / (100 * self.num_registros)
+        else:
+            ventas_totales = self.suma_ventas
+            promedio = self.suma_ventas / self.num_registros
+
+        return VentasMetrics(
+            ventas_totales=round(ventas_totales, 2),
+            promedio_por_venta=round(promedio, 2),
+            producto_mas_vendido=producto_top,
+            cantidad_mas_vendida=int(cant_top),
+            num_registros=self.num_registros,
+        )
+
+
+@dataclass
+class EstadisticasProducto:
+    """
+    Acumulador combinable de estadísticas de un producto.
+
+    Todos los campos son sumas, conteos o extremos, así que `combinar` es
+    asociativo y conmutativo: el resultado no depende de cómo se particione
+    el archivo (chunks, workers o ejecuciones incrementales).
+
+    Attributes:
+        ventas (int): Número de transacciones del producto
+        unidades (int): Unidades vendidas
+        ingresos (float): Suma de precio × cantidad
+        precio_min (float): Menor precio unitario observado
+        precio_max (float): Mayor precio unitario observado
+        suma_precios (float): Suma de precios unitarios (para el promedio)
+    """
+    ventas: int = 0
+    unidades: int = 0
+    ingresos: float = 0.0
+    precio_min: float = math.inf
+    precio_max: float = -math.inf
+    suma_precios: float = 0.0
+
+    @property
+    def precio_promedio(self) -> float:
+        """Precio unitario promedio por transacción."""
+        return self.suma_precios / self.ventas if self.ventas else 0.0
+
+    @property
+    def ticket_promedio(self) -> float:
+        """Ingreso promedio por transacción."""
+        return self.ingresos / self.ventas if self.ventas else 0.0
+
+    def combinar(self, otro: "EstadisticasProducto") -> "EstadisticasProducto":
+        """Acumula `otro` sobre este acumulador (in-place) y lo devuelve."""
+        self.ventas += otro.ventas
+        self.unidades += otro.unidades
+        self.ingresos += otro.ingresos
+        self.precio_min = min(self.precio_min, otro.precio_min)
+        self.precio_max = max(self.precio_max, otro.precio_max)
+        self.suma_precios += otro.suma_precios
+        return self
+
+
+@dataclass
+class VentasPorProducto:
+    """
+    Resultado del análisis por producto.
+
+    Attributes:
+        productos (Dict[str, EstadisticasProducto]): Estadísticas por producto,
+            en orden de primera aparición
+        num_registros (int): Cantidad total de registros procesados
+    """
+    productos: Dict[str, EstadisticasProducto] = field(default_factory=dict)
+    num_registros: int = 0
+
+    def combinar(self, otro: "VentasPorProducto") -> "VentasPorProducto":
+        """Combina otro resultado parcial (in-place) y lo devuelve."""
+        self.num_registros += otro.num_registros
+        for prod, est in otro.productos.items():
+            propio = self.productos.get(prod)
+            if propio is None:
+                self.productos[prod] = EstadisticasProducto(**asdict(est))
+            else:
+                propio.combinar(est)
+        return self
+
+    def a_parcial(self) -> VentasParcial:
+        """Agregado global equivalente, para obtener también `VentasMetrics`."""
+        return VentasParcial(
+            suma_ventas=sum(e.ingresos for e in self.productos.values()),
+            num_registros=self.num_registros,
+            cantidades_por_producto={p: e.unidades for p, e in self.productos.items()},
+        )
+
+
+@dataclass(frozen=True)
+class FiltroVentas:
+    """
+    Predicados de fila que los motores aplican durante el escaneo.
+
+    Todos los límites son inclusivos; un campo en None no restringe.
+
+    Attributes:
+        productos (Optional[FrozenSet[str]]): Productos aceptados
+        precio_min (Optional[float]): Precio unitario mínimo
+        precio_max (Optional[float]): Precio unitario máximo
+        id_min (Optional[int]): ID_Venta mínimo
+        id_max (Optional[int]): ID_Venta máximo
+    """
+    productos: Optional[FrozenSet[str]] = None
+    precio_min: Optional[float] = None
+    precio_max: Optional[float] = None
+    id_min: Optional[int] = None
+    id_max: Optional[int] = None
+
+    @property
+    def activo(self) -> bool:
+        """True si algún campo restringe las filas."""
+        return any(v is not None for v in
+                   (self.productos, self.precio_min, self.precio_max, self.id_min, self.id_max))
+
+    @property
+    def limites_precio(self) -> Tuple[float, float]:
+        """(mínimo, máximo) con ±inf para los extremos abiertos."""
+        return (-math.inf if self.precio_min is None else self.precio_min,
+                math.inf if self.precio_max is None else self.precio_max)
+
+    @property
+    def limites_centavos(self) -> Tuple[float, float]:
+        """
+        (mínimo, máximo) de precio en centavos enteros, para el modo centavos.
+
+        No multiplica el `float` directamente (4.35 * 100 es
+        434.99999999999994): redondea a 6 decimales y después toma el techo
+        del mínimo y el piso del máximo, así un precio exactamente en el
+        borde queda dentro igual que en punto flotante.
+        """
+        pmin, pmax = self.limites_precio
+        return (pmin if math.isinf(pmin) else math.ceil(round(pmin * 100, 6)),
+                pmax if math.isinf(pmax) else math.floor(round(pmax * 100, 6)))
+
+    @property
+    def limites_id(self) -> Tuple[float, float]:
+        """(mínimo, máximo) de ID_Venta con ±inf para los extremos abiertos."""
+        return (-math.inf if self.id_min is None else self.id_min,
+                math.inf if self.id_max is None else self.id_max)
+
+    def acepta_producto(self, producto: str) -> bool:
+        return self.productos is None or producto in self.productos
+
+    def acepta(self, id_venta: int, producto: str, precio: float) -> bool:
+        """Evalúa todos los predicados sobre una fila ya convertida."""
+        pmin, pmax = self.limites_precio
+        imin, imax = self.limites_id
+        return self.acepta_producto(producto) and pmin <= precio <= pmax and imin <= id_venta <= imax
+
+    def clave(self) -> Optional[list]:
+        """Representación JSON estable para validar checkpoints y caches; None si no filtra."""
+        if not self.activo:
+            return None
+        productos = sorted(self.productos) if self.productos is not None else None
+        return [productos, self.precio_min, self.precio_max, self.id_min, self.id_max]
+
+
+def parsear_rango_ids(texto: str) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Convierte "a:b", "a:" o ":b" en límites inclusivos de ID_Venta.
+
+    Raises:
+        ValueError: Si el texto no tiene la forma esperada o a > b
+    """
+    inicio, sep, fin = texto.partition(":")
+    if not sep:
+        raise ValueError(f"Rango de IDs inválido: {texto!r} (se espera a:b)")
+    id_min = int(inicio) if inicio.strip() else None
+    id_max = int(fin) if fin.strip() else None
+    if id_min is not None and id_max is not None and id_min > id_max:
+        raise ValueError(f"Rango de IDs vacío: {texto!r}")
+    return id_min, id_max
+
+
+# --- Métricas por etapa ------------------------------------------------------
+@dataclass
+class MetricasEtapa:
+    """
+    Tiempo, bytes y filas acumulados de una etapa del análisis.
+
+    Attributes:
+        segundos (float): Tiempo de pared acumulado
+        bytes (int): Bytes de entrada procesados en la etapa
+        filas (int): Filas procesadas en la etapa
+        llamadas (int): Veces que se registró la etapa (bloques, chunks...)
+    """
+    segundos: float = 0.0
+    bytes: int = 0
+    filas: int = 0
+    llamadas: int = 0
+
+
+@dataclass
+class MetricasEtapas:
+    """
+    Colector opcional de tiempos por etapa (lectura, parseo, agregado,
+    combinación) para los motores `analizar_ventas_*`.
+
+    Los motores lo reciben como `metricas=`. Si es None (el default) no
+    hacen ninguna medición; si se pasa, registran una marca por bloque o
+    chunk (nunca por fila) con `marcar`, que imputa a la etapa indicada el
+    tiempo transcurrido desde la marca anterior.
+
+    Attributes:
+        etapas (Dict[str, MetricasEtapa]): Etapas en orden de primera aparición
+
+    Example:
+        >>> m = MetricasEtapas()
+        >>> analizar_ventas_numpy("ventas.csv", metricas=m)
+        >>> m.a_dict()["agregado"]["segundos"]
+    """
+    etapas: Dict[str, MetricasEtapa] = field(default_factory=dict)
+    _ultima: float = field(default=0.0, repr=False, compare=False)
+
+    def iniciar(self) -> "MetricasEtapas":
+        """Fija el instante desde el que mide la próxima `marcar`."""
+        self._ultima = time.perf_counter()
+        return self
+
+    def marcar(self, etapa: str, bytes: int = 0, filas: int = 0) -> None:
+        """Imputa a `etapa` el tiempo desde la marca anterior y suma bytes/filas."""
+        ahora = time.perf_counter()
+        self.sumar(etapa, ahora - self._ultima, bytes, filas)
+        self._ultima = ahora
+
+    def sumar(self, etapa: str, segundos: float, bytes: int = 0, filas: int = 0) -> None:
+        """Suma una medición ya tomada a `etapa`."""
+        m = self.etapas.get(etapa)
+        if m is None:
+            m = self.etapas[etapa] = MetricasEtapa()
+        m.segundos += segundos
+        m.bytes += bytes
+        m.filas += filas
+        m.llamadas += 1
+
+    def combinar(self, otro: "MetricasEtapas") -> "MetricasEtapas":
+        """Acumula las etapas de `otro` (in-place) y devuelve este colector."""
+        for etapa, m in otro.etapas.items():
+            self.sumar(etapa, m.segundos, m.bytes, m.filas)
+            self.etapas[etapa].llamadas += m.llamadas - 1
+        return self
+
+    @property
+    def total_segundos(self) -> float:
+        return sum(m.segundos for m in self.etapas.values())
+
+    def a_dict(self) -> Dict[str, Dict[str, float]]:
+        """
+        Etapas como dicts serializables a JSON, con porcentaje del total,
+        filas/s y MB/s derivados.
+        """
+        total = self.total_segundos
+        resultado = {}
+        for etapa, m in self.etapas.items():
+            d = asdict(m)
+            d["porcentaje"] = 100 * m.segundos / total if total else 0.0
+            d["filas_por_s"] = m.filas / m.segundos if m.segundos and m.filas else None
+            d["mb_por_s"] = m.bytes / (1 << 20) / m.segundos if m.segundos and m.bytes else None
+            resultado[etapa] = d
+        return resultado
+
+
+def _sin_marca(etapa: str, bytes: int = 0, filas: int = 0) -> None:
+    """`marcar` de los motores cuando no se pasa un colector."""
+
+
+# --- Progreso ------------------------------------------------------------------
+def _formatear_progreso(estado: Dict[str, Optional[float]]) -> str:
+    """Línea de estado de `ReporteProgreso` para la terminal."""
+    partes = []
+    if estado["porcentaje"] is not None:
+        partes.append(f"{estado['porcentaje']:5.1f}%")
+    partes.append(f"{int(estado['filas']):,} filas")
+    partes.append(f"{estado['filas_por_s']:,.0f} filas/s")
+    partes.append(f"{estado['mb_por_s']:.1f} MB/s")
+    if estado["eta_s"] is not None:
+        minutos, segundos = divmod(int(estado["eta_s"] + 0.5), 60)
+        partes.append(f"ETA {minutos}:{segundos:02d}")
+    return " | ".join(partes)
+
+
+class ReporteProgreso:
+    """
+    Reporte opcional de avance para análisis largos, basado en posiciones de
+    bytes del archivo.
+
+    Los motores solo suman bytes y filas una vez por bloque o chunk. Un hilo
+    aparte lee esos contadores cada `intervalo` segundos y publica porcentaje,
+    filas/s, MB/s y ETA, así que el bucle principal no hace I/O de terminal.
+    El total es el tamaño del archivo, de modo que no hace falta contar las
+    filas antes de empezar. Con archivos comprimidos el tamaño descomprimido
+    no se conoce: se reportan filas y throughput sin porcentaje ni ETA.
+
+    Args:
+        intervalo (float): Segundos entre reportes. Default: 0.5
+        salida (Optional[Callable[[dict], None]]): Recibe cada estado (ver
+            `estado`). Default: una línea que se reescribe en stderr
+
+    Example:
+        >>> analizar_ventas_streaming("ventas.csv", progreso=ReporteProgreso())
+         42.0% | 4,200,000 filas | 1,050,000 filas/s | 26.1 MB/s | ETA 0:05
+    """
+
+    def __init__(self, intervalo: float = 0.5,
+                 salida: Optional[Callable[[Dict[str, Optional[float]]], None]] = None):
+        self.intervalo = intervalo
+        self.salida = salida or self._a_stderr
+        self.total_bytes: Optional[int] = None
+        self.bytes = 0
+        self.filas = 0
+        self._t0 = 0.0
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _a_stderr(estado: Dict[str, Optional[float]]) -> None:
+        fin = "\n" if estado["final"] else ""
+        sys.stderr.write(f"\r{_formatear_progreso(estado)}\033[K{fin}")
+        sys.stderr.flush()
+
+    def avanzar(self, bytes: int, filas: int = 0) -> None:
+        """Suma `bytes` leídos y `filas` procesadas (llamar por bloque, no por fila)."""
+        self.bytes += bytes
+        self.filas += filas
+
+    def posicionar(self, offset: int, filas: int = 0) -> None:
+        """Fija la posición absoluta en el archivo y suma `filas`."""
+        self.bytes = offset
+        self.filas += filas
+
+    def contar_bloques(self, bloques: Iterable[bytes]) -> Iterator[bytes]:
+        """Pasa los bloques de líneas sin cambios, contando bytes y saltos de línea."""
+        for bloque in bloques:
+            self.avanzar(len(bloque), bloque.count(b"\n"))
+            yield bloque
+
+    def estado(self, final: bool = False) -> Dict[str, Optional[float]]:
+        """
+        Foto del avance.
+
+        Returns:
+            dict: bytes, filas, transcurrido_s, filas_por_s, mb_por_s,
+            porcentaje y eta_s (None sin total conocido) y final
+        """
+        transcurrido = max(time.perf_counter() - self._t0, 1e-9)
+        bytes_, filas = self.bytes, self.filas
+        porcentaje = eta = None
+        if self.total_bytes:
+            fraccion = min(1.0, bytes_ / self.total_bytes)
+            porcentaje = 100.0 if final else 100 * fraccion
+            eta = 0.0 if final or fraccion >= 1 else (
+                transcurrido * (1 - fraccion) / fraccion if fraccion > 0 else None)
+        return {
+            "bytes": bytes_,
+            "filas": filas,
+            "transcurrido_s": transcurrido,
+            "filas_por_s": filas / transcurrido,
+            "mb_por_s": bytes_ / (1 << 20) / transcurrido,
+            "porcentaje": porcentaje,
+            "eta_s": eta,
+            "final": final,
+        }
+
+    def _bucle(self) -> None:
+        while not self._detener.wait(self.intervalo):
+            self.salida(self.estado())
+
+    @contextmanager
+    def seguir(self, nombre_archivo: str):
+        """
+        Reinicia los contadores para `nombre_archivo` y reporta desde un hilo
+        mientras dura el bloque `with`; al salir publica el estado final.
+        """
+        self.total_bytes = None if _tipo_compresion(nombre_archivo) else os.path.getsize(nombre_archivo)
+        self.bytes = self.filas = 0
+        self._t0 = time.perf_counter()
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle, name="progreso", daemon=True)
+        self._hilo.start()
+        try:
+            yield self
+        finally:
+            self._detener.set()
+            self._hilo.join()
+            self._hilo = None
+        self.salida(self.estado(final=True))
+
+
+# --- Estimadores aproximados -----------------------------------------------
+_MASCARA_64 = (1 << 64) - 1
+
+
+def _hash64_entero(x: int) -> int:
+    """Mezcla splitmix64: hash de 64 bits estable entre procesos para enteros."""
+    x = (x + 0x9E3779B97F4A7C15) & _MASCARA_64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASCARA_64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASCARA_64
+    return x ^ (x >> 31)
+
+
+def _hash64_texto(texto: str) -> int:
+    """Hash de 64 bits estable entre procesos (a diferencia de `hash()`)."""
+    return int.from_bytes(hashlib.blake2b(texto.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+@dataclass
+class SketchCuantiles:
+    """
+    Sketch de cuantiles con error relativo acotado (estilo DDSketch).
+
+    Cada valor positivo cae en el bin `ceil(log_gamma(x))`, con
+    `gamma = (1 + error) / (1 - error)`, y el cuantil se reconstruye desde el
+    centro del bin, así que cualquier cuantil tiene error relativo
+    ≤ `error_relativo`. La memoria está acotada por `max_bins`: si se supera,
+    los bins más bajos se fusionan (solo pierden precisión los cuantiles
+    inferiores). Combinar dos sketches es sumar sus bins.
+
+    Attributes:
+        error_relativo (float): Error relativo máximo de los cuantiles
+        max_bins (int): Cantidad máxima de bins en memoria
+        bins (Dict[int, int]): Conteo por índice de bin
+        ceros (int): Valores menores o iguales a cero
+        n (int): Total de valores agregados
+    """
+    error_relativo: float = 0.01
+    max_bins: int = 2048
+    bins: Dict[int, int] = field(default_factory=dict)
+    ceros: int = 0
+    n: int = 0
+
+    def __post_init__(self):
+        if not 0 < self.error_relativo < 1:
+            raise ValueError("error_relativo debe estar entre 0 y 1")
+        self._gamma = (1 + self.error_relativo) / (1 - self.error_relativo)
+        self._inv_log_gamma = 1.0 / math.log(self._gamma)
+
+    def agregar(self, x: float) -> None:
+        """Agrega un valor al sketch."""
+        self.n += 1
+        if x <= 0:
+            self.ceros += 1
+            return
+        i = math.ceil(math.log(x) * self._inv_log_gamma)
+        bins = self.bins
+        bins[i] = bins.get(i, 0) + 1
+        if len(bins) > self.max_bins:
+            self._colapsar()
+
+    def _colapsar(self) -> None:
+        """Fusiona los bins más bajos hasta respetar `max_bins`."""
+        indices = sorted(self.bins)
+        sobrantes = len(indices) - self.max_bins
+        if sobrantes <= 0:
+            return
+        destino = indices[sobrantes]
+        self.bins[destino] += sum(self.bins.pop(i) for i in indices[:sobrantes])
+
+    def combinar(self, otro: "SketchCuantiles") -> "SketchCuantiles":
+        """Acumula `otro` (con el mismo error relativo) y devuelve este sketch."""
+        if otro.error_relativo != self.error_relativo:
+            raise ValueError("Solo se pueden combinar sketches con el mismo error_relativo")
+        for i, c in otro.bins.items():
+            self.bins[i] = self.bins.get(i, 0) + c
+        self.ceros += otro.ceros
+        self.n += otro.n
+        self._colapsar()
+        return self
+
+    def cuantil(self, q: float) -> float:
+        """
+        Estima el cuantil `q` (0 ≤ q ≤ 1).
+
+        Returns:
+            float: Valor estimado, o 0.0 si el sketch está vacío
+        """
+        if self.n == 0:
+            return 0.0
+        rango = q * (self.n - 1)
+        acumulado = self.ceros
+        if acumulado > rango:
+            return 0.0
+        for i in sorted(self.bins):
+            acumulado += self.bins[i]
+            if acumulado > rango:
+                return 2 * self._gamma ** i / (self._gamma + 1)
+        return 2 * self._gamma ** max(self.bins) / (self._gamma + 1)
+
+
+@dataclass
+class ContadorDistintos:
+    """
+    Contador aproximado de valores distintos (HyperLogLog).
+
+    Usa `2 ** precision` registros de un byte: la memoria es fija y el error
+    estándar relativo es ~`1.04 / sqrt(2 ** precision)` (0.81% con la
+    precisión por defecto, 16 KiB). Los hashes son estables entre procesos,
+    así que combinar dos contadores (máximo por registro) equivale a haber
+    contado la unión.
+
+    Attributes:
+        precision (int): Bits de índice de registro (4 a 18)
+        registros (bytearray): Máximo rango observado por registro
+    """
+    precision: int = 14
+    registros: Optional[bytearray] = field(default=None, repr=False)
+
+    def __post_init__(self):
+        if not 4 <= self.precision <= 18:
+            raise ValueError("precision debe estar entre 4 y 18")
+        if self.registros is None:
+            self.registros = bytearray(1 << self.precision)
+
+    @classmethod
+    def desde_error(cls, error: float) -> "ContadorDistintos":
+        """Crea un contador con el error estándar relativo pedido (o menor)."""
+        precision = math.ceil(math.log2((1.04 / error) ** 2))
+        return cls(precision=min(18, max(4, precision)))
+
+    @property
+    def error_estandar(self) -> float:
+        """Error estándar relativo teórico del estimador."""
+        return 1.04 / math.sqrt(len(self.registros))
+
+    def agregar_hash(self, h: int) -> None:
+        """Agrega un valor ya hasheado a 64 bits."""
+        p = self.precision
+        idx = h >> (64 - p)
+        resto = h & ((1 << (64 - p)) - 1)
+        rango = (64 - p) - resto.bit_length() + 1
+        if rango > self.registros[idx]:
+            self.registros[idx] = rango
+
+    def agregar(self, valor) -> None:
+        """Agrega un entero o un string."""
+        self.agregar_hash(_hash64_entero(valor) if isinstance(valor, int) else _hash64_texto(str(valor)))
+
+    def combinar(self, otro: "ContadorDistintos") -> "ContadorDistintos":
+        """Acumula `otro` (misma precisión) y devuelve este contador."""
+        if otro.precision != self.precision:
+            raise ValueError("Solo se pueden combinar contadores con la misma precisión")
+        self.registros = bytearray(map(max, self.registros, otro.registros))
+        return self
+
+    def estimar(self) -> float:
+        """Estimación de la cantidad de valores distintos."""
+        m = len(self.registros)
+        alfa = 0.7213 / (1 + 1.079 / m)
+        estimado = alfa * m * m / sum(2.0 ** -r for r in self.registros)
+        vacios = self.registros.count(0)
+        if estimado <= 2.5 * m and vacios:
+            return m * math.log(m / vacios)
+        return estimado
+
+
+@dataclass
+class EstimadoresVentas:
+    """
+    Estimadores de memoria acotada que acompañan al análisis streaming/paralelo.
+
+    Attributes:
+        tickets (SketchCuantiles): Cuantiles de `Precio_Unitario * Cantidad`
+        productos (ContadorDistintos): Productos distintos
+        ids (ContadorDistintos): ID_Venta distintos
+    """
+    tickets: SketchCuantiles = field(default_factory=SketchCuantiles)
+    productos: ContadorDistintos = field(default_factory=ContadorDistintos)
+    ids: ContadorDistintos = field(default_factory=ContadorDistintos)
+
+    @classmethod
+    def con_errores(cls, error_cuantiles: float = 0.01, error_distintos: float = 0.01) -> "EstimadoresVentas":
+        """Crea los estimadores a partir de las cotas de error deseadas."""
+        return cls(SketchCuantiles(error_relativo=error_cuantiles),
+                   ContadorDistintos.desde_error(error_distintos),
+                   ContadorDistintos.desde_error(error_distintos))
+
+    def vacio(self) -> "EstimadoresVentas":
+        """Estimadores vacíos con la misma configuración (para cada worker)."""
+        return EstimadoresVentas(
+            SketchCuantiles(self.tickets.error_relativo, self.tickets.max_bins),
+            ContadorDistintos(self.productos.precision),
+            ContadorDistintos(self.ids.precision),
+        )
+
+    def agregador(self):
+        """
+        Devuelve una función `(id, producto, total) -> None` para el bucle caliente.
+
+        Cachea el hash de cada nombre de producto (hay pocos distintos) para
+        no recalcularlo por fila; la cache se vacía si crece demasiado.
+        """
+        agregar_ticket = self.tickets.agregar
+        agregar_id = self.ids.agregar_hash
+        agregar_producto = self.productos.agregar_hash
+        hashes: Dict[str, int] = {}
+
+        def agregar(id_venta: int, producto: str, total: float) -> None:
+            agregar_ticket(total)
+            agregar_id(_hash64_entero(id_venta))
+            h = hashes.get(producto)
+            if h is None:
+                if len(hashes) >= 4096:
+                    hashes.clear()
+                h = hashes[producto] = _hash64_texto(producto)
+            agregar_producto(h)
+
+        return agregar
+
+    def combinar(self, otro: "EstimadoresVentas") -> "EstimadoresVentas":
+        """Acumula los estimadores de `otro` y devuelve este objeto."""
+        self.tickets.combinar(otro.tickets)
+        self.productos.combinar(otro.productos)
+        self.ids.combinar(otro.ids)
+        return self
+
+    def resumen(self) -> Dict[str, float]:
+        """Percentiles 50/95/99 del ticket y cantidades distintas estimadas."""
+        return {
+            "ticket_p50": self.tickets.cuantil(0.50),
+            "ticket_p95": self.tickets.cuantil(0.95),
+            "ticket_p99": self.tickets.cuantil(0.99),
+            "productos_distintos": self.productos.estimar(),
+            "ids_distintos": self.ids.estimar(),
+        }
+
+
 def generar_csv_ventas(nombre_archivo: str = "ventas.csv", num_registros: int = 10_000,
                        productos: Optional[Iterable[str]] = None,
                        seed: Optional[int] = 42) -> str:
@@ -98,11 +827,15 @@ def generar_csv_ventas(nombre_archivo: str = "ventas.csv", num_registros: int =
 
     cabeceras = ["ID_Venta", "Producto", "Precio_Unitario", "Cantidad"]
 
+    # La lista se arma una sola vez: la secuencia generada es la misma que
+    # al reconstruirla en cada fila, pero sin el costo O(productos) por fila.
+    productos = list(productos)
+
     with open(nombre_archivo, mode="w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
         writer.writerow(cabeceras)
         for i in range(1, num_registros + 1):
-            producto = random.choice(list(productos))
+            producto = random.choice(productos)
             precio = round(random.uniform(20.50, 850.99), 2)
             cantidad = random.randint(1, 10)
             writer.writerow([i, producto, precio, cantidad])
@@ -110,16 +843,740 @@ def generar_csv_ventas(nombre_archivo: str = "ventas.csv", num_registros: int =
     return nombre_archivo
 
 
-def _iter_csv_filas(nombre_archivo: str) -> Iterable[Tuple[int, str, float, int]]:
+# --- Generación masiva --------------------------------------------------------
+# Las filas se generan por segmentos de IDs consecutivos, cada uno con su
+# propio `random.Random` sembrado a partir de (seed, índice de segmento). Así
+# el contenido no depende de cuántos shards/procesos lo generen.
+_FILAS_POR_SEGMENTO = 1 << 16
+_CABECERA_CSV = "ID_Venta,Producto,Precio_Unitario,Cantidad\n"
+# Todos los precios posibles (20.50 a 850.99) ya formateados: elegir uno es
+# tan barato como elegir un producto.
+_PRECIOS_TXT = tuple("%d.%02d" % divmod(c, 100) for c in range(2050, 85100))
+_CANTIDADES_TXT = tuple(str(c) for c in range(1, 11))
+
+
+def _semilla_derivada(seed: int, indice: int) -> int:
+    """Semilla de 64 bits reproducible para el segmento `indice` de `seed`."""
+    digest = hashlib.sha256(f"{seed}:{indice}".encode("ascii")).digest()
+    return int.from_bytes(digest[:8], "little")
+
+
+def _producto_csv(nombre: str) -> str:
+    """Nombre de producto escapado según las reglas de CSV."""
+    if any(c in nombre for c in ',"\r\n'):
+        return '"' + nombre.replace('"', '""') + '"'
+    return nombre
+
+
+def _tabla_bytes(textos: List[bytes]):
+    """
+    Textos como arreglo 1-D de registros `void` de ancho fijo, rellenos con
+    bytes nulos: `np.take` sobre registros es mucho más rápido que indexar
+    una matriz 2-D fila por fila.
+    """
+    ancho = max(1, max(len(t) for t in textos))
+    tabla = _np.zeros((len(textos), ancho), dtype=_np.uint8)
+    for i, t in enumerate(textos):
+        tabla[i, :len(t)] = _np.frombuffer(t, dtype=_np.uint8)
+    return tabla.view(f"V{ancho}").ravel()
+
+
+def _tablas_generador(productos: List[str]):
+    """Tablas de `_segmento_numpy`: ",producto,", "precio," y "cantidad\\n"."""
+    return (_tabla_bytes([f",{p},".encode("utf-8") for p in productos]),
+            _tabla_bytes([f"{t},".encode("ascii") for t in _PRECIOS_TXT]),
+            _tabla_bytes([f"{t}\n".encode("ascii") for t in _CANTIDADES_TXT]))
+
+
+def _segmento_numpy(primero: int, k: int, tablas, semilla: int) -> bytes:
     """
-    Generador que lee un CSV línea por línea con conversión automática de tipos.
+    Filas `primero`..`primero + k - 1` formateadas sin bucle por fila.
 
-    Esta función auxiliar implementa un generador que lee el archivo CSV
-    de forma iterativa (streaming), convirtiendo cada campo al tipo apropiado.
-    Esto permite procesar archivos grandes sin cargarlos completamente en memoria.
+    Producto, precio y cantidad se sortean como índices en tablas de texto
+    ya formateado (`_tablas_generador`); solo los dígitos del ID se
+    calculan. Cada campo ocupa una franja de ancho fijo de una matriz de
+    bytes, con relleno nulo (también los ceros a la izquierda del ID), y
+    quitar los nulos en orden por filas da el texto del segmento.
+    """
+    rng = _np.random.Generator(_np.random.PCG64(semilla))
+    indices = [rng.integers(0, len(tabla), k) for tabla in tablas]
+
+    ancho = len(str(primero + k - 1))
+    potencias = (10 ** _np.arange(ancho - 1, -1, -1, dtype=_np.int64)).astype(_np.uint32)
+    ids = _np.arange(primero, primero + k, dtype=_np.uint32)[:, None]
+    anchos = [ancho] + [tabla.itemsize for tabla in tablas]
+    cortes = _np.cumsum([0] + anchos)
+
+    matriz = _np.empty((k, cortes[-1]), dtype=_np.uint8)
+    digitos = matriz[:, :ancho]
+    digitos[:] = ids // potencias % 10 + 48
+    digitos[ids < potencias] = 0
+    digitos[:, -1] = (ids[:, 0] % 10 + 48).astype(_np.uint8)
+    for tabla, elegidos, ini, fin in zip(tablas, indices, cortes[1:], cortes[2:]):
+        matriz[:, ini:fin] = _np.take(tabla, elegidos).view(_np.uint8).reshape(k, fin - ini)
+    return matriz[matriz != 0].tobytes()
+
+
+def _generar_shard(ruta: str, segmentos: range, num_registros: int, productos: List[str],
+                   seed: int, con_cabecera: bool) -> str:
+    """
+    Escribe en `ruta` las filas de los segmentos indicados.
+
+    Cada segmento se arma como un único bloque preformateado y se escribe
+    con una sola llamada a `write`. Con NumPy el bloque se arma por columnas
+    (`_segmento_numpy`); sin NumPy, con `random.choices` sobre los valores
+    ya formateados.
+    """
+    fila = "%d,%s,%s,%s\n"
+    tablas = _tablas_generador(productos) if _np is not None else None
+    with open(ruta, "wb", buffering=1 << 22) as f:
+        if con_cabecera:
+            f.write(_CABECERA_CSV.encode("ascii"))
+        for segmento in segmentos:
+            primero = segmento * _FILAS_POR_SEGMENTO + 1
+            k = min(_FILAS_POR_SEGMENTO, num_registros - primero + 1)
+            semilla = _semilla_derivada(seed, segmento)
+            if _np is not None:
+                f.write(_segmento_numpy(primero, k, tablas, semilla))
+                continue
+            rnd = random.Random(semilla)
+            columnas = zip(range(primero, primero + k),
+                           rnd.choices(productos, k=k),
+                           rnd.choices(_PRECIOS_TXT, k=k),
+                           rnd.choices(_CANTIDADES_TXT, k=k))
+            f.write("".join(map(fila.__mod__, columnas)).encode("utf-8"))
+    return ruta
+
+
+def generar_csv_ventas_bulk(nombre_archivo: str = "ventas.csv", num_registros: int = 10_000,
+                            productos: Optional[Iterable[str]] = None,
+                            seed: Optional[int] = 42, shards: int = 1,
+                            separar: bool = False) -> List[str]:
+    """
+    Genera un CSV sintético grande escribiendo bloques preformateados.
+
+    Misma estructura de columnas que `generar_csv_ventas`, pero en lugar de
+    una llamada a `writer.writerow` por fila arma segmentos de
+    `_FILAS_POR_SEGMENTO` filas y los escribe de una vez. Con NumPy cada
+    segmento se sortea y se formatea por columnas (ver `_segmento_numpy`);
+    sin NumPy se usa `random.choices` sobre valores ya formateados. Con
+    `shards > 1` los segmentos se reparten entre procesos.
+
+    Args:
+        nombre_archivo (str): Ruta del archivo CSV a crear. Default: "ventas.csv"
+        num_registros (int): Cantidad de registros a generar. Default: 10,000
+        productos (Optional[Iterable[str]]): Lista de nombres de productos.
+            Si es None, usa PRODUCTOS_PREDETERMINADOS.
+        seed (Optional[int]): Semilla base. Cada segmento usa una semilla
+            derivada, por lo que el contenido es el mismo para cualquier
+            valor de `shards`. Si es None, la salida no es reproducible.
+            Default: 42
+        shards (int): Procesos que generan en paralelo. Default: 1
+        separar (bool): Si es True deja un archivo por shard
+            (`ventas.part000.csv`, ... cada uno con cabecera); si es False
+            concatena los shards en `nombre_archivo`. Default: False
+
+    Returns:
+        List[str]: Rutas de los archivos generados
+
+    Note:
+        Los precios se escriben siempre con dos decimales y las líneas
+        terminan en `\\n`. La secuencia aleatoria no es la misma que la de
+        `generar_csv_ventas` para la misma semilla, y con una misma semilla
+        el contenido depende de si NumPy está disponible (la distribución
+        de cada columna es la misma).
+    """
+    nombres = [_producto_csv(p) for p in (productos if productos is not None else PRODUCTOS_PREDETERMINADOS)]
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+
+    num_segmentos = -(-num_registros // _FILAS_POR_SEGMENTO)
+    shards = max(1, min(shards, num_segmentos or 1))
+    cortes = [num_segmentos * i // shards for i in range(shards + 1)]
+
+    raiz, ext = os.path.splitext(nombre_archivo)
+    rutas = [f"{raiz}.part{i:03d}{ext or '.csv'}" for i in range(shards)]
+    if shards == 1 and not separar:
+        rutas = [nombre_archivo]
+    tareas = [
+        (ruta, range(cortes[i], cortes[i + 1]), num_registros, nombres, seed, separar or shards == 1)
+        for i, ruta in enumerate(rutas)
+    ]
+
+    if shards == 1:
+        _generar_shard(*tareas[0])
+    else:
+        with ProcessPoolExecutor(max_workers=shards) as pool:
+            for futuro in [pool.submit(_generar_shard, *t) for t in tareas]:
+                futuro.result()
+
+    if separar or shards == 1:
+        return rutas
+
+    with open(nombre_archivo, "wb") as out:
+        out.write(_CABECERA_CSV.encode("ascii"))
+        for ruta in rutas:
+            with open(ruta, "rb") as parte:
+                shutil.copyfileobj(parte, out, 1 << 24)
+            os.remove(ruta)
+    return [nombre_archivo]
+
+
+# Tamaño de cada bloque leído por el escáner de bytes: suficiente para
+# amortizar el costo por bloque sin que la memoria dependa del archivo.
+_TAM_BLOQUE_LECTURA = 1 << 20
+
+_COLUMNAS_REQUERIDAS = ("ID_Venta", "Producto", "Precio_Unitario", "Cantidad")
+
+
+def _columnas_desde_cabecera(cabecera: bytes) -> Tuple[int, int, int, int]:
+    """
+    Resuelve una sola vez la posición de cada columna requerida en la cabecera.
+
+    Returns:
+        Tuple[int, int, int, int]: Índices de (ID_Venta, Producto,
+            Precio_Unitario, Cantidad)
+
+    Raises:
+        KeyError: Si falta alguna columna requerida
+    """
+    nombres = next(csv.reader([cabecera.decode("utf-8")]), [])
+    posiciones = {nombre.strip(): i for i, nombre in enumerate(nombres)}
+    try:
+        return tuple(posiciones[col] for col in _COLUMNAS_REQUERIDAS)
+    except KeyError as e:
+        raise KeyError(f"Columna requerida ausente en el CSV: {e.args[0]}") from None
+
+
+@contextmanager
+def _mapear_archivo(nombre_archivo: str):
+    """
+    Context manager que mapea el archivo en memoria de solo lectura.
+
+    Un archivo vacío no puede mapearse, así que en ese caso devuelve `b""`,
+    que admite las mismas operaciones (`find`, slicing) que usa el escáner.
+    """
+    with open(nombre_archivo, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+def _bloques_de_lineas(datos, inicio: int, fin: int, tam: int = _TAM_BLOQUE_LECTURA) -> Iterator[bytes]:
+    """
+    Recorre `datos[inicio:fin]` en bloques que terminan en salto de línea.
+
+    Args:
+        datos: `mmap` (o `bytes`) con el contenido del archivo
+        inicio (int): Offset del primer byte, al comienzo de una línea
+        fin (int): Offset final (exclusivo), al comienzo de una línea o EOF
+        tam (int): Tamaño aproximado de cada bloque en bytes.
+            Default: `_TAM_BLOQUE_LECTURA`
+
+    Yields:
+        bytes: Bloques de ~`tam` bytes con líneas completas
+    """
+    pos = inicio
+    tam = max(1, tam)
+    while pos < fin:
+        corte = pos + tam
+        if corte < fin:
+            nl = datos.find(b"\n", corte - 1, fin)
+            corte = fin if nl < 0 else nl + 1
+        else:
+            corte = fin
+        yield datos[pos:corte]
+        pos = corte
+
+
+def _ancho_medio_fila(datos, inicio: int, muestra: int = 1 << 16) -> float:
+    """Bytes promedio por fila, estimados sobre los primeros `muestra` bytes."""
+    trozo = datos[inicio:inicio + muestra]
+    lineas = trozo.count(b"\n")
+    return len(trozo) / lineas if lineas else float(max(1, len(trozo)))
+
+
+def _centavos(texto) -> int:
+    """
+    Convierte un precio decimal en texto (`bytes` o `str`) a centavos enteros.
+
+    No pasa por `float`: el caso habitual ("123.45") se resuelve quitando el
+    punto y llamando a `int`. Acepta signo y hasta dos decimales ("7",
+    "7.5"); más decimales solo si son ceros.
+
+    Raises:
+        ValueError: Si el texto no es un decimal válido o tiene fracciones
+            de centavo
+    """
+    if texto[-3:-2] in (b".", ".") and texto[-2:].isdigit():
+        return int(texto[:-3] + texto[-2:])
+    if isinstance(texto, bytes):
+        texto = texto.decode("ascii")
+    entero, punto, decimales = texto.strip().rpartition(".")
+    if not punto:
+        return int(decimales) * 100
+    if len(decimales) > 2 and decimales[2:].strip("0"):
+        raise ValueError(f"Precio con fracciones de centavo: {texto!r}")
+    decimales = (decimales[:2] + "00")[:2]
+    if not decimales.isdigit():
+        raise ValueError(f"Precio inválido: {texto!r}")
+    signo = -1 if entero.startswith("-") else 1
+    return int(entero if entero.strip("+-") else "0") * 100 + signo * int(decimales)
+
+
+_RE_PRECIOS_CENTAVOS = re.compile(rb"[+-]?[0-9]+\.[0-9][0-9](?:\n[+-]?[0-9]+\.[0-9][0-9])*")
+_RE_UN_DECIMAL = re.compile(rb"\.([0-9])(?=\n|$)")
+_RE_SIN_DECIMALES = re.compile(rb"(?m)^([+-]?[0-9]+)$")
+
+
+def _precios_centavos(textos: List[bytes]) -> List[int]:
+    """
+    Centavos enteros de una columna de precios en texto.
+
+    La columna se une en un solo `bytes`, se normaliza a dos decimales con
+    dos sustituciones de regex y, si toda la columna es válida (otra regex),
+    se quitan los puntos de una vez y se convierte con `int`. Si no (espacios,
+    ceros extra, valores inválidos) se usa `_centavos` precio por precio.
+    """
+    unidos = b"\n".join(textos) if textos and isinstance(textos[0], bytes) else b""
+    if unidos and not _RE_PRECIOS_CENTAVOS.fullmatch(unidos):
+        # Normaliza "7.5" -> "7.50" y "7" -> "7.00" sobre toda la columna
+        unidos = _RE_UN_DECIMAL.sub(rb".\g<1>0", unidos)
+        unidos = _RE_SIN_DECIMALES.sub(rb"\g<1>.00", unidos)
+    if unidos and _RE_PRECIOS_CENTAVOS.fullmatch(unidos):
+        return list(map(int, unidos.replace(b".", b"").split(b"\n")))
+    return list(map(_centavos, textos))
+
+
+def _filas_centavos(bloques: Iterable[bytes], columnas: Tuple[int, int, int, int],
+                    filtro: Optional[FiltroVentas] = None) -> Iterator[Tuple[int, str, int, int]]:
+    """
+    Variante de `_filas_de_bloques` que devuelve el precio en centavos (`int`).
+
+    Trabaja por columnas: cada bloque se separa con un único `split` (ver
+    `_columnas_de_bloque_numpy`) y la columna de precios se convierte en
+    bloque con `_precios_centavos`. Con `filtro`, el producto se evalúa
+    antes de convertir los demás campos.
+    """
+    nombres: Dict[bytes, str] = {}
+    pmin, pmax = filtro.limites_centavos if filtro is not None else (-math.inf, math.inf)
+    imin, imax = filtro.limites_id if filtro is not None else (-math.inf, math.inf)
+    for bloque in bloques:
+        fin_linea = bloque.find(b"\n")
+        num_columnas = bloque[:fin_linea if fin_linea >= 0 else len(bloque)].count(b",") + 1
+        ids, prods, precios, cantidades = _columnas_de_bloque_numpy(bloque, columnas, num_columnas)
+        for prod in dict.fromkeys(prods):
+            if prod not in nombres:
+                nombres[prod] = sys.intern(prod.decode("utf-8"))
+        if filtro is not None and filtro.productos is not None:
+            mascara = [nombres[p] in filtro.productos for p in prods]
+            ids, prods, precios, cantidades = (list(compress(c, mascara))
+                                               for c in (ids, prods, precios, cantidades))
+        filas = zip(map(int, ids), map(nombres.__getitem__, prods),
+                    _precios_centavos(precios), map(int, cantidades))
+        if filtro is None or (filtro.precio_min is None and filtro.precio_max is None
+                              and filtro.id_min is None and filtro.id_max is None):
+            yield from filas
+        else:
+            for fila in filas:
+                if pmin <= fila[2] <= pmax and imin <= fila[0] <= imax:
+                    yield fila
+
+
+def _filas_de_bloques(bloques: Iterable[bytes], columnas: Tuple[int, int, int, int],
+                      filtro: Optional[FiltroVentas] = None, centavos: bool = False
+                      ) -> Iterator[Tuple[int, str, float, int]]:
+    """
+    Convierte bloques de líneas CSV en tuplas tipadas sin pasar por dicts.
+
+    Cada línea se separa con `bytes.split` y los campos numéricos se
+    convierten directamente desde `bytes` (`int()`/`float()` los aceptan).
+    Los nombres de producto se decodifican e internan una sola vez por valor
+    distinto, así que todas las filas de un producto comparten el mismo `str`.
+
+    Los bloques que contienen comillas se delegan a `csv.reader` para
+    respetar campos entrecomillados; el generador de este módulo nunca las
+    produce, por lo que en la práctica ese camino no se usa.
+
+    Args:
+        bloques (Iterable[bytes]): Bloques de líneas completas
+        columnas (Tuple[int, int, int, int]): Índices de (ID_Venta, Producto,
+            Precio_Unitario, Cantidad) según `_columnas_desde_cabecera`
+        filtro (Optional[FiltroVentas]): Si se indica, solo se devuelven las
+            filas que lo cumplen (ver `_filas_filtradas`)
+        centavos (bool): Si es True el precio se devuelve como `int` en
+            centavos, sin pasar por `float` (ver `_filas_centavos`)
+
+    Yields:
+        Tuple[int, str, float, int]: (ID_Venta, Producto, Precio_Unitario, Cantidad)
+    """
+    if centavos:
+        yield from _filas_centavos(bloques, columnas, filtro if filtro is not None and filtro.activo else None)
+        return
+    if filtro is not None and filtro.activo:
+        yield from _filas_filtradas(bloques, columnas, filtro)
+        return
+    i_id, i_prod, i_precio, i_cant = columnas
+    productos: Dict[bytes, str] = {}
+
+    for bloque in bloques:
+        if b"\r" in bloque:
+            bloque = bloque.replace(b"\r\n", b"\n")
+
+        if b'"' in bloque:
+            for campos in csv.reader(bloque.decode("utf-8").splitlines()):
+                if campos:
+                    yield (int(campos[i_id]), sys.intern(campos[i_prod]),
+                           float(campos[i_precio]), int(campos[i_cant]))
+            continue
+
+        for linea in bloque.split(b"\n"):
+            if not linea:
+                continue
+            campos = linea.split(b",")
+            clave = campos[i_prod]
+            producto = productos.get(clave)
+            if producto is None:
+                producto = productos[clave] = sys.intern(clave.decode("utf-8"))
+            yield (int(campos[i_id]), producto, float(campos[i_precio]), int(campos[i_cant]))
+
+
+def _filas_filtradas(bloques: Iterable[bytes], columnas: Tuple[int, int, int, int],
+                     filtro: FiltroVentas) -> Iterator[Tuple[int, str, float, int]]:
+    """
+    Variante de `_filas_de_bloques` que aplica `filtro` campo por campo.
+
+    El producto se resuelve primero (una consulta al cache de nombres, que
+    también recuerda los rechazados), después el precio y por último el ID:
+    una fila rechazada no convierte los campos que siguen.
+    """
+    i_id, i_prod, i_precio, i_cant = columnas
+    pmin, pmax = filtro.limites_precio
+    imin, imax = filtro.limites_id
+    # False marca un producto rechazado por el filtro
+    productos: Dict[bytes, object] = {}
+    for bloque in bloques:
+        if b"\r" in bloque:
+            bloque = bloque.replace(b"\r\n", b"\n")
+        if b'"' in bloque:
+            for fila in _filas_de_bloques((bloque,), columnas):
+                if filtro.acepta(fila[0], fila[1], fila[2]):
+                    yield fila
+            continue
+        for linea in bloque.split(b"\n"):
+            if not linea:
+                continue
+            campos = linea.split(b",")
+            clave = campos[i_prod]
+            producto = productos.get(clave)
+            if producto is None:
+                nombre = sys.intern(clave.decode("utf-8"))
+                producto = productos[clave] = nombre if filtro.acepta_producto(nombre) else False
+            if producto is False:
+                continue
+            precio = float(campos[i_precio])
+            if not pmin <= precio <= pmax:
+                continue
+            id_venta = int(campos[i_id])
+            if not imin <= id_venta <= imax:
+                continue
+            yield (id_venta, producto, precio, int(campos[i_cant]))
+
+
+# --- Entrada comprimida -------------------------------------------------------
+# Los archivos .gz/.bz2/.xz se detectan por sus bytes mágicos y se
+# descomprimen en un hilo aparte (zlib, bz2 y lzma liberan el GIL), de modo
+# que la descompresión se solapa con el parseo.
+_MAGIAS_COMPRESION = ((b"\x1f\x8b", "gz"), (b"BZh", "bz2"), (b"\xfd7zXZ\x00", "xz"))
+_MODULOS_COMPRESION = {"gz": gzip, "bz2": bz2, "xz": lzma}
+_TAM_BLOQUE_DESCOMPRESION = 4 << 20
+_BLOQUES_EN_VUELO = 8
+_MAGIA_MIEMBRO_GZIP = b"\x1f\x8b\x08"
+
+
+def _tipo_compresion(nombre_archivo: str) -> Optional[str]:
+    """Devuelve "gz", "bz2", "xz" o None según los primeros bytes del archivo."""
+    with open(nombre_archivo, "rb") as f:
+        inicio = f.read(6)
+    for magia, tipo in _MAGIAS_COMPRESION:
+        if inicio.startswith(magia):
+            return tipo
+    return None
+
+
+class _LectorEnHilo(io.RawIOBase):
+    """
+    Flujo binario de solo lectura alimentado desde un hilo productor.
+
+    El hilo recorre `productor()` (un iterador de bloques de bytes) y los
+    deja en una cola acotada a `_BLOQUES_EN_VUELO` bloques; `readinto` los
+    consume. Las excepciones del productor se relanzan en el lector.
+    """
+
+    _FIN = object()
+
+    def __init__(self, productor: Callable[[], Iterator[bytes]]):
+        super().__init__()
+        self._cola: "queue.Queue" = queue.Queue(maxsize=_BLOQUES_EN_VUELO)
+        self._detener = threading.Event()
+        self._bloque = b""
+        self._pos = 0
+        self._leidos = 0
+        self._agotado = False
+        self._hilo = threading.Thread(target=self._producir, args=(productor,), daemon=True)
+        self._hilo.start()
+
+    def _poner(self, item) -> bool:
+        while not self._detener.is_set():
+            try:
+                self._cola.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _producir(self, productor) -> None:
+        try:
+            for bloque in productor():
+                if not self._poner(bloque):
+                    return
+            self._poner(self._FIN)
+        except BaseException as e:  # se propaga al consumidor
+            self._poner(e)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while self._pos >= len(self._bloque):
+            if self._agotado:
+                return 0
+            item = self._cola.get()
+            if item is self._FIN:
+                self._agotado = True
+                return 0
+            if isinstance(item, BaseException):
+                self._agotado = True
+                raise item
+            self._bloque, self._pos = item, 0
+        n = min(len(b), len(self._bloque) - self._pos)
+        b[:n] = self._bloque[self._pos:self._pos + n]
+        self._pos += n
+        self._leidos += n
+        return n
+
+    def tell(self) -> int:
+        """Bytes descomprimidos entregados hasta ahora (no es seekable)."""
+        return self._leidos
+
+    def close(self) -> None:
+        self._detener.set()
+        self._hilo.join()
+        super().close()
+
+
+def _bloques_descomprimidos(nombre_archivo: str, tipo: str) -> Iterator[bytes]:
+    """Descomprime secuencialmente en bloques de `_TAM_BLOQUE_DESCOMPRESION`."""
+    with _MODULOS_COMPRESION[tipo].open(nombre_archivo, "rb") as f:
+        while True:
+            bloque = f.read(_TAM_BLOQUE_DESCOMPRESION)
+            if not bloque:
+                return
+            yield bloque
+
+
+def _candidatos_miembros_gzip(datos) -> List[int]:
+    """
+    Offsets donde podría empezar un miembro gzip.
+
+    Busca la firma `1f 8b 08` y descarta las que tienen bits reservados de
+    FLG encendidos (inválidos según RFC 1952).
+    Pueden quedar falsos positivos dentro de datos comprimidos; los
+    resuelve `_bloques_gzip_paralelo`.
+    """
+    candidatos = []
+    i = datos.find(_MAGIA_MIEMBRO_GZIP)
+    while i >= 0:
+        if i + 10 <= len(datos) and not datos[i + 3] & 0xE0:
+            candidatos.append(i)
+        i = datos.find(_MAGIA_MIEMBRO_GZIP, i + 1)
+    return candidatos
+
+
+def _inflar_segmento(datos, inicio: int, fin: int):
+    """Descomprime `datos[inicio:fin]` como comienzo de un miembro gzip."""
+    d = zlib.decompressobj(31)
+    try:
+        return d.decompress(datos[inicio:fin]), d
+    except zlib.error:
+        return None, None
+
+
+def _bloques_gzip_paralelo(nombre_archivo: str, hilos: int) -> Iterator[bytes]:
+    """
+    Descomprime en paralelo los miembros de un gzip multi-miembro.
+
+    Cada segmento entre candidatos consecutivos se infla en un pool de
+    hilos (a lo sumo `2 * hilos` por delante del consumidor). Si un
+    segmento no llega al final de su miembro (el corte siguiente era un
+    falso positivo), se sigue alimentando el mismo descompresor con los
+    segmentos siguientes, así que el resultado es siempre correcto y los
+    falsos positivos solo cuestan trabajo descartado.
+
+    Lo que se infla fuera del pool (la continuación de un miembro más largo
+    que su segmento, p. ej. un gzip de un solo miembro con firmas falsas
+    en el medio) se entrega en trozos de a lo sumo
+    `_TAM_BLOQUE_DESCOMPRESION` bytes a medida que sale del descompresor:
+    la memoria queda acotada por segmento, no por miembro.
+
+    Yields:
+        bytes: Contenido descomprimido, en orden (varios trozos por miembro)
+
+    Raises:
+        ValueError: Si el archivo está truncado o corrupto
+    """
+    with _mapear_archivo(nombre_archivo) as datos:
+        candidatos = _candidatos_miembros_gzip(datos)
+        if len(candidatos) < 2 or candidatos[0] != 0:
+            yield from _bloques_descomprimidos(nombre_archivo, "gz")
+            return
+        segmentos = list(zip(candidatos, candidatos[1:] + [len(datos)]))
+
+        with ThreadPoolExecutor(max_workers=hilos) as pool:
+            futuros: Dict[int, object] = {}
+
+            def resultado(k):
+                for j in range(k, min(len(segmentos), k + 2 * hilos)):
+                    if j not in futuros:
+                        futuros[j] = pool.submit(_inflar_segmento, datos, *segmentos[j])
+                return futuros.pop(k).result()
+
+            i = 0
+            while i < len(segmentos):
+                salida, d = resultado(i)
+                if d is None:
+                    raise ValueError(f"Miembro gzip corrupto en el byte {segmentos[i][0]}")
+                if salida:
+                    yield salida
+                while not d.eof:
+                    i += 1
+                    if i == len(segmentos):
+                        raise ValueError("Archivo gzip truncado")
+                    futuros.pop(i, None)
+                    trozo = datos[segmentos[i][0]:segmentos[i][1]]
+                    while trozo:
+                        salida = d.decompress(trozo, _TAM_BLOQUE_DESCOMPRESION)
+                        if salida:
+                            yield salida
+                        trozo = d.unconsumed_tail
+                # lo único que se valida al final del miembro es el borde
+                if d.unused_data.strip(b"\x00"):
+                    raise ValueError("Datos inesperados después de un miembro gzip")
+                i += 1
+
+
+def _abrir_descomprimido(nombre_archivo: str, tipo: str) -> io.BufferedReader:
+    """
+    Abre un archivo comprimido como flujo binario descomprimido.
+
+    La descompresión corre en un hilo aparte; los gzip multi-miembro se
+    descomprimen además en paralelo, un miembro por hilo.
+    """
+    if tipo == "gz":
+        hilos = min(8, os.cpu_count() or 1)
+        productor = lambda: _bloques_gzip_paralelo(nombre_archivo, hilos)
+    else:
+        productor = lambda: _bloques_descomprimidos(nombre_archivo, tipo)
+    return io.BufferedReader(_LectorEnHilo(productor), buffer_size=1 << 20)
+
+
+def _bloques_de_flujo(f, tam: int = _TAM_BLOQUE_LECTURA) -> Iterator[bytes]:
+    """Como `_bloques_de_lineas`, pero sobre un flujo binario secuencial."""
+    tam = max(1, tam)
+    while True:
+        bloque = f.read(tam)
+        if not bloque:
+            return
+        if not bloque.endswith(b"\n"):
+            bloque += f.readline()
+        yield bloque
+
+
+@contextmanager
+def _cabecera_y_bloques(nombre_archivo: str, filas_por_bloque: Optional[int] = None):
+    """
+    Context manager que da la cabecera y los bloques de líneas del cuerpo.
+
+    Funciona igual para CSV planos (mmap) y comprimidos (flujo descomprimido
+    en un hilo). Si el archivo no tiene una cabecera completa, la cabecera
+    es `b""` y no hay bloques.
+
+    Args:
+        nombre_archivo (str): Ruta del CSV, plano o comprimido
+        filas_por_bloque (Optional[int]): Filas aproximadas por bloque (se
+            traduce a bytes con el ancho medio de fila). Si es None usa
+            `_TAM_BLOQUE_LECTURA` bytes.
+
+    Yields:
+        Tuple[bytes, Iterator[bytes]]: Cabecera y bloques de líneas completas
+    """
+    tipo = _tipo_compresion(nombre_archivo)
+    if tipo is None:
+        with _mapear_archivo(nombre_archivo) as datos:
+            inicio = datos.find(b"\n") + 1
+            if inicio == 0:
+                yield b"", iter(())
+                return
+            tam = _TAM_BLOQUE_LECTURA
+            if filas_por_bloque is not None:
+                tam = int(filas_por_bloque * _ancho_medio_fila(datos, inicio))
+            yield datos[:inicio], _bloques_de_lineas(datos, inicio, len(datos), tam)
+        return
+
+    with _abrir_descomprimido(nombre_archivo, tipo) as f:
+        cabecera = f.readline()
+        if not cabecera.endswith(b"\n"):
+            yield b"", iter(())
+            return
+        tam = _TAM_BLOQUE_LECTURA
+        if filas_por_bloque is not None:
+            tam = int(filas_por_bloque * _ancho_medio_fila(f.peek(1 << 16), 0))
+        yield cabecera, _bloques_de_flujo(f, tam)
+
+
+def _ancho_medio_archivo(nombre_archivo: str) -> float:
+    """Ancho medio de fila del cuerpo del CSV, plano o comprimido."""
+    tipo = _tipo_compresion(nombre_archivo)
+    if tipo is None:
+        with _mapear_archivo(nombre_archivo) as datos:
+            return _ancho_medio_fila(datos, datos.find(b"\n") + 1)
+    with _abrir_descomprimido(nombre_archivo, tipo) as f:
+        f.readline()
+        return _ancho_medio_fila(f.peek(1 << 16), 0)
+
+
+def _iter_csv_filas(nombre_archivo: str, filtro: Optional[FiltroVentas] = None,
+                    centavos: bool = False, progreso: Optional[ReporteProgreso] = None
+                    ) -> Iterable[Tuple[int, str, float, int]]:
+    """
+    Generador que lee un CSV mapeado en memoria con conversión de tipos.
+
+    Mapea el archivo con `mmap` (o lo descomprime en un hilo aparte si es
+    .gz/.bz2/.xz), resuelve la posición de las columnas a partir de la
+    cabecera una sola vez y recorre el resto en bloques de bytes con líneas
+    completas. No construye un dict por fila ni decodifica
+    la línea entera: solo el nombre de producto, y una vez por valor distinto.
 
     Args:
         nombre_archivo (str): Ruta del archivo CSV a leer
+        filtro (Optional[FiltroVentas]): Si se indica, omite las filas que
+            no lo cumplen sin convertir sus campos restantes
+        centavos (bool): Si es True, Precio_Unitario se devuelve como `int`
+            en centavos
+        progreso (Optional[ReporteProgreso]): Si se indica, cuenta bytes y
+            filas de cada bloque leído
 
     Yields:
         Tuple[int, str, float, int]: Tupla con (ID_Venta, Producto,
@@ -130,6 +1587,21 @@ def _iter_csv_filas(nombre_archivo: str) -> Iterable[Tuple[int, str, float, int]
         ValueError: Si los datos no pueden convertirse a los tipos esperados
         KeyError: Si faltan columnas requeridas en el CSV
     """
+    with _cabecera_y_bloques(nombre_archivo) as (cabecera, bloques):
+        if not cabecera:
+            return
+        if progreso is not None:
+            bloques = progreso.contar_bloques(bloques)
+        yield from _filas_de_bloques(bloques, _columnas_desde_cabecera(cabecera), filtro, centavos)
+
+
+def _iter_csv_filas_dict(nombre_archivo: str) -> Iterable[Tuple[int, str, float, int]]:
+    """
+    Variante de `_iter_csv_filas` basada en `csv.DictReader`.
+
+    Mismo contrato que `_iter_csv_filas`, pero construye un dict por fila.
+    Se conserva como referencia y para comparar ambos lectores en profiling.
+    """
     with open(nombre_archivo, newline="", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
@@ -140,8 +1612,263 @@ def _iter_csv_filas(nombre_archivo: str) -> Iterable[Tuple[int, str, float, int]
                 int(row["Cantidad"]),
             )
 
+
+# --- Sidecar columnar -------------------------------------------------------
+# Archivo binario junto al CSV (`ventas.csv.vcol`) con las columnas ya
+# tipadas. Formato:
+#   magia | uint32 largo_meta | meta JSON (con padding a 8 bytes) |
+#   precios float64[n] | cantidades int32[n] | códigos uint16/uint32[n]
+# La meta guarda tamaño, mtime y hash de cabecera del CSV: si alguno cambia
+# el sidecar deja de ser válido y se ignora.
+_SIDECAR_SUFIJO = ".vcol"
+_SIDECAR_MAGIA = b"VCOL1\n"
+_FILAS_POR_VOLCADO = 1 << 16
+
+
+def _ruta_sidecar(nombre_archivo: str) -> str:
+    """Ruta del sidecar columnar asociado a `nombre_archivo`."""
+    return nombre_archivo + _SIDECAR_SUFIJO
+
+
+def _clave_csv(nombre_archivo: str) -> Dict[str, object]:
+    """Tamaño, mtime y hash de la cabecera: identifican una versión del CSV."""
+    st = os.stat(nombre_archivo)
+    with open(nombre_archivo, "rb") as f:
+        cabecera = f.readline()
+    return {
+        "tam": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "cabecera": hashlib.sha256(cabecera).hexdigest(),
+    }
+
+
+def construir_sidecar(nombre_archivo: str) -> str:
+    """
+    Escribe el sidecar columnar de `nombre_archivo` en una sola pasada.
+
+    Las columnas se acumulan en `array` tipados y se vuelcan cada
+    `_FILAS_POR_VOLCADO` filas a archivos temporales, así que la memoria no
+    depende del tamaño del CSV. Los productos se codifican como enteros en
+    orden de primera aparición. El archivo final se escribe en un temporal y
+    se renombra, de modo que un lector nunca ve un sidecar a medio escribir.
+
+    Args:
+        nombre_archivo (str): Ruta del archivo CSV
+
+    Returns:
+        str: Ruta del sidecar generado
+    """
+    clave = _clave_csv(nombre_archivo)
+    codigos: Dict[str, int] = {}
+    precios, cantidades, cods = array("d"), array("i"), array("I")
+    n = 0
+
+    with tempfile.TemporaryFile() as t_precios, tempfile.TemporaryFile() as t_cantidades, \
+            tempfile.TemporaryFile() as t_codigos:
+
+        def volcar():
+            precios.tofile(t_precios)
+            cantidades.tofile(t_cantidades)
+            cods.tofile(t_codigos)
+            del precios[:], cantidades[:], cods[:]
+
+        for (_id, producto, precio, cantidad) in _iter_csv_filas(nombre_archivo):
+            codigo = codigos.get(producto)
+            if codigo is None:
+                codigo = codigos[producto] = len(codigos)
+            precios.append(precio)
+            cantidades.append(cantidad)
+            cods.append(codigo)
+            n += 1
+            if len(precios) >= _FILAS_POR_VOLCADO:
+                volcar()
+        volcar()
+
+        tipo_codigo = "H" if len(codigos) <= 0xFFFF else "I"
+        meta = dict(clave, n=n, productos=list(codigos), tipo_codigo=tipo_codigo,
+                    orden=sys.byteorder)
+        meta_bytes = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+        relleno = -(len(_SIDECAR_MAGIA) + 4 + len(meta_bytes)) % 8
+        meta_bytes += b" " * relleno
+
+        ruta = _ruta_sidecar(nombre_archivo)
+        with open(ruta + ".tmp", "wb") as out:
+            out.write(_SIDECAR_MAGIA)
+            out.write(struct.pack("<I", len(meta_bytes)))
+            out.write(meta_bytes)
+            for tmp in (t_precios, t_cantidades):
+                tmp.seek(0)
+                shutil.copyfileobj(tmp, out)
+            t_codigos.seek(0)
+            if tipo_codigo == "I":
+                shutil.copyfileobj(t_codigos, out)
+            else:
+                bloque = array("I")
+                while True:
+                    try:
+                        bloque.fromfile(t_codigos, _FILAS_POR_VOLCADO)
+                    except EOFError:
+                        pass
+                    if not bloque:
+                        break
+                    array("H", bloque).tofile(out)
+                    del bloque[:]
+        os.replace(ruta + ".tmp", ruta)
+
+    return ruta
+
+
+def _leer_sidecar(nombre_archivo: str) -> Optional[Dict[str, object]]:
+    """
+    Devuelve la meta del sidecar si existe y corresponde al CSV actual.
+
+    Además de la meta guardada, agrega `offset` (inicio de la columna de
+    precios). Devuelve None si no hay sidecar, si está corrupto o si el CSV
+    cambió (tamaño, mtime o cabecera) desde que se escribió.
+    """
+    try:
+        with open(_ruta_sidecar(nombre_archivo), "rb") as f:
+            if f.read(len(_SIDECAR_MAGIA)) != _SIDECAR_MAGIA:
+                return None
+            (largo,) = struct.unpack("<I", f.read(4))
+            meta = json.loads(f.read(largo).decode("utf-8"))
+            offset = f.tell()
+        clave = _clave_csv(nombre_archivo)
+    except (OSError, ValueError, struct.error):
+        return None
+
+    if meta.get("orden") != sys.byteorder or any(meta.get(k) != v for k, v in clave.items()):
+        return None
+    meta["offset"] = offset
+    return meta
+
+
+def _parcial_desde_sidecar(nombre_archivo: str, meta: Dict[str, object],
+                           centavos: bool = False) -> VentasParcial:
+    """
+    Calcula el agregado a partir de las columnas del sidecar.
+
+    Con NumPy las columnas se mapean con `np.memmap` y se agregan con
+    `np.dot`/`np.bincount` por tramos de `_FILAS_POR_VOLCADO` filas, así la
+    memoria no crece con el tamaño del archivo. Sin NumPy se recorren por tramos con `array`,
+    sumando en el mismo orden que el streaming (resultado idéntico).
+
+    Con `centavos` cada precio `float64` se redondea a centavos enteros
+    (`round(precio * 100)`), lo que recupera exactamente el valor del texto
+    cuando este tiene a lo sumo dos decimales.
+    """
+    n = int(meta["n"])
+    productos: List[str] = list(meta["productos"])
+    tipo_codigo = str(meta["tipo_codigo"])
+    ruta = _ruta_sidecar(nombre_archivo)
+    o_precios = int(meta["offset"])
+    o_cantidades = o_precios + 8 * n
+    o_codigos = o_cantidades + 4 * n
+
+    if n == 0:
+        return VentasParcial(centavos=centavos)
+
+    if _np is not None:
+        precios = _np.memmap(ruta, dtype=_np.float64, mode="r", offset=o_precios, shape=(n,))
+        cantidades = _np.memmap(ruta, dtype=_np.int32, mode="r", offset=o_cantidades, shape=(n,))
+        cods = _np.memmap(ruta, dtype=_np.uint16 if tipo_codigo == "H" else _np.uint32,
+                          mode="r", offset=o_codigos, shape=(n,))
+        # por tramos: sobre el memmap completo dot/bincount crean
+        # temporales float64 de n elementos (GB para cientos de millones)
+        suma_ventas = 0 if centavos else 0.0
+        por_codigo = _np.zeros(len(productos), dtype=_np.int64)
+        for ini in range(0, n, _FILAS_POR_VOLCADO):
+            tramo = slice(ini, ini + _FILAS_POR_VOLCADO)
+            if centavos:
+                suma_ventas += int(_np.dot(_np.rint(precios[tramo] * 100).astype(_np.int64),
+                                           cantidades[tramo].astype(_np.int64)))
+            else:
+                suma_ventas += float(_np.dot(precios[tramo], cantidades[tramo]))
+            por_codigo += _np.bincount(cods[tramo], weights=cantidades[tramo],
+                                       minlength=len(productos)).astype(_np.int64)
+        cantidades_por_producto = {p: int(c) for p, c in zip(productos, por_codigo)}
+        return VentasParcial(suma_ventas, n, cantidades_por_producto, centavos)
+
+    suma_ventas = 0 if centavos else 0.0
+    por_codigo = [0] * len(productos)
+    with open(ruta, "rb") as f:
+        for ini in range(0, n, _FILAS_POR_VOLCADO):
+            k = min(_FILAS_POR_VOLCADO, n - ini)
+            precios, cantidades, cods = array("d"), array("i"), array(tipo_codigo)
+            f.seek(o_precios + 8 * ini)
+            precios.fromfile(f, k)
+            f.seek(o_cantidades + 4 * ini)
+            cantidades.fromfile(f, k)
+            f.seek(o_codigos + cods.itemsize * ini)
+            cods.fromfile(f, k)
+            if centavos:
+                precios = [round(p * 100) for p in precios]
+            for total in map(operator.mul, precios, cantidades):
+                suma_ventas += total
+            for codigo, cantidad in zip(cods, cantidades):
+                por_codigo[codigo] += cantidad
+
+    return VentasParcial(suma_ventas, n, dict(zip(productos, por_codigo)), centavos)
+
+
+def _parcial_desde_cache(nombre_archivo: str, construir: bool,
+                         centavos: bool = False) -> Optional[VentasParcial]:
+    """
+    Agregado desde el sidecar si hay uno válido; con `construir` lo crea antes.
+
+    Returns:
+        Optional[VentasParcial]: None si no hay sidecar válido y no se pidió
+            construirlo
+    """
+    meta = _leer_sidecar(nombre_archivo)
+    if meta is None and construir:
+        construir_sidecar(nombre_archivo)
+        meta = _leer_sidecar(nombre_archivo)
+    if meta is None:
+        return None
+    return _parcial_desde_sidecar(nombre_archivo, meta, centavos)
+
+
+def _streaming_por_etapas(nombre_archivo: str, metricas: MetricasEtapas,
+                          estimadores: Optional[EstimadoresVentas] = None,
+                          filtro: Optional[FiltroVentas] = None,
+                          centavos: bool = False,
+                          progreso: Optional[ReporteProgreso] = None) -> VentasParcial:
+    """
+    Variante de `analizar_ventas_streaming` que separa las etapas.
+
+    El streaming normal encadena lectura, parseo y agregado fila a fila en
+    generadores, así que no hay dónde cortar para medir. Aquí cada bloque se
+    lee, se parsea a una lista, se agrega a un `VentasParcial` y se combina
+    con el total. El resultado es el mismo, y la memoria extra es la de un
+    bloque de filas.
+    """
+    total = VentasParcial(centavos=centavos)
+    metricas.iniciar()
+    with _cabecera_y_bloques(nombre_archivo) as (cabecera, bloques):
+        if not cabecera:
+            return total
+        columnas = _columnas_desde_cabecera(cabecera)
+        if progreso is not None:
+            bloques = progreso.contar_bloques(bloques)
+        for bloque in bloques:
+            metricas.marcar("lectura", bytes=len(bloque))
+            filas = list(_filas_de_bloques((bloque,), columnas, filtro, centavos))
+            metricas.marcar("parseo", bytes=len(bloque), filas=len(filas))
+            parcial = _agregar_filas(filas, estimadores, centavos)
+            metricas.marcar("agregado", filas=len(filas))
+            total.combinar(parcial)
+            metricas.marcar("combinacion")
+    return total
+
+
 @profile
-def analizar_ventas_streaming(nombre_archivo: str) -> VentasMetrics:
+def analizar_ventas_streaming(nombre_archivo: str, cache: bool = False,
+                              estimadores: Optional[EstimadoresVentas] = None,
+                              filtro: Optional[FiltroVentas] = None,
+                              centavos: bool = False,
+                              metricas: Optional[MetricasEtapas] = None,
+                              progreso: Optional[ReporteProgreso] = None) -> VentasMetrics:
     """
     Analiza ventas usando estrategia de streaming (línea por línea).
 
@@ -150,8 +1877,29 @@ def analizar_ventas_streaming(nombre_archivo: str) -> VentasMetrics:
     espacial O(1) respecto al tamaño del archivo, usando solo memoria para
     contadores y agregaciones.
 
+    Si junto al CSV hay un sidecar columnar válido (ver `construir_sidecar`)
+    las métricas se calculan desde él sin volver a parsear el texto.
+
     Args:
         nombre_archivo (str): Ruta del archivo CSV a analizar
+        cache (bool): Si es True y no hay sidecar válido, lo construye en
+            esta pasada para que las siguientes ejecuciones lo reutilicen.
+            Default: False
+        estimadores (Optional[EstimadoresVentas]): Si se indica, se
+            alimenta en la misma pasada con cada fila (cuantiles del ticket
+            y distintos de producto/ID). En ese caso no se usa el sidecar,
+            que no guarda los IDs. Default: None
+        filtro (Optional[FiltroVentas]): Si se indica, solo se agregan las
+            filas que lo cumplen; tampoco se usa el sidecar. Default: None
+        centavos (bool): Si es True, los precios se leen como centavos
+            enteros (sin `float`) y la suma es exacta: el total coincide bit
+            a bit con el de los demás motores en modo centavos. Default: False
+        metricas (Optional[MetricasEtapas]): Si se indica, acumula tiempo,
+            bytes y filas de lectura, parseo, agregado y combinación (o de
+            "cache" si responde el sidecar). Default: None
+        progreso (Optional[ReporteProgreso]): Si se indica, reporta avance
+            por posición de bytes desde un hilo aparte (no aplica si
+            responde el sidecar). Default: None
 
     Returns:
         VentasMetrics: Objeto con todas las métricas calculadas
@@ -170,38 +1918,189 @@ def analizar_ventas_streaming(nombre_archivo: str) -> VentasMetrics:
         - Más lento que pandas para operaciones complejas
         - Operaciones no vectorizadas
     """
+    if estimadores is None and (filtro is None or not filtro.activo):
+        marcar = metricas.iniciar().marcar if metricas is not None else _sin_marca
+        parcial = _parcial_desde_cache(nombre_archivo, construir=cache, centavos=centavos)
+        if parcial is not None:
+            marcar("cache", filas=parcial.num_registros)
+            return parcial.a_metrics()
+
     cantidades_por_producto: Dict[str, int] = {}
-    suma_ventas = 0.0
+    suma_ventas = 0 if centavos else 0.0
     n = 0
+    estimar = estimadores.agregador() if estimadores is not None else None
+    escala = 100 if centavos else 1
+
+    with ExitStack() as pila:
+        if progreso is not None:
+            pila.enter_context(progreso.seguir(nombre_archivo))
+        if metricas is not None:
+            return _streaming_por_etapas(nombre_archivo, metricas, estimadores, filtro, centavos,
+                                         progreso).a_metrics()
+
+        for (_id, producto, precio, cantidad) in _iter_csv_filas(nombre_archivo, filtro, centavos, progreso):
+            total = precio * cantidad
+            suma_ventas += total
+            n += 1
+            cantidades_por_producto[producto] = cantidades_por_producto.get(producto, 0) + cantidad
+            if estimar is not None:
+                estimar(_id, producto, total / escala)
+
+    return VentasParcial(suma_ventas, n, cantidades_por_producto, centavos).a_metrics()
+
+# Columnas y tipos que lee el motor pandas: `ID_Venta` no se usa y
+# `Producto` como categórica guarda un código por fila en lugar de un str.
+_COLUMNAS_PANDAS = ["Producto", "Precio_Unitario", "Cantidad"]
+_DTYPES_PANDAS = {"Producto": "category", "Precio_Unitario": "float64", "Cantidad": "int32"}
+# Bytes de memoria por byte de texto de un chunk: buffer de texto del parser
+# más columnas tipadas y temporales. Medido con pandas 3 / pyarrow 26 (el
+# parser C usa ~1.1x y pyarrow ~2.4x); se usa una cota común con margen.
+_FACTOR_MEMORIA_CHUNK = 3.0
+
+
+def _chunksize_por_presupuesto(nombre_archivo: str, mem_budget_mb: float) -> int:
+    """
+    Filas por chunk para que el chunk en memoria quepa en `mem_budget_mb`.
 
-    for (_id, producto, precio, cantidad) in _iter_csv_filas(nombre_archivo):
-        total = precio * cantidad
-        suma_ventas += total
-        n += 1
-        cantidades_por_producto[producto] = cantidades_por_producto.get(producto, 0) + cantidad
+    Estima el ancho medio de fila muestreando el comienzo del archivo y lo
+    multiplica por `_FACTOR_MEMORIA_CHUNK`.
+    """
+    ancho = _ancho_medio_archivo(nombre_archivo)
+    filas = int(mem_budget_mb * (1 << 20) / (ancho * _FACTOR_MEMORIA_CHUNK))
+    return max(1_000, filas)
 
-    if n == 0:
-        return VentasMetrics(0.0, 0.0, "", 0, 0)
 
-    producto_top, cant_top = max(cantidades_por_producto.items(), key=lambda kv: kv[1])
-    promedio = suma_ventas / n
+def _chunks_pandas(nombre_archivo: str, chunksize: int, parser: str, con_ids: bool = False,
+                   centavos: bool = False, progreso: Optional[ReporteProgreso] = None,
+                   consumo: Optional[Dict[str, int]] = None):
+    """
+    Itera el CSV en DataFrames tipados con solo las columnas necesarias.
+
+    Con `parser="pyarrow"` usa el lector incremental de `pyarrow.csv`
+    (multihilo) con bloques de ~`chunksize` filas; `read_csv(engine="pyarrow")`
+    no admite `chunksize`. Con `"c"` usa el parser C de pandas. Los archivos
+    comprimidos se leen desde el flujo descomprimido en un hilo aparte.
+    `ID_Venta` (int64) solo se lee si `con_ids` es True. Con `centavos`,
+    `Precio_Unitario` se lee como texto y se entrega en centavos `int64`.
+
+    Con `progreso` y el parser C, un CSV plano se abre como archivo para
+    informar la posición (`tell`) tras cada chunk. pyarrow lee por adelantado
+    (su `tell` llega al final enseguida), y un comprimido no tiene posición
+    útil; en esos casos los bytes se estiman con el ancho medio de fila.
+
+    Con `consumo`, al agotarse deja en `consumo["bytes"]` los bytes de
+    cuerpo leídos (descomprimidos si el archivo está comprimido, sin la
+    cabecera), la misma medida que la etapa "lectura" de los demás motores.
+    """
+    columnas = _COLUMNAS_PANDAS + (["ID_Venta"] if con_ids else [])
+    tipo = _tipo_compresion(nombre_archivo)
+    with ExitStack() as pila:
+        fuente = nombre_archivo
+        if tipo is not None:
+            fuente = pila.enter_context(_abrir_descomprimido(nombre_archivo, tipo))
+        elif progreso is not None and parser == "c":
+            fuente = pila.enter_context(open(nombre_archivo, "rb"))
+        ancho = _ancho_medio_archivo(nombre_archivo) if parser != "c" or (progreso and tipo) else 0.0
+        if parser == "c":
+            dtypes = {**_DTYPES_PANDAS, "ID_Venta": "int64"}
+            if centavos:
+                dtypes["Precio_Unitario"] = "str"
+            chunks = _pd.read_csv(fuente, chunksize=chunksize, usecols=columnas, dtype=dtypes)
+        else:
+            chunks = _lotes_pyarrow(fuente, chunksize, ancho, columnas, centavos)
+        for chunk in chunks:
+            if centavos and parser == "c":
+                chunk["Precio_Unitario"] = _centavos_pandas(chunk["Precio_Unitario"])
+            if progreso is not None:
+                if tipo is None and parser == "c":
+                    progreso.posicionar(fuente.tell(), len(chunk))
+                else:
+                    progreso.avanzar(int(len(chunk) * ancho), len(chunk))
+            yield chunk
+        if consumo is not None:
+            total = fuente.tell() if tipo is not None else os.path.getsize(nombre_archivo)
+            abrir = _MODULOS_COMPRESION[tipo].open if tipo is not None else open
+            with abrir(nombre_archivo, "rb") as f:
+                consumo["bytes"] = total - len(f.readline())
+
+
+def _centavos_arrow(precios):
+    """
+    Centavos `int64` desde un arreglo de pyarrow (texto o `decimal128(18, 2)`).
+
+    El cast a decimal es exacto y falla si un valor tiene fracciones de
+    centavo; multiplicar por 100 y castear a `int64` no pierde información.
+    """
+    decimales = _pc.cast(precios, _pa.decimal128(18, 2))
+    return _pc.cast(_pc.multiply(decimales, _pa.scalar(100, _pa.decimal128(18, 0))), _pa.int64())
+
+
+def _centavos_pandas(precios):
+    """
+    Convierte una serie de precios en texto a centavos `int64` sin `float`.
 
-    return VentasMetrics(
-        ventas_totales=round(suma_ventas, 2),
-        promedio_por_venta=round(promedio, 2),
-        producto_mas_vendido=producto_top,
-        cantidad_mas_vendida=int(cant_top),
-        num_registros=n,
+    Con pyarrow usa `_centavos_arrow` (vectorizado); si no, convierte la
+    columna entera con `_precios_centavos`.
+    """
+    if _pa is not None:
+        valores = _centavos_arrow(_pa.array(precios)).to_numpy()
+    else:
+        valores = _precios_centavos([p.encode("ascii") for p in precios])
+    return _pd.Series(valores, index=precios.index, dtype="int64")
+
+
+def _lotes_pyarrow(fuente, chunksize: int, ancho: float, columnas: List[str], centavos: bool = False):
+    """DataFrames tipados desde el lector incremental de `pyarrow.csv`."""
+    lector = _pacsv.open_csv(
+        fuente,
+        read_options=_pacsv.ReadOptions(block_size=max(1 << 16, int(chunksize * ancho))),
+        convert_options=_pacsv.ConvertOptions(
+            include_columns=columnas,
+            column_types={
+                "ID_Venta": _pa.int64(),
+                "Producto": _pa.dictionary(_pa.int32(), _pa.string()),
+                "Precio_Unitario": _pa.decimal128(18, 2) if centavos else _pa.float64(),
+                "Cantidad": _pa.int32(),
+            },
+        ),
     )
+    for lote in lector:
+        if centavos:
+            nombres = lote.schema.names
+            lote = _pa.RecordBatch.from_arrays(
+                [_centavos_arrow(c) if n == "Precio_Unitario" else c for n, c in zip(nombres, lote.columns)],
+                names=nombres)
+        yield lote.to_pandas()
+
+
+def _mascara_pandas(chunk, filtro: FiltroVentas, centavos: bool = False):
+    """Máscara booleana de las filas del chunk que cumplen `filtro`."""
+    mascara = _pd.Series(True, index=chunk.index)
+    if filtro.productos is not None:
+        mascara &= chunk["Producto"].isin(list(filtro.productos))
+    if filtro.precio_min is not None or filtro.precio_max is not None:
+        pmin, pmax = filtro.limites_centavos if centavos else filtro.limites_precio
+        mascara &= chunk["Precio_Unitario"].between(pmin, pmax)
+    if filtro.id_min is not None or filtro.id_max is not None:
+        mascara &= chunk["ID_Venta"].between(*filtro.limites_id)
+    return mascara
+
 
 @profile
-def analizar_ventas_pandas(nombre_archivo: str, chunksize: int = 50_000) -> VentasMetrics:
+def analizar_ventas_pandas(nombre_archivo: str, chunksize: int = 50_000,
+                           cache: bool = False, mem_budget_mb: Optional[float] = None,
+                           parser: str = "auto", filtro: Optional[FiltroVentas] = None,
+                           centavos: bool = False,
+                           metricas: Optional[MetricasEtapas] = None,
+                           progreso: Optional[ReporteProgreso] = None) -> VentasMetrics:
     """
     Analiza ventas usando estrategia de batching con pandas.
 
     Procesa el archivo CSV en bloques (chunks) del tamaño especificado,
     aprovechando las operaciones vectorizadas de NumPy para mejor rendimiento.
     La memoria usada es proporcional al chunksize, no al tamaño total del archivo.
+    Solo se leen `Producto` (como categórica), `Precio_Unitario` (float64) y
+    `Cantidad` (int32), sin inferencia de tipos.
 
     Args:
         nombre_archivo (str): Ruta del archivo CSV a analizar
@@ -209,12 +2108,34 @@ def analizar_ventas_pandas(nombre_archivo: str, chunksize: int = 50_000) -> Vent
             Default: 50,000. Valores mayores usan más memoria pero pueden
             ser más rápidos. Valores menores usan menos memoria pero más
             iteraciones.
+        cache (bool): Si es True y no hay sidecar columnar válido, lo
+            construye. Con un sidecar válido las métricas se calculan desde
+            sus columnas tipadas sin leer el CSV. Default: False
+        mem_budget_mb (Optional[float]): Presupuesto de memoria del chunk
+            en MB. Si se indica, reemplaza a `chunksize` por el mayor valor
+            que cabe en el presupuesto según el ancho de fila muestreado.
+            Default: None
+        parser (str): "c" (parser de pandas), "pyarrow" (lector incremental
+            de pyarrow) o "auto" (pyarrow si está instalado). Default: "auto"
+        filtro (Optional[FiltroVentas]): Si se indica, cada chunk se reduce
+            con una máscara booleana vectorizada antes de agregar; el sidecar
+            no se usa. `ID_Venta` solo se lee si el filtro lo requiere.
+            Default: None
+        centavos (bool): Si es True, `Precio_Unitario` se lee como texto y
+            se convierte a centavos `int64` (sin `float`); la suma es exacta
+            e independiente del chunksize. Default: False
+        metricas (Optional[MetricasEtapas]): Si se indica, acumula tiempos
+            por chunk. El parser lee y convierte en un solo paso, así que
+            esa etapa se registra como "lectura_parseo", seguida de
+            "agregado" y "combinacion". Default: None
+        progreso (Optional[ReporteProgreso]): Si se indica, reporta avance
+            por posición de bytes tras cada chunk. Default: None
 
     Returns:
         VentasMetrics: Objeto con todas las métricas calculadas
 
     Raises:
-        RuntimeError: Si pandas no está instalado
+        RuntimeError: Si pandas (o pyarrow, si se pidió) no está instalado
         FileNotFoundError: Si el archivo no existe
         pd.errors.ParserError: Si el CSV tiene formato inválido
 
@@ -231,38 +2152,1263 @@ def analizar_ventas_pandas(nombre_archivo: str, chunksize: int = 50_000) -> Vent
 
     Warning:
         Si chunksize es muy grande y el archivo es enorme, puede quedarse
-        sin memoria. Ajusta chunksize según la RAM disponible.
+        sin memoria. Ajusta chunksize según la RAM disponible o usa
+        `mem_budget_mb`.
     """
     if _pd is None:
         raise RuntimeError("pandas no está disponible en el entorno.")
+    if parser == "auto":
+        parser = "pyarrow" if _pacsv is not None else "c"
+    elif parser == "pyarrow" and _pacsv is None:
+        raise RuntimeError("pyarrow no está disponible en el entorno.")
+    elif parser not in ("c", "pyarrow"):
+        raise ValueError(f"parser desconocido: {parser!r}")
+
+    if filtro is not None and not filtro.activo:
+        filtro = None
+    marcar = metricas.iniciar().marcar if metricas is not None else _sin_marca
+    if filtro is None:
+        parcial = _parcial_desde_cache(nombre_archivo, construir=cache, centavos=centavos)
+        if parcial is not None:
+            marcar("cache", filas=parcial.num_registros)
+            return parcial.a_metrics()
+
+    if mem_budget_mb is not None:
+        chunksize = _chunksize_por_presupuesto(nombre_archivo, mem_budget_mb)
+
+    suma_ventas = 0 if centavos else 0.0
+    a_numero = int if centavos else float
+    n = 0
+    cantidades_por_producto: Dict[str, int] = {}
+
+    con_ids = filtro is not None and (filtro.id_min is not None or filtro.id_max is not None)
+    consumo: Dict[str, int] = {}
+    with ExitStack() as pila:
+        if progreso is not None:
+            pila.enter_context(progreso.seguir(nombre_archivo))
+        for chunk in _chunks_pandas(nombre_archivo, chunksize, parser, con_ids, centavos, progreso,
+                                    consumo if metricas is not None else None):
+            marcar("lectura_parseo", filas=len(chunk))
+            if filtro is not None:
+                chunk = chunk[_mascara_pandas(chunk, filtro, centavos)]
+            suma_ventas += a_numero((chunk["Precio_Unitario"] * chunk["Cantidad"].astype("int64")).sum())
+            n += int(len(chunk))
+            cantidades_chunk = chunk.groupby("Producto", observed=True, sort=False)["Cantidad"].sum().to_dict()
+            marcar("agregado", filas=len(chunk))
+            for prod, cnt in cantidades_chunk.items():
+                cantidades_por_producto[prod] = cantidades_por_producto.get(prod, 0) + int(cnt)
+            marcar("combinacion")
+    if metricas is not None and "lectura_parseo" in metricas.etapas:
+        metricas.etapas["lectura_parseo"].bytes += consumo.get("bytes", 0)
+
+    return VentasParcial(suma_ventas, n, cantidades_por_producto, centavos).a_metrics()
+
+
+# --- Motor NumPy --------------------------------------------------------------
+def _columnas_de_bloque_numpy(bloque: bytes, columnas: Tuple[int, int, int, int], num_columnas: int):
+    """
+    Separa un bloque de líneas CSV en las listas de campos que usa el motor NumPy.
+
+    Une todas las líneas con comas y hace un único `split`, de modo que cada
+    columna queda como un slice con paso `num_columnas` de la lista de campos.
+
+    Returns:
+        Tuple[list, list, list, list]: Campos (bytes) de ID_Venta, Producto,
+            Precio_Unitario y Cantidad
+
+    Raises:
+        ValueError: Si alguna fila no tiene `num_columnas` campos
+    """
+    i_id, i_prod, i_precio, i_cant = columnas
+    if b"\r" in bloque:
+        bloque = bloque.replace(b"\r\n", b"\n")
+
+    if b'"' in bloque:
+        filas = [f for f in csv.reader(bloque.decode("utf-8").splitlines()) if f]
+        return ([f[i_id] for f in filas], [f[i_prod].encode("utf-8") for f in filas],
+                [f[i_precio] for f in filas], [f[i_cant] for f in filas])
+
+    bloque = bloque.strip(b"\n")
+    if b"\n\n" in bloque:
+        bloque = b"\n".join(linea for linea in bloque.split(b"\n") if linea)
+    if not bloque:
+        return [], [], [], []
+    campos = bloque.replace(b"\n", b",").split(b",")
+    if len(campos) % num_columnas:
+        raise ValueError("Fila con cantidad de columnas distinta a la cabecera")
+    return (campos[i_id::num_columnas], campos[i_prod::num_columnas],
+            campos[i_precio::num_columnas], campos[i_cant::num_columnas])
+
+
+@profile
+def analizar_ventas_numpy(nombre_archivo: str, chunksize: int = 50_000,
+                          filtro: Optional[FiltroVentas] = None, centavos: bool = False,
+                          metricas: Optional[MetricasEtapas] = None,
+                          progreso: Optional[ReporteProgreso] = None) -> VentasMetrics:
+    """
+    Analiza ventas por bloques parseados directamente a arrays de NumPy.
+
+    Cada bloque de ~`chunksize` filas se separa con un único `split` y sus
+    columnas se cargan en arrays `float64`/`int64` con `np.fromiter`, sin
+    pasar por pandas. Los productos se traducen a códigos enteros
+    mediante un diccionario persistente entre bloques y las cantidades por
+    producto se agregan con `np.bincount(códigos, weights=cantidades)` sobre
+    un acumulador preasignado que solo crece si aparecen productos nuevos.
+
+    Args:
+        nombre_archivo (str): Ruta del archivo CSV a analizar
+        chunksize (int): Filas aproximadas por bloque (se traduce a bytes con
+            el ancho medio de fila). Default: 50,000
+        filtro (Optional[FiltroVentas]): Si se indica, el producto se filtra
+            sobre los campos de texto antes de convertir el bloque y precio/ID
+            con máscaras vectorizadas. Default: None
+        centavos (bool): Si es True, los precios se convierten a centavos
+            `int64` sin pasar por `float` (ver `_centavos_numpy`) y la suma
+            es exacta. Default: False
+        metricas (Optional[MetricasEtapas]): Si se indica, acumula tiempos
+            por bloque de lectura, parseo (split, filtros y conversión a
+            arrays), agregado (`dot` + `bincount`) y combinación. Default: None
+        progreso (Optional[ReporteProgreso]): Si se indica, reporta avance
+            por posición de bytes tras cada bloque. Default: None
+
+    Returns:
+        VentasMetrics: Objeto con todas las métricas calculadas
+
+    Raises:
+        RuntimeError: Si numpy no está instalado
+        FileNotFoundError: Si el archivo no existe
+        ValueError: Si el CSV tiene formato inválido
+        KeyError: Si faltan columnas requeridas en el CSV
 
-    suma_ventas = 0.0
+    Note:
+        A diferencia de `analizar_ventas_pandas` no crea DataFrames, no hace
+        un `groupby` por bloque ni agrega la columna `Venta_Total`.
+    """
+    if _np is None:
+        raise RuntimeError("numpy no está disponible en el entorno.")
+
+    codigos: Dict[bytes, int] = {}
+    unidades = _np.zeros(16, dtype=_np.int64)
+    suma_ventas = 0 if centavos else 0.0
     n = 0
+    marcar = metricas.iniciar().marcar if metricas is not None else _sin_marca
+
+    with ExitStack() as pila:
+        cabecera, bloques = pila.enter_context(_cabecera_y_bloques(nombre_archivo, filas_por_bloque=chunksize))
+        if not cabecera:
+            return VentasParcial(centavos=centavos).a_metrics()
+        columnas = _columnas_desde_cabecera(cabecera)
+        num_columnas = cabecera.count(b",") + 1
+        if progreso is not None:
+            pila.enter_context(progreso.seguir(nombre_archivo))
+            bloques = progreso.contar_bloques(bloques)
+
+        for bloque in bloques:
+            marcar("lectura", bytes=len(bloque))
+            ids_txt, prods, precios_txt, cant_txt = _columnas_de_bloque_numpy(bloque, columnas, num_columnas)
+            k = len(prods)
+            if not k:
+                marcar("parseo", bytes=len(bloque))
+                continue
+
+            if filtro is not None and filtro.productos is not None:
+                # Descarta por producto antes de convertir los demás campos
+                aceptados = {p: p.decode("utf-8") in filtro.productos for p in dict.fromkeys(prods)}
+                if not all(aceptados.values()):
+                    mascara = list(map(aceptados.__getitem__, prods))
+                    prods = list(compress(prods, mascara))
+                    ids_txt = list(compress(ids_txt, mascara))
+                    precios_txt = list(compress(precios_txt, mascara))
+                    cant_txt = list(compress(cant_txt, mascara))
+                    k = len(prods)
+                    if not k:
+                        marcar("parseo", bytes=len(bloque))
+                        continue
+
+            if centavos:
+                precios = _centavos_numpy(precios_txt)
+            else:
+                precios = _np.fromiter(map(float, precios_txt), dtype=_np.float64, count=k)
+            cantidades = _np.fromiter(map(int, cant_txt), dtype=_np.int64, count=k)
+            mascara = None
+            if filtro is not None and (filtro.precio_min is not None or filtro.precio_max is not None):
+                pmin, pmax = filtro.limites_centavos if centavos else filtro.limites_precio
+                mascara = (precios >= pmin) & (precios <= pmax)
+            if filtro is not None and (filtro.id_min is not None or filtro.id_max is not None):
+                imin, imax = filtro.limites_id
+                ids = _np.fromiter(map(int, ids_txt), dtype=_np.int64, count=k)
+                mascara_ids = (ids >= imin) & (ids <= imax)
+                mascara = mascara_ids if mascara is None else mascara & mascara_ids
+            if mascara is not None:
+                prods = list(compress(prods, mascara.tolist()))
+                precios, cantidades = precios[mascara], cantidades[mascara]
+                k = len(prods)
+                if not k:
+                    marcar("parseo", bytes=len(bloque))
+                    continue
+
+            try:
+                cods = _np.fromiter(map(codigos.__getitem__, prods), dtype=_np.intp, count=k)
+            except KeyError:
+                # dict.fromkeys conserva el orden de primera aparición
+                for prod in dict.fromkeys(prods):
+                    codigos.setdefault(prod, len(codigos))
+                cods = _np.fromiter(map(codigos.__getitem__, prods), dtype=_np.intp, count=k)
+                if len(codigos) > len(unidades):
+                    unidades = _np.concatenate(
+                        [unidades, _np.zeros(max(len(codigos), 2 * len(unidades)) - len(unidades),
+                                             dtype=_np.int64)])
+            marcar("parseo", bytes=len(bloque), filas=k)
+
+            if centavos:
+                suma_ventas += int(_np.dot(precios, cantidades))
+            else:
+                suma_ventas += float(_np.dot(precios, cantidades))
+            n += k
+            unidades[:len(codigos)] += _np.bincount(cods, weights=cantidades,
+                                                    minlength=len(codigos)).astype(_np.int64)
+            marcar("agregado", filas=k)
+
+    cantidades_por_producto = {
+        prod.decode("utf-8"): int(unidades[codigo]) for prod, codigo in codigos.items()
+    }
+    marcar("combinacion")
+    return VentasParcial(suma_ventas, n, cantidades_por_producto, centavos).a_metrics()
+
+
+def _centavos_numpy(textos: List[bytes]):
+    """
+    Centavos `int64` de una columna de precios en texto, con aritmética de NumPy.
+
+    Los textos se copian a una matriz de bytes de ancho fijo y el número se
+    arma columna a columna (`valor * 10 + dígito`), escalando según la
+    cantidad de decimales. Si algún valor no es un decimal simple (espacios,
+    exponentes, más de dos decimales, etc.) se recurre a `_precios_centavos`.
+    """
+    k = len(textos)
+    if not k or not isinstance(textos[0], bytes):
+        return _np.array(_precios_centavos(textos), dtype=_np.int64)
+    matriz = _np.array(textos, dtype=bytes)
+    u = matriz.view(_np.uint8).reshape(k, matriz.itemsize)
+    digito = (u >= 48) & (u <= 57)
+    punto = u == 46
+    signo = (u[:, 0] == 45) | (u[:, 0] == 43)
+    permitido = digito | punto | (u == 0)
+    permitido[:, 0] |= signo
+    largo = (u != 0).sum(axis=1)
+    con_punto = punto.any(axis=1)
+    decimales = _np.where(con_punto, largo - 1 - punto.argmax(axis=1), 0)
+    if (not permitido.all() or (punto.sum(axis=1) > 1).any() or (decimales > 2).any()
+            or not digito.any(axis=1).all()):
+        return _np.array(_precios_centavos(textos), dtype=_np.int64)
+
+    valor = _np.zeros(k, dtype=_np.int64)
+    for j in range(u.shape[1]):
+        valor = _np.where(digito[:, j], valor * 10 + (u[:, j] - 48), valor)
+    valor *= _np.array([100, 10, 1], dtype=_np.int64)[decimales]
+    negativo = u[:, 0] == 45
+    valor[negativo] *= -1
+    return valor
+
+
+def _rangos_de_bytes(nombre_archivo: str, partes: int) -> Tuple[bytes, List[Tuple[int, int]]]:
+    """
+    Divide el cuerpo del CSV en rangos de bytes alineados a fin de línea.
+
+    Cada rango [inicio, fin) empieza al comienzo de una línea y termina justo
+    después de un salto de línea (o en el fin del archivo), por lo que ninguna
+    fila queda partida entre dos rangos.
+
+    Args:
+        nombre_archivo (str): Ruta del archivo CSV
+        partes (int): Número de rangos deseado. Puede devolver menos si el
+            archivo es pequeño.
+
+    Returns:
+        Tuple[bytes, List[Tuple[int, int]]]: La línea de cabecera y la lista
+            de rangos (inicio, fin) en orden de archivo
+    """
+    with open(nombre_archivo, "rb") as f:
+        cabecera = f.readline()
+        inicio = f.tell()
+        tam = os.fstat(f.fileno()).st_size
+        paso = max(1, (tam - inicio) // max(1, partes))
+
+        cortes = [inicio]
+        for i in range(1, partes):
+            pos = inicio + i * paso
+            if pos <= cortes[-1]:
+                continue
+            # Retroceder un byte garantiza que un corte que cae justo al
+            # inicio de una línea no se salte esa línea completa.
+            f.seek(pos - 1)
+            f.readline()
+            pos = f.tell()
+            if pos >= tam:
+                break
+            if pos > cortes[-1]:
+                cortes.append(pos)
+        cortes.append(tam)
+
+    rangos = [(a, b) for a, b in zip(cortes[:-1], cortes[1:]) if b > a]
+    return cabecera, rangos
+
+
+def _agregar_filas(filas: Iterable[Tuple[int, str, float, int]],
+                   estimadores: Optional[EstimadoresVentas] = None,
+                   centavos: bool = False) -> VentasParcial:
+    """
+    Agrega una secuencia de filas tipadas en un `VentasParcial`.
+
+    Si se pasan `estimadores`, también se alimentan (in-place) con cada fila.
+    Con `centavos` las filas traen el precio en centavos enteros.
+    """
     cantidades_por_producto: Dict[str, int] = {}
+    suma_ventas = 0 if centavos else 0.0
+    n = 0
+    estimar = estimadores.agregador() if estimadores is not None else None
+    escala = 100 if centavos else 1
+
+    for (_id, producto, precio, cantidad) in filas:
+        total = precio * cantidad
+        suma_ventas += total
+        n += 1
+        cantidades_por_producto[producto] = cantidades_por_producto.get(producto, 0) + cantidad
+        if estimar is not None:
+            estimar(_id, producto, total / escala)
 
-    for chunk in _pd.read_csv(nombre_archivo, chunksize=chunksize):
-        chunk["Venta_Total"] = chunk["Precio_Unitario"] * chunk["Cantidad"]
-        suma_ventas += float(chunk["Venta_Total"].sum())
-        n += int(len(chunk))
-        cantidades_chunk = chunk.groupby("Producto")["Cantidad"].sum().to_dict()
-        for prod, cnt in cantidades_chunk.items():
-            cantidades_por_producto[prod] = cantidades_por_producto.get(prod, 0) + int(cnt)
+    return VentasParcial(suma_ventas, n, cantidades_por_producto, centavos)
 
-    if n == 0:
-        return VentasMetrics(0.0, 0.0, "", 0, 0)
 
-    producto_top, cant_top = max(cantidades_por_producto.items(), key=lambda kv: kv[1])
-    promedio = suma_ventas / n
+def _procesar_rango(nombre_archivo: str, inicio: int, fin: int,
+                    columnas: Tuple[int, int, int, int],
+                    estimadores: Optional[EstimadoresVentas] = None,
+                    filtro: Optional[FiltroVentas] = None, centavos: bool = False
+                    ) -> Tuple[VentasParcial, Optional[EstimadoresVentas]]:
+    """
+    Worker del motor paralelo: agrega las filas del rango [inicio, fin).
+
+    Mapea el archivo en memoria y recorre solo su rango con el mismo escáner
+    de bytes que `_iter_csv_filas`, de modo que la memoria por worker es
+    constante aunque el rango sea de varios GB.
+
+    Returns:
+        Tuple[VentasParcial, Optional[EstimadoresVentas]]: Agregado parcial
+            del rango y los estimadores recibidos, ya alimentados
+    """
+    with _mapear_archivo(nombre_archivo) as datos:
+        parcial = _agregar_filas(
+            _filas_de_bloques(_bloques_de_lineas(datos, inicio, fin), columnas, filtro, centavos),
+            estimadores, centavos)
+    return parcial, estimadores
+
+
+def _procesar_bloque(bloque: bytes, columnas: Tuple[int, int, int, int],
+                     estimadores: Optional[EstimadoresVentas] = None,
+                     filtro: Optional[FiltroVentas] = None, centavos: bool = False
+                     ) -> Tuple[VentasParcial, Optional[EstimadoresVentas]]:
+    """Worker del motor paralelo para un bloque de líneas ya descomprimido."""
+    filas = _filas_de_bloques((bloque,), columnas, filtro, centavos)
+    return _agregar_filas(filas, estimadores, centavos), estimadores
+
+
+def _resultados_por_bloque(nombre_archivo: str, workers: int, funcion: Callable,
+                           extra: Callable[[], tuple] = tuple,
+                           progreso: Optional[ReporteProgreso] = None) -> Iterator:
+    """
+    Aplica `funcion(bloque, columnas, *extra())` a cada bloque de un CSV comprimido.
+
+    Un archivo comprimido no se puede partir en rangos de bytes, así que el
+    proceso principal lo descomprime (en su hilo lector) y reparte los
+    bloques de líneas entre `workers` procesos, con a lo sumo `2 * workers`
+    bloques en vuelo. Los resultados se devuelven en orden de archivo.
+    Con `progreso` se cuentan los bloques a medida que se reparten.
+    """
+    with _cabecera_y_bloques(nombre_archivo) as (cabecera, bloques):
+        if not cabecera:
+            return
+        columnas = _columnas_desde_cabecera(cabecera)
+        if progreso is not None:
+            bloques = progreso.contar_bloques(bloques)
+        if workers <= 1:
+            for bloque in bloques:
+                yield funcion(bloque, columnas, *extra())
+            return
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            en_vuelo: deque = deque()
+            for bloque in bloques:
+                en_vuelo.append(pool.submit(funcion, bloque, columnas, *extra()))
+                if len(en_vuelo) >= 2 * workers:
+                    yield en_vuelo.popleft().result()
+            while en_vuelo:
+                yield en_vuelo.popleft().result()
+
+
+# Rangos por worker cuando se reporta progreso: más rangos dan actualizaciones
+# más frecuentes a cambio de un poco más de overhead del pool.
+_RANGOS_POR_WORKER_PROGRESO = 8
+
+
+def analizar_ventas_parallel(nombre_archivo: str, workers: Optional[int] = None,
+                             estimadores: Optional[EstimadoresVentas] = None,
+                             filtro: Optional[FiltroVentas] = None,
+                             centavos: bool = False,
+                             progreso: Optional[ReporteProgreso] = None) -> VentasMetrics:
+    """
+    Analiza ventas en paralelo repartiendo rangos de bytes entre procesos.
+
+    Divide el archivo en `workers` rangos alineados a fin de línea y los
+    procesa en un `ProcessPoolExecutor`. Cada worker devuelve un
+    `VentasParcial` y los parciales se combinan en orden de archivo, por lo
+    que conteos, cantidades por producto y desempates coinciden exactamente
+    con `analizar_ventas_streaming`.
+
+    Args:
+        nombre_archivo (str): Ruta del archivo CSV a analizar
+        workers (Optional[int]): Número de procesos. Si es None, usa
+            `os.cpu_count()`. Con 1 worker se procesa en el propio proceso.
+        estimadores (Optional[EstimadoresVentas]): Si se indica, cada worker
+            alimenta una copia vacía y los estados se combinan sobre este
+            objeto. Default: None
+        filtro (Optional[FiltroVentas]): Si se indica, solo se agregan las
+            filas que lo cumplen. Default: None
+        centavos (bool): Si es True, suma en centavos enteros exactos (punto
+            fijo): el total no depende del orden ni de la partición. Default: False
+        progreso (Optional[ReporteProgreso]): Si se indica, el archivo se
+            parte en `_RANGOS_POR_WORKER_PROGRESO` rangos por worker y el
+            avance se reporta al completarse cada rango. Default: None
+
+    Returns:
+        VentasMetrics: Objeto con todas las métricas calculadas
+
+    Raises:
+        FileNotFoundError: Si el archivo no existe
+        KeyError: Si faltan columnas requeridas en el CSV
+
+    Note:
+        Al no compartir estado entre procesos el rendimiento escala casi
+        linealmente con `workers` hasta saturar el disco. El costo fijo de
+        levantar el pool hace que no convenga para archivos pequeños.
+
+        La suma en punto flotante se acumula por rango, así que
+        `ventas_totales` puede diferir del streaming en el último bit antes
+        del redondeo a centavos; con `centavos=True` coincide exactamente.
+
+        Con entrada comprimida la descompresión ocurre en el proceso
+        principal y los workers reciben bloques de líneas ya descomprimidos.
+    """
+    workers = workers or os.cpu_count() or 1
+    total = VentasParcial(centavos=centavos)
+
+    def acumular(resultado):
+        parcial, estimadores_rango = resultado
+        total.combinar(parcial)
+        if estimadores is not None:
+            estimadores.combinar(estimadores_rango)
+
+    def vacios():
+        return estimadores.vacio() if estimadores is not None else None
+
+    with ExitStack() as pila:
+        if progreso is not None:
+            pila.enter_context(progreso.seguir(nombre_archivo))
+
+        if _tipo_compresion(nombre_archivo) is not None:
+            for resultado in _resultados_por_bloque(nombre_archivo, workers, _procesar_bloque,
+                                                    lambda: (vacios(), filtro, centavos), progreso):
+                acumular(resultado)
+            return total.a_metrics()
+
+        partes = workers * (_RANGOS_POR_WORKER_PROGRESO if progreso is not None else 1)
+        cabecera, rangos = _rangos_de_bytes(nombre_archivo, partes)
+        if not rangos:
+            return total.a_metrics()
+        columnas = _columnas_desde_cabecera(cabecera)
+
+        def acumular_rango(resultado, inicio, fin):
+            acumular(resultado)
+            if progreso is not None:
+                progreso.avanzar(fin - inicio, resultado[0].num_registros)
+
+        if workers == 1 or len(rangos) <= 1:
+            for inicio, fin in rangos:
+                acumular_rango(_procesar_rango(nombre_archivo, inicio, fin, columnas, vacios(), filtro, centavos),
+                               inicio, fin)
+            return total.a_metrics()
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(rangos))) as pool:
+            futuros = [
+                pool.submit(_procesar_rango, nombre_archivo, inicio, fin, columnas, vacios(), filtro, centavos)
+                for inicio, fin in rangos
+            ]
+            for futuro, (inicio, fin) in zip(futuros, rangos):
+                acumular_rango(futuro.result(), inicio, fin)
+
+    return total.a_metrics()
+
+
+# --- Análisis incremental ----------------------------------------------------
+# Bytes del comienzo y del final del prefijo ya procesado que se hashean para
+# detectar si el prefijo cambió. Hashear ventanas fijas mantiene el costo de
+# validación en O(1) respecto al tamaño del archivo.
+_VENTANA_HUELLA = 1 << 20
+
+
+def _huella_prefijo(datos, offset: int) -> str:
+    """Hash SHA-256 de las ventanas inicial y final de `datos[:offset]`."""
+    h = hashlib.sha256()
+    h.update(str(offset).encode("ascii"))
+    h.update(datos[:min(offset, _VENTANA_HUELLA)])
+    h.update(datos[max(0, offset - _VENTANA_HUELLA):offset])
+    return h.hexdigest()
+
+
+def _leer_checkpoint(ruta: str) -> Optional[Dict[str, object]]:
+    """Carga un checkpoint JSON; None si no existe o está corrupto."""
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            ckpt = json.load(f)
+        ckpt["parcial"] = VentasParcial(**ckpt["parcial"])
+        return ckpt
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _guardar_checkpoint(ruta: str, offset: int, huella: str, parcial: VentasParcial,
+                        filtro: Optional[list] = None) -> None:
+    """Escribe el checkpoint de forma atómica (temporal + rename)."""
+    with open(ruta + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"offset": offset, "huella": huella, "filtro": filtro, "parcial": asdict(parcial)}, f,
+                  ensure_ascii=False)
+    os.replace(ruta + ".tmp", ruta)
+
+
+def analizar_ventas_incremental(nombre_archivo: str, checkpoint: Optional[str] = None,
+                                filtro: Optional[FiltroVentas] = None,
+                                centavos: bool = False) -> VentasMetrics:
+    """
+    Analiza un CSV de solo-agregado procesando únicamente las filas nuevas.
+
+    Guarda un checkpoint con el último offset procesado, una huella del
+    prefijo ya leído y el `VentasParcial` acumulado. En la siguiente
+    ejecución, si la huella coincide, solo se escanea la cola nueva y se
+    combina con el parcial guardado: el costo pasa a ser O(filas nuevas).
+    Si el prefijo cambió (o no hay checkpoint) se hace un escaneo completo.
+
+    Args:
+        nombre_archivo (str): Ruta del archivo CSV a analizar
+        checkpoint (Optional[str]): Ruta del checkpoint JSON. Si es None,
+            usa `<nombre_archivo>.ckpt.json`
+        filtro (Optional[FiltroVentas]): Si se indica, solo se agregan las
+            filas que lo cumplen. Un checkpoint guardado con otro filtro
+            se descarta. Default: None
+        centavos (bool): Si es True, suma en centavos enteros exactos. Un
+            checkpoint guardado en el otro modo se descarta. Default: False
+
+    Returns:
+        VentasMetrics: Métricas de todo el archivo procesado hasta ahora
+
+    Raises:
+        FileNotFoundError: Si el archivo no existe
+        KeyError: Si faltan columnas requeridas en el CSV
+        ValueError: Si el archivo está comprimido (no admite offsets)
+
+    Note:
+        Solo se consumen líneas terminadas en salto de línea: una fila que
+        se está escribiendo al momento del análisis queda para la próxima
+        ejecución. La huella cubre el primer y el último MiB del prefijo,
+        suficiente para detectar truncados o reescrituras de un archivo
+        que, por contrato, solo crece al final.
+    """
+    if _tipo_compresion(nombre_archivo) is not None:
+        raise ValueError("El análisis incremental requiere un CSV sin comprimir.")
+    ruta_ckpt = checkpoint or nombre_archivo + ".ckpt.json"
+    ckpt = _leer_checkpoint(ruta_ckpt)
+    clave_filtro = filtro.clave() if filtro is not None else None
+
+    with _mapear_archivo(nombre_archivo) as datos:
+        fin_cabecera = datos.find(b"\n")
+        if fin_cabecera < 0:
+            return VentasParcial().a_metrics()
+        columnas = _columnas_desde_cabecera(datos[:fin_cabecera + 1])
+        fin = datos.rfind(b"\n") + 1
+
+        inicio, parcial = fin_cabecera + 1, VentasParcial(centavos=centavos)
+        if (ckpt is not None and ckpt.get("filtro") == clave_filtro
+                and ckpt["parcial"].centavos == centavos):
+            offset = int(ckpt["offset"])
+            if inicio <= offset <= fin and _huella_prefijo(datos, offset) == ckpt["huella"]:
+                inicio, parcial = offset, ckpt["parcial"]
+
+        parcial.combinar(_agregar_filas(
+            _filas_de_bloques(_bloques_de_lineas(datos, inicio, fin), columnas, filtro, centavos),
+            centavos=centavos))
+        huella = _huella_prefijo(datos, fin)
+
+    _guardar_checkpoint(ruta_ckpt, fin, huella, parcial, clave_filtro)
+    return parcial.a_metrics()
+
+
+# --- Estadísticas por producto ----------------------------------------------
+def _agregar_por_producto(filas: Iterable[Tuple[int, str, float, int]]) -> VentasPorProducto:
+    """
+    Calcula las estadísticas por producto en una sola pasada.
+
+    En el bucle cada producto usa una lista de 6 números
+    `[ventas, unidades, ingresos, min, max, suma_precios]` (más barata de
+    actualizar que un objeto); al final se convierten a `EstadisticasProducto`.
+    """
+    acumuladores: Dict[str, List[float]] = {}
+    n = 0
 
-    return VentasMetrics(
-        ventas_totales=round(suma_ventas, 2),
-        promedio_por_venta=round(promedio, 2),
-        producto_mas_vendido=producto_top,
-        cantidad_mas_vendida=int(cant_top),
-        num_registros=n,
+    for (_id, producto, precio, cantidad) in filas:
+        n += 1
+        acc = acumuladores.get(producto)
+        if acc is None:
+            acumuladores[producto] = [1, cantidad, precio * cantidad, precio, precio, precio]
+            continue
+        acc[0] += 1
+        acc[1] += cantidad
+        acc[2] += precio * cantidad
+        if precio < acc[3]:
+            acc[3] = precio
+        elif precio > acc[4]:
+            acc[4] = precio
+        acc[5] += precio
+
+    return VentasPorProducto(
+        {prod: EstadisticasProducto(*acc) for prod, acc in acumuladores.items()}, n
     )
 
 
+def _procesar_rango_por_producto(nombre_archivo: str, inicio: int, fin: int,
+                                 columnas: Tuple[int, int, int, int],
+                                 filtro: Optional[FiltroVentas] = None) -> VentasPorProducto:
+    """Worker de `analizar_por_producto` para el rango [inicio, fin)."""
+    with _mapear_archivo(nombre_archivo) as datos:
+        return _agregar_por_producto(
+            _filas_de_bloques(_bloques_de_lineas(datos, inicio, fin), columnas, filtro))
+
+
+def _procesar_bloque_por_producto(bloque: bytes, columnas: Tuple[int, int, int, int],
+                                  filtro: Optional[FiltroVentas] = None) -> VentasPorProducto:
+    """Worker de `analizar_por_producto` para un bloque ya descomprimido."""
+    return _agregar_por_producto(_filas_de_bloques((bloque,), columnas, filtro))
+
+
+def analizar_por_producto(nombre_archivo: str, workers: int = 1,
+                          filtro: Optional[FiltroVentas] = None) -> VentasPorProducto:
+    """
+    Calcula ingresos, ventas, unidades, precio mínimo/máximo y promedio por producto.
+
+    Recorre el archivo una sola vez. Con `workers > 1` reparte rangos de
+    bytes entre procesos igual que `analizar_ventas_parallel` y combina los
+    `VentasPorProducto` parciales en orden de archivo.
+
+    Args:
+        nombre_archivo (str): Ruta del archivo CSV a analizar
+        workers (int): Número de procesos. Default: 1 (sin pool)
+        filtro (Optional[FiltroVentas]): Si se indica, solo se agregan las
+            filas que lo cumplen. Default: None
+
+    Returns:
+        VentasPorProducto: Estadísticas por producto y total de registros
+
+    Raises:
+        FileNotFoundError: Si el archivo no existe
+        KeyError: Si faltan columnas requeridas en el CSV
+    """
+    total = VentasPorProducto()
+    if _tipo_compresion(nombre_archivo) is not None:
+        for parcial in _resultados_por_bloque(nombre_archivo, workers, _procesar_bloque_por_producto,
+                                              lambda: (filtro,)):
+            total.combinar(parcial)
+        return total
+
+    cabecera, rangos = _rangos_de_bytes(nombre_archivo, max(1, workers))
+    if not rangos:
+        return total
+    columnas = _columnas_desde_cabecera(cabecera)
+
+    if workers <= 1 or len(rangos) == 1:
+        for inicio, fin in rangos:
+            total.combinar(_procesar_rango_por_producto(nombre_archivo, inicio, fin, columnas, filtro))
+        return total
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(rangos))) as pool:
+        futuros = [
+            pool.submit(_procesar_rango_por_producto, nombre_archivo, inicio, fin, columnas, filtro)
+            for inicio, fin in rangos
+        ]
+        for futuro in futuros:
+            total.combinar(futuro.result())
+    return total
+
+
+# --- Análisis de particiones (varios archivos) --------------------------------
+_EXTENSIONES_PARTICION = (".csv", ".csv.gz", ".csv.bz2", ".csv.xz")
+_CACHE_PARTICIONES = ".ventas_parciales.json"
+
+
+def _resolver_particiones(origen: str) -> List[str]:
+    """
+    Lista ordenada de archivos a analizar a partir de un directorio o un glob.
+
+    Un directorio aporta sus archivos `.csv` (comprimidos o no) de primer
+    nivel y un archivo existente se toma tal cual (aunque su nombre tenga
+    `[`); cualquier otro valor se expande como patrón de `glob`.
+
+    Raises:
+        FileNotFoundError: Si no hay archivos que coincidan
+    """
+    if os.path.isdir(origen):
+        archivos = [os.path.join(origen, nombre) for nombre in os.listdir(origen)
+                    if nombre.endswith(_EXTENSIONES_PARTICION)]
+    elif os.path.isfile(origen):
+        archivos = [origen]
+    else:
+        archivos = glob.glob(origen)
+    archivos = sorted(a for a in archivos if os.path.isfile(a))
+    if not archivos:
+        raise FileNotFoundError(f"No hay archivos de ventas en '{origen}'")
+    return archivos
+
+
+def _clave_particion(nombre_archivo: str) -> List[int]:
+    """Tamaño y mtime (ns) del archivo: cambia si el archivo se reescribe."""
+    st = os.stat(nombre_archivo)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _parcial_de_archivo(nombre_archivo: str, filtro: Optional[FiltroVentas] = None,
+                        centavos: bool = False) -> VentasParcial:
+    """Worker de `analizar_ventas_particiones`: agrega un archivo completo."""
+    return _agregar_filas(_iter_csv_filas(nombre_archivo, filtro, centavos), centavos=centavos)
+
+
+def _leer_cache_particiones(ruta: str) -> Dict[str, Dict[str, object]]:
+    """Carga el cache de parciales por archivo; vacío si no existe o está corrupto."""
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            entradas = json.load(f)
+        for entrada in entradas.values():
+            entrada["parcial"] = VentasParcial(**entrada["parcial"])
+        return entradas
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return {}
+
+
+def _guardar_cache_particiones(ruta: str, entradas: Dict[str, Dict[str, object]]) -> None:
+    """Escribe el cache de parciales de forma atómica (temporal + rename)."""
+    serializable = {archivo: {"clave": e["clave"], "filtro": e["filtro"], "parcial": asdict(e["parcial"])}
+                    for archivo, e in entradas.items()}
+    with open(ruta + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(serializable, f, ensure_ascii=False)
+    os.replace(ruta + ".tmp", ruta)
+
+
+def analizar_ventas_particiones(origen: str, workers: Optional[int] = None,
+                                cache: Optional[str] = "auto",
+                                filtro: Optional[FiltroVentas] = None,
+                                centavos: bool = False) -> VentasMetrics:
+    """
+    Analiza un conjunto de CSV (uno por partición, p. ej. por día) como uno solo.
+
+    Los archivos se procesan concurrentemente en un pool de procesos, cada
+    uno a un `VentasParcial`, y los parciales se combinan en orden de nombre
+    de archivo. El parcial de cada archivo se guarda en un cache JSON con su
+    tamaño y mtime: en la siguiente ejecución solo se vuelven a parsear los
+    archivos nuevos o modificados. El cache se comparte entre orígenes del
+    mismo directorio: se conservan las entradas de archivos que esta
+    corrida no tomó y se podan las de archivos borrados o modificados.
+
+    Args:
+        origen (str): Directorio (se toman sus `.csv`, `.csv.gz`, `.csv.bz2`
+            y `.csv.xz`) o patrón glob, p. ej. `"ventas/2024-05-*.csv"`
+        workers (Optional[int]): Número de procesos. Si es None, usa
+            `os.cpu_count()`. Con 1 worker se procesa en el propio proceso.
+        cache (Optional[str]): Ruta del cache de parciales. "auto" lo ubica
+            en el directorio común de los archivos como
+            `.ventas_parciales.json`; None lo desactiva. Default: "auto"
+        filtro (Optional[FiltroVentas]): Si se indica, solo se agregan las
+            filas que lo cumplen. Los parciales cacheados con otro filtro
+            se recalculan. Default: None
+        centavos (bool): Si es True, suma en centavos enteros exactos; los
+            parciales cacheados en el otro modo se recalculan. Default: False
+
+    Returns:
+        VentasMetrics: Métricas del conjunto completo de archivos
+
+    Raises:
+        FileNotFoundError: Si no hay archivos que coincidan con `origen`
+        KeyError: Si faltan columnas requeridas en algún CSV
+    """
+    archivos = _resolver_particiones(origen)
+    if cache == "auto":
+        cache = os.path.join(os.path.commonpath([os.path.dirname(os.path.abspath(a)) for a in archivos]),
+                             _CACHE_PARTICIONES)
+    previas = _leer_cache_particiones(cache) if cache else {}
+
+    clave_filtro = filtro.clave() if filtro is not None else None
+    entradas: Dict[str, Dict[str, object]] = {}
+    pendientes = []
+    for archivo in archivos:
+        ruta = os.path.abspath(archivo)
+        clave = _clave_particion(archivo)
+        previa = previas.get(ruta)
+        if (previa is not None and previa["clave"] == clave and previa.get("filtro") == clave_filtro
+                and previa["parcial"].centavos == centavos):
+            entradas[ruta] = previa
+        else:
+            entradas[ruta] = {"clave": clave, "filtro": clave_filtro, "parcial": None}
+            pendientes.append(ruta)
+
+    workers = min(workers or os.cpu_count() or 1, max(1, len(pendientes)))
+    if workers == 1:
+        for ruta in pendientes:
+            entradas[ruta]["parcial"] = _parcial_de_archivo(ruta, filtro, centavos)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            filtros, modos = [filtro] * len(pendientes), [centavos] * len(pendientes)
+            for ruta, parcial in zip(pendientes, pool.map(_parcial_de_archivo, pendientes, filtros, modos)):
+                entradas[ruta]["parcial"] = parcial
+
+    if cache:
+        # se fusiona con las entradas de otros archivos (otro glob sobre el
+        # mismo directorio); solo se podan las de archivos borrados o
+        # modificados desde que se cachearon
+        vigentes = {ruta: previa for ruta, previa in previas.items()
+                    if ruta not in entradas and os.path.isfile(ruta)
+                    and _clave_particion(ruta) == previa["clave"]}
+        if pendientes or len(vigentes) + len(entradas) != len(previas):
+            _guardar_cache_particiones(cache, {**vigentes, **entradas})
+
+    total = VentasParcial(centavos=centavos)
+    for archivo in archivos:
+        total.combinar(entradas[os.path.abspath(archivo)]["parcial"])
+    return total.a_metrics()
+
+
+# --- Almacén binario indexado -------------------------------------------------
+# Formato: magia | registros de ancho fijo agrupados por producto | meta JSON |
+# largo de la meta (uint64) | magia. La meta va al final porque las
+# estadísticas por bloque se calculan mientras se escriben los registros.
+_ALMACEN_SUFIJO = ".vstore"
+_ALMACEN_MAGIA = b"VSTORE1\n"
+# (ID_Venta, Precio_Unitario, Cantidad, código de producto), little-endian sin relleno
+_REGISTRO = struct.Struct("<qdiH")
+_REGISTROS_POR_BLOQUE = 4096
+_BYTES_PENDIENTES_MAX = 16 << 20
+
+
+def _dtype_registro():
+    """dtype estructurado de NumPy equivalente a `_REGISTRO`."""
+    return _np.dtype([("id", "<i8"), ("precio", "<f8"), ("cantidad", "<i4"), ("producto", "<u2")])
+
+
+def indexar_ventas(nombre_archivo: str, salida: Optional[str] = None) -> str:
+    """
+    Convierte un CSV en un almacén binario de registros de ancho fijo indexado por producto.
+
+    Cada fila se guarda como un registro de 22 bytes (`_REGISTRO`). Los
+    registros se agrupan por producto (en orden de primera aparición y, dentro
+    de cada producto, en orden de archivo), de modo que el índice de un
+    producto es un rango contiguo. Cada producto se divide en bloques de
+    `_REGISTROS_POR_BLOQUE` registros con el mínimo y máximo de ID_Venta y de
+    Precio_Unitario, que permiten saltar bloques en las consultas.
+
+    La meta guarda la ruta absoluta y la clave (tamaño, mtime, cabecera)
+    del CSV de origen; `consultar_almacen` regenera el almacén si el CSV
+    cambió.
+
+    Se hace una sola pasada sobre el CSV: los registros se acumulan por
+    producto y se vuelcan a un único temporal cuando lo pendiente supera
+    `_BYTES_PENDIENTES_MAX`, así que la memoria no depende del tamaño del
+    archivo.
+
+    Args:
+        nombre_archivo (str): Ruta del CSV (plano o comprimido)
+        salida (Optional[str]): Ruta del almacén. Default: `<archivo>.vstore`
+
+    Returns:
+        str: Ruta del almacén generado
+
+    Raises:
+        FileNotFoundError: Si el archivo no existe
+        ValueError: Si hay más de 65,536 productos distintos
+    """
+    ruta = salida or nombre_archivo + _ALMACEN_SUFIJO
+    codigos: Dict[str, int] = {}
+    pendientes: List[bytearray] = []
+    trozos: List[List[Tuple[int, int]]] = []
+    pack = _REGISTRO.pack
+    n = 0
+    bytes_pendientes = 0
+
+    with tempfile.TemporaryFile() as tmp:
+
+        def volcar():
+            for codigo, buf in enumerate(pendientes):
+                if buf:
+                    trozos[codigo].append((tmp.tell(), len(buf)))
+                    tmp.write(buf)
+                    del buf[:]
+
+        for (id_venta, producto, precio, cantidad) in _iter_csv_filas(nombre_archivo):
+            codigo = codigos.get(producto)
+            if codigo is None:
+                if len(codigos) > 0xFFFF:
+                    raise ValueError("El almacén admite hasta 65,536 productos distintos.")
+                codigo = codigos[producto] = len(codigos)
+                pendientes.append(bytearray())
+                trozos.append([])
+            pendientes[codigo] += pack(id_venta, precio, cantidad, codigo)
+            n += 1
+            bytes_pendientes += _REGISTRO.size
+            if bytes_pendientes >= _BYTES_PENDIENTES_MAX:
+                volcar()
+                bytes_pendientes = 0
+        volcar()
+
+        tam_bloque = _REGISTROS_POR_BLOQUE * _REGISTRO.size
+        productos_meta = []
+        inicio = 0
+        with open(ruta + ".tmp", "wb") as out:
+            out.write(_ALMACEN_MAGIA)
+            for producto, codigo in codigos.items():
+                bloques: List[List[float]] = []
+                resto = bytearray()
+
+                def cerrar_bloque(datos: bytes):
+                    registros = list(_REGISTRO.iter_unpack(datos))
+                    ids = [r[0] for r in registros]
+                    precios = [r[1] for r in registros]
+                    bloques.append([min(ids), max(ids), min(precios), max(precios)])
+                    out.write(datos)
+
+                for offset, largo in trozos[codigo]:
+                    tmp.seek(offset)
+                    resto += tmp.read(largo)
+                    while len(resto) >= tam_bloque:
+                        cerrar_bloque(bytes(resto[:tam_bloque]))
+                        del resto[:tam_bloque]
+                if resto:
+                    cerrar_bloque(bytes(resto))
+
+                cuenta = sum(largo for _, largo in trozos[codigo]) // _REGISTRO.size
+                productos_meta.append({"nombre": producto, "inicio": inicio, "cuenta": cuenta,
+                                       "bloques": bloques})
+                inicio += cuenta
+
+            meta = {"n": n, "registros_por_bloque": _REGISTROS_POR_BLOQUE,
+                    "productos": productos_meta, "origen": _clave_csv(nombre_archivo),
+                    "archivo": os.path.abspath(nombre_archivo)}
+            meta_bytes = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+            out.write(meta_bytes)
+            out.write(struct.pack("<Q", len(meta_bytes)))
+            out.write(_ALMACEN_MAGIA)
+        os.replace(ruta + ".tmp", ruta)
+
+    return ruta
+
+
+def es_almacen(ruta: str) -> bool:
+    """True si `ruta` es un almacén generado por `indexar_ventas`."""
+    try:
+        with open(ruta, "rb") as f:
+            return f.read(len(_ALMACEN_MAGIA)) == _ALMACEN_MAGIA
+    except OSError:
+        return False
+
+
+def _leer_meta_almacen(ruta: str) -> Dict[str, object]:
+    """
+    Lee la meta del final del almacén.
+
+    Raises:
+        ValueError: Si el archivo no es un almacén completo
+    """
+    cola = 8 + len(_ALMACEN_MAGIA)
+    with open(ruta, "rb") as f:
+        inicio = f.read(len(_ALMACEN_MAGIA))
+        f.seek(0, os.SEEK_END)
+        tam = f.tell()
+        if inicio != _ALMACEN_MAGIA or tam < len(_ALMACEN_MAGIA) + cola:
+            raise ValueError(f"'{ruta}' no es un almacén de ventas")
+        f.seek(tam - cola)
+        largo_bytes = f.read(8)
+        if f.read() != _ALMACEN_MAGIA:
+            raise ValueError(f"Almacén incompleto: '{ruta}'")
+        (largo,) = struct.unpack("<Q", largo_bytes)
+        f.seek(tam - cola - largo)
+        return json.loads(f.read(largo).decode("utf-8"))
+
+
+def _agregar_bloque_almacen(registros, limites: Optional[Tuple[float, float, float, float]],
+                            centavos: bool) -> Tuple[float, int, int]:
+    """
+    Suma, conteo y unidades de un bloque de registros.
+
+    `registros` es un arreglo estructurado de NumPy o un `bytes` con
+    registros empaquetados. Con `limites` = (id_min, id_max, precio_min,
+    precio_max) se filtra fila a fila; sin ellos se toma el bloque completo.
+    """
+    if _np is not None and not isinstance(registros, bytes):
+        precios, cantidades = registros["precio"], registros["cantidad"].astype(_np.int64)
+        if limites is not None:
+            imin, imax, pmin, pmax = limites
+            ids = registros["id"]
+            mascara = (ids >= imin) & (ids <= imax) & (precios >= pmin) & (precios <= pmax)
+            precios, cantidades = precios[mascara], cantidades[mascara]
+        if centavos:
+            suma = int(_np.dot(_np.rint(precios * 100).astype(_np.int64), cantidades))
+        else:
+            suma = float(_np.dot(precios, cantidades))
+        return suma, int(len(precios)), int(cantidades.sum())
+
+    suma, n, unidades = (0 if centavos else 0.0), 0, 0
+    for id_venta, precio, cantidad, _codigo in _REGISTRO.iter_unpack(registros):
+        if limites is not None and not (limites[0] <= id_venta <= limites[1]
+                                        and limites[2] <= precio <= limites[3]):
+            continue
+        suma += (round(precio * 100) if centavos else precio) * cantidad
+        n += 1
+        unidades += cantidad
+    return suma, n, unidades
+
+
+def consultar_almacen(ruta: str, filtro: Optional[FiltroVentas] = None,
+                      centavos: bool = False) -> VentasParcial:
+    """
+    Agrega los registros del almacén que cumplen `filtro`, leyendo solo los bloques necesarios.
+
+    El filtro de productos elige los rangos del índice; los rangos de ID y de
+    precio descartan bloques completos con sus estadísticas mín/máx. Los
+    bloques que caen enteros dentro de los límites se agregan sin evaluar
+    fila a fila. Los registros se leen por `mmap` (`np.memmap` con NumPy).
+
+    Igual que el sidecar y el checkpoint incremental, el almacén se
+    invalida solo: si el CSV de origen todavía existe y su clave no coincide
+    con la guardada al indexar, se vuelve a indexar antes de consultar.
+
+    Args:
+        ruta (str): Ruta del almacén (ver `indexar_ventas`)
+        filtro (Optional[FiltroVentas]): Filas a incluir. Default: todas
+        centavos (bool): Si es True, redondea cada precio a centavos y suma
+            enteros exactos. Default: False
+
+    Returns:
+        VentasParcial: Agregado de las filas seleccionadas; con
+            `a_metrics()` da las mismas métricas que los demás motores
+
+    Raises:
+        ValueError: Si `ruta` no es un almacén válido
+
+    Note:
+        Las sumas en punto flotante se acumulan por producto y bloque, así
+        que `ventas_totales` puede diferir del streaming en el último bit
+        antes del redondeo a centavos.
+    """
+    meta = _leer_meta_almacen(ruta)
+    origen = meta.get("archivo")
+    if origen and os.path.exists(origen) and _clave_csv(origen) != meta.get("origen"):
+        # el CSV cambió desde que se indexó: el almacén ya no lo representa
+        indexar_ventas(origen, ruta)
+        meta = _leer_meta_almacen(ruta)
+    n_total = int(meta["n"])
+    por_bloque = int(meta["registros_por_bloque"])
+    if filtro is None:
+        filtro = FiltroVentas()
+    imin, imax = filtro.limites_id
+    pmin, pmax = filtro.limites_precio
+    limites = (imin, imax, pmin, pmax)
+    parcial = VentasParcial(centavos=centavos)
+    if n_total == 0:
+        return parcial
+
+    with ExitStack() as pila:
+        if _np is not None:
+            registros = _np.memmap(ruta, dtype=_dtype_registro(), mode="r",
+                                   offset=len(_ALMACEN_MAGIA), shape=(n_total,))
+            leer = lambda primero, k: registros[primero:primero + k]
+        else:
+            datos = pila.enter_context(_mapear_archivo(ruta))
+            base = len(_ALMACEN_MAGIA)
+            leer = lambda primero, k: datos[base + primero * _REGISTRO.size:
+                                            base + (primero + k) * _REGISTRO.size]
+
+        for prod in meta["productos"]:
+            if not filtro.acepta_producto(prod["nombre"]):
+                continue
+            suma, n, unidades = (0 if centavos else 0.0), 0, 0
+            for j, (id_lo, id_hi, p_lo, p_hi) in enumerate(prod["bloques"]):
+                if id_hi < imin or id_lo > imax or p_hi < pmin or p_lo > pmax:
+                    continue
+                completo = imin <= id_lo and id_hi <= imax and pmin <= p_lo and p_hi <= pmax
+                k = min(por_bloque, prod["cuenta"] - j * por_bloque)
+                s_b, n_b, u_b = _agregar_bloque_almacen(leer(prod["inicio"] + j * por_bloque, k),
+                                                        None if completo else limites, centavos)
+                suma += s_b
+                n += n_b
+                unidades += u_b
+            if n:
+                parcial.combinar(VentasParcial(suma, n, {prod["nombre"]: unidades}, centavos))
+    return parcial
+
+
+def analizar_ventas_almacen(ruta: str, filtro: Optional[FiltroVentas] = None,
+                            centavos: bool = False) -> VentasMetrics:
+    """
+    Calcula `VentasMetrics` sobre un almacén indexado (ver `consultar_almacen`).
+
+    Args:
+        ruta (str): Ruta del almacén generado por `indexar_ventas`
+        filtro (Optional[FiltroVentas]): Filas a incluir. Default: todas
+        centavos (bool): Suma exacta en centavos. Default: False
+
+    Returns:
+        VentasMetrics: Métricas de las filas seleccionadas
+    """
+    return consultar_almacen(ruta, filtro, centavos).a_metrics()
+
+
+# --- Perfilado por muestreo --------------------------------------------------
+class MuestreadorPilas:
+    """
+    Profiler por muestreo de pilas, de bajo overhead, para dejar activo en
+    corridas reales.
+
+    A diferencia de cProfile, no instrumenta cada llamada. Un temporizador
+    interrumpe el proceso `hz` veces por segundo y se anota la pila del hilo
+    principal en ese instante. El costo es proporcional a las muestras, no a
+    las filas, así que el bucle por fila del streaming no se distorsiona.
+
+    En Unix usa `signal.setitimer(ITIMER_PROF)`, que cuenta tiempo de CPU del
+    proceso. Si no hay `setitimer` (Windows) o no se está en el hilo
+    principal, un hilo lee `sys._current_frames()` cada `1/hz` segundos
+    (tiempo de pared).
+
+    Args:
+        hz (float): Muestras por segundo. Default: 100
+        senal (Optional[bool]): Forzar (True) o evitar (False) el modo por
+            señal. Default: automático
+
+    Example:
+        >>> with MuestreadorPilas(hz=200) as m:
+        ...     analizar_ventas_streaming("ventas.csv")
+        >>> m.guardar_colapsado("perfil.folded")   # flamegraph.pl / speedscope
+    """
+
+    def __init__(self, hz: float = 100.0, senal: Optional[bool] = None):
+        if hz <= 0:
+            raise ValueError("hz debe ser > 0")
+        self.intervalo = 1.0 / hz
+        puede_senal = hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+        if senal and not puede_senal:
+            raise RuntimeError("setitimer no está disponible en el entorno.")
+        self.senal = puede_senal if senal is None else senal
+        # pila (tupla de code objects, raíz primero) -> muestras
+        self.pilas: Dict[Tuple[object, ...], int] = {}
+        self.duracion = 0.0
+        self._hilo_objetivo = threading.main_thread().ident
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+        self._manejador_previo = None
+        self._t0 = 0.0
+
+    @property
+    def muestras(self) -> int:
+        return sum(self.pilas.values())
+
+    def _registrar(self, frame) -> None:
+        codigos = []
+        while frame is not None:
+            codigos.append(frame.f_code)
+            frame = frame.f_back
+        clave = tuple(reversed(codigos))
+        self.pilas[clave] = self.pilas.get(clave, 0) + 1
+
+    def _al_senal(self, _signum, frame) -> None:
+        self._registrar(frame)
+
+    def _bucle_hilo(self) -> None:
+        while not self._detener.wait(self.intervalo):
+            frame = sys._current_frames().get(self._hilo_objetivo)
+            if frame is not None:
+                self._registrar(frame)
+
+    def iniciar(self) -> "MuestreadorPilas":
+        self._t0 = time.perf_counter()
+        if self.senal:
+            self._manejador_previo = signal.signal(signal.SIGPROF, self._al_senal)
+            signal.setitimer(signal.ITIMER_PROF, self.intervalo, self.intervalo)
+        else:
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._bucle_hilo, name="muestreador", daemon=True)
+            self._hilo.start()
+        return self
+
+    def detener(self) -> None:
+        if self.senal:
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+            signal.signal(signal.SIGPROF, self._manejador_previo or signal.SIG_DFL)
+        elif self._hilo is not None:
+            self._detener.set()
+            self._hilo.join()
+            self._hilo = None
+        self.duracion += time.perf_counter() - self._t0
+
+    def __enter__(self) -> "MuestreadorPilas":
+        return self.iniciar()
+
+    def __exit__(self, *exc) -> None:
+        self.detener()
+
+    @staticmethod
+    def _etiqueta(codigo) -> str:
+        return f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})"
+
+    def colapsado(self) -> List[str]:
+        """Pilas en formato colapsado (`raiz;...;hoja N`), ordenadas por muestras."""
+        etiquetas: Dict[object, str] = {}
+        lineas = []
+        for pila, n in sorted(self.pilas.items(), key=lambda kv: -kv[1]):
+            nombres = []
+            for codigo in pila:
+                if codigo not in etiquetas:
+                    etiquetas[codigo] = self._etiqueta(codigo).replace(";", ":")
+                nombres.append(etiquetas[codigo])
+            lineas.append(f"{';'.join(nombres)} {n}")
+        return lineas
+
+    def guardar_colapsado(self, ruta: str) -> str:
+        """Escribe `colapsado()` en `ruta` (entrada de flamegraph.pl, speedscope, etc.)."""
+        with open(ruta, "w", encoding="utf-8") as f:
+            f.writelines(linea + "\n" for linea in self.colapsado())
+        return ruta
+
+    def top(self, n: int = 15) -> List[Tuple[str, int, int]]:
+        """
+        Funciones con más muestras.
+
+        Returns:
+            List[Tuple[str, int, int]]: (función, muestras propias, muestras
+            inclusivas), ordenadas por propias. "Propias" cuenta las muestras
+            en que la función era la hoja de la pila; "inclusivas", las que
+            la tenían en cualquier nivel (una vez por muestra aunque sea
+            recursiva).
+        """
+        propias: Dict[object, int] = {}
+        inclusivas: Dict[object, int] = {}
+        for pila, k in self.pilas.items():
+            if pila:
+                propias[pila[-1]] = propias.get(pila[-1], 0) + k
+            for codigo in set(pila):
+                inclusivas[codigo] = inclusivas.get(codigo, 0) + k
+        orden = sorted(inclusivas, key=lambda c: (-propias.get(c, 0), -inclusivas[c]))[:n]
+        return [(self._etiqueta(c), propias.get(c, 0), inclusivas[c]) for c in orden]
+
+
 def _imprimir_resultados(m: VentasMetrics) -> None: #pragma: no cover
     """
     Imprime los resultados del análisis en formato legible.
@@ -282,11 +3428,66 @@ def _imprimir_resultados(m: VentasMetrics) -> None: #pragma: no cover
     print("-------------------------------------------\n")
 
 
+def _imprimir_por_producto(r: VentasPorProducto) -> None: #pragma: no cover
+    """
+    Imprime la tabla de estadísticas por producto, ordenada por ingresos.
+
+    Args:
+        r (VentasPorProducto): Resultado de `analizar_por_producto`
+    """
+    print("--- 📦 Estadísticas por Producto ---")
+    print(f"{'Producto':<15} {'Ventas':>8} {'Unidades':>9} {'Ingresos':>16} "
+          f"{'P. mín':>9} {'P. máx':>9} {'P. prom':>9}")
+    for prod, e in sorted(r.productos.items(), key=lambda kv: kv[1].ingresos, reverse=True):
+        print(f"{prod:<15} {e.ventas:>8,} {e.unidades:>9,} {e.ingresos:>16,.2f} "
+              f"{e.precio_min:>9.2f} {e.precio_max:>9.2f} {e.precio_promedio:>9.2f}")
+    print("-------------------------------------------\n")
+
+
+def _imprimir_aproximados(e: EstimadoresVentas) -> None: #pragma: no cover
+    """
+    Imprime los percentiles del ticket y los conteos distintos estimados.
+
+    Args:
+        e (EstimadoresVentas): Estimadores ya alimentados por el análisis
+    """
+    r = e.resumen()
+    print("--- 📐 Estimaciones Aproximadas ---")
+    print(f"Ticket p50: ${r['ticket_p50']:,.2f}  p95: ${r['ticket_p95']:,.2f}  "
+          f"p99: ${r['ticket_p99']:,.2f}  (error relativo ≤ {e.tickets.error_relativo:.2%})")
+    print(f"Productos distintos: ~{r['productos_distintos']:,.0f}  "
+          f"IDs distintos: ~{r['ids_distintos']:,.0f}  (error estándar ≈ {e.ids.error_estandar:.2%})")
+    print("-------------------------------------------\n")
+
+
+def _imprimir_etapas(m: MetricasEtapas) -> None: #pragma: no cover
+    print(f"\n--- ⏱️ Tiempo por etapa ({m.total_segundos:.3f}s) ---")
+    print(f"{'Etapa':<15} {'Segundos':>9} {'%':>6} {'Filas/s':>13} {'MB/s':>8}")
+    for etapa, d in m.a_dict().items():
+        filas_s = f"{d['filas_por_s']:,.0f}" if d["filas_por_s"] else "-"
+        mb_s = f"{d['mb_por_s']:.1f}" if d["mb_por_s"] else "-"
+        print(f"{etapa:<15} {d['segundos']:>9.3f} {d['porcentaje']:>5.1f}% {filas_s:>13} {mb_s:>8}")
+
+
+def _imprimir_perfil(m: MuestreadorPilas, ruta: str, n: int = 15) -> None: #pragma: no cover
+    total = m.muestras
+    print(f"\n--- 🔬 Perfil por muestreo ({total:,} muestras en {m.duracion:.2f}s, "
+          f"{'señal' if m.senal else 'hilo'}) ---")
+    if not total:
+        print("Sin muestras (corrida más corta que el intervalo de muestreo).")
+        return
+    print(f"{'Propias':>8} {'Inclusivas':>11}  Función")
+    for nombre, propias, inclusivas in m.top(n):
+        print(f"{propias / total:>8.1%} {inclusivas / total:>11.1%}  {nombre}")
+    print(f"Pilas colapsadas en '{ruta}' (flamegraph.pl {ruta} > perfil.svg)")
+
+
 def _parse_args(): #pragma: no cover
     """
        Parsea los argumentos de línea de comandos.
 
-       Configura el parser de argparse con dos subcomandos: generar y analizar.
+       Configura el parser de argparse con tres subcomandos: generar, indexar
+       y analizar.
        Esta función define la interfaz CLI del módulo.
 
        Returns:
@@ -304,27 +3505,173 @@ def _parse_args(): #pragma: no cover
     p_gen.add_argument("archivo", nargs="?", default="ventas.csv")
     p_gen.add_argument("--n", type=int, default=10_000, help="número de registros")
     p_gen.add_argument("--seed", type=int, default=42, help="semilla aleatoria")
+    p_gen.add_argument("--bulk", action="store_true",
+                       help="generación masiva por bloques preformateados")
+    p_gen.add_argument("--shards", type=int, default=1,
+                       help="procesos de generación para --bulk (default: 1)")
+    p_gen.add_argument("--separar", action="store_true",
+                       help="con --bulk, deja un archivo por shard en lugar de unirlos")
+
+    p_idx = sub.add_parser("indexar", help="Convierte un CSV en un almacén binario indexado por producto")
+    p_idx.add_argument("archivo", nargs="?", default="ventas.csv")
+    p_idx.add_argument("--salida", default=None, help="ruta del almacén (default: <archivo>.vstore)")
 
     p_ana = sub.add_parser("analizar", help="Analiza un CSV (streaming por defecto)")
-    p_ana.add_argument("archivo")
-    p_ana.add_argument("--modo", choices=["stream", "pandas"], default="stream", help="método de análisis")
-    p_ana.add_argument("--chunksize", type=int, default=50_000, help="tamaño de chunk para pandas")
+    p_ana.add_argument("archivo", help="CSV, directorio de CSV o patrón glob (entre comillas)")
+    p_ana.add_argument("--modo", choices=["stream", "pandas", "numpy", "parallel"], default=None,
+                       help="método de análisis (default: stream)")
+    p_ana.add_argument("--chunksize", type=int, default=50_000, help="tamaño de chunk para pandas/numpy")
+    p_ana.add_argument("--mem-budget", type=float, default=None, metavar="MB",
+                       help="presupuesto de memoria por chunk para pandas (reemplaza --chunksize)")
+    p_ana.add_argument("--parser", choices=["auto", "c", "pyarrow"], default="auto",
+                       help="parser CSV del modo pandas (default: pyarrow si está instalado)")
+    p_ana.add_argument("--workers", type=int, default=None,
+                       help="procesos para el modo parallel (default: núcleos disponibles)")
+    p_ana.add_argument("--incremental", action="store_true",
+                       help="procesa solo las filas agregadas desde el último checkpoint")
+    p_ana.add_argument("--checkpoint", default=None,
+                       help="ruta del checkpoint incremental (default: <archivo>.ckpt.json)")
+    p_ana.add_argument("--por-producto", action="store_true",
+                       help="calcula ingresos, ventas y precios mín/máx/promedio por producto")
+    p_ana.add_argument("--aprox", action="store_true",
+                       help="estima p50/p95/p99 del ticket y productos/IDs distintos (stream/parallel)")
+    p_ana.add_argument("--error-cuantiles", type=float, default=0.01,
+                       help="error relativo máximo de los percentiles (default: 0.01)")
+    p_ana.add_argument("--error-distintos", type=float, default=0.01,
+                       help="error estándar objetivo de los conteos distintos (default: 0.01)")
+    p_ana.add_argument("--cache", action="store_true",
+                       help="crea el sidecar columnar (.vcol) si no existe para acelerar próximas ejecuciones")
+    p_ana.add_argument("--sin-cache-particiones", action="store_true",
+                       help="con varios archivos, no lee ni guarda los parciales por archivo")
+    p_ana.add_argument("--producto", action="append", default=None, metavar="NOMBRE",
+                       help="solo filas de este producto (repetible)")
+    p_ana.add_argument("--precio-min", type=float, default=None, help="precio unitario mínimo (inclusive)")
+    p_ana.add_argument("--precio-max", type=float, default=None, help="precio unitario máximo (inclusive)")
+    p_ana.add_argument("--centavos", action="store_true",
+                       help="suma precios como centavos enteros: totales exactos e idénticos entre motores")
+    p_ana.add_argument("--id-range", type=parsear_rango_ids, default=(None, None), metavar="A:B",
+                       help="rango inclusivo de ID_Venta; admite extremos abiertos (A: o :B)")
+    p_ana.add_argument("--etapas", action="store_true",
+                       help="mide e imprime el tiempo de lectura/parseo/agregado/combinación (stream/pandas/numpy)")
+    p_ana.add_argument("--etapas-json", default=None, metavar="RUTA",
+                       help="guarda las métricas por etapa en un JSON (implica --etapas)")
+    p_ana.add_argument("--progreso", action="store_true",
+                       help="muestra %%, filas/s, MB/s y ETA en stderr (stream/pandas/numpy/parallel)")
+    p_ana.add_argument("--profile", choices=["sample"], default=None,
+                       help="perfila la corrida con un muestreador de pilas de bajo overhead")
+    p_ana.add_argument("--profile-hz", type=float, default=100.0,
+                       help="muestras por segundo de --profile=sample (default: 100)")
+    p_ana.add_argument("--profile-out", default="perfil.folded",
+                       help="archivo de pilas colapsadas de --profile=sample (default: perfil.folded)")
 
     return p.parse_args()
 
 
+def _analizar_cli(args) -> None: #pragma: no cover
+    filtro = FiltroVentas(frozenset(args.producto) if args.producto else None,
+                          args.precio_min, args.precio_max, *args.id_range)
+    # opciones que solo aplican a los motores de un único archivo CSV
+    solo_csv = [opcion for opcion, activa in (
+        ("--por-producto", args.por_producto), ("--incremental", args.incremental),
+        ("--aprox", args.aprox), ("--modo", args.modo is not None),
+        ("--etapas", args.etapas or args.etapas_json), ("--progreso", args.progreso)) if activa]
+    if es_almacen(args.archivo):
+        if solo_csv:
+            raise SystemExit(f"{', '.join(solo_csv)}: no disponible sobre un almacén")
+        _imprimir_resultados(analizar_ventas_almacen(args.archivo, filtro, args.centavos))
+        return
+    # una ruta existente (p. ej. "ventas[2024].csv") nunca se trata como glob
+    if os.path.isdir(args.archivo) or (not os.path.exists(args.archivo)
+                                       and any(c in args.archivo for c in "*?[")):
+        if solo_csv:
+            raise SystemExit(f"{', '.join(solo_csv)}: requiere un único archivo")
+        metrics = analizar_ventas_particiones(args.archivo, workers=args.workers,
+                                              cache=None if args.sin_cache_particiones else "auto",
+                                              filtro=filtro, centavos=args.centavos)
+        _imprimir_resultados(metrics)
+        return
+    args.modo = args.modo or "stream"
+    if args.por_producto:
+        if args.centavos:
+            raise SystemExit("--centavos no está disponible con --por-producto")
+        if args.modo not in ("stream", "parallel") or args.incremental:
+            raise SystemExit("--por-producto solo está disponible con --modo stream o parallel")
+        if args.aprox or args.etapas or args.etapas_json or args.progreso:
+            raise SystemExit("--aprox, --etapas y --progreso no están disponibles con --por-producto")
+        workers = (args.workers or os.cpu_count() or 1) if args.modo == "parallel" else 1
+        por_producto = analizar_por_producto(args.archivo, workers=workers, filtro=filtro)
+        _imprimir_resultados(por_producto.a_parcial().a_metrics())
+        _imprimir_por_producto(por_producto)
+        return
+    estimadores = None
+    if args.aprox:
+        if args.modo not in ("stream", "parallel") or args.incremental:
+            raise SystemExit("--aprox solo está disponible con --modo stream o parallel")
+        estimadores = EstimadoresVentas.con_errores(args.error_cuantiles, args.error_distintos)
+    metricas = None
+    if args.etapas or args.etapas_json:
+        if args.modo not in ("stream", "pandas", "numpy") or args.incremental:
+            raise SystemExit("--etapas solo está disponible con --modo stream, pandas o numpy")
+        metricas = MetricasEtapas()
+    progreso = None
+    if args.progreso:
+        if args.incremental:
+            raise SystemExit("--progreso no está disponible con --incremental")
+        progreso = ReporteProgreso()
+    if args.incremental:
+        metrics = analizar_ventas_incremental(args.archivo, checkpoint=args.checkpoint, filtro=filtro,
+                                              centavos=args.centavos)
+    elif args.modo == "stream":
+        metrics = analizar_ventas_streaming(args.archivo, cache=args.cache, estimadores=estimadores,
+                                            filtro=filtro, centavos=args.centavos, metricas=metricas,
+                                            progreso=progreso)
+    elif args.modo == "numpy":
+        metrics = analizar_ventas_numpy(args.archivo, chunksize=args.chunksize, filtro=filtro,
+                                        centavos=args.centavos, metricas=metricas, progreso=progreso)
+    elif args.modo == "parallel":
+        metrics = analizar_ventas_parallel(args.archivo, workers=args.workers, estimadores=estimadores,
+                                           filtro=filtro, centavos=args.centavos, progreso=progreso)
+    else:
+        metrics = analizar_ventas_pandas(args.archivo, chunksize=args.chunksize, cache=args.cache,
+                                         mem_budget_mb=args.mem_budget, parser=args.parser,
+                                         filtro=filtro, centavos=args.centavos, metricas=metricas,
+                                         progreso=progreso)
+    _imprimir_resultados(metrics)
+    if estimadores is not None:
+        _imprimir_aproximados(estimadores)
+    if metricas is not None:
+        _imprimir_etapas(metricas)
+        if args.etapas_json:
+            with open(args.etapas_json, "w", encoding="utf-8") as f:
+                json.dump(metricas.a_dict(), f, indent=2)
+            print(f"Métricas por etapa guardadas en '{args.etapas_json}'")
+
+
 def main(): #pragma: no cover
     args = _parse_args()
     if args.cmd == "generar":
-        ruta = generar_csv_ventas(args.archivo, args.n, seed=args.seed)
-        print(f"✅ Archivo '{ruta}' con {args.n:,} registros generado.")
+        if args.bulk:
+            rutas = generar_csv_ventas_bulk(args.archivo, args.n, seed=args.seed,
+                                            shards=args.shards, separar=args.separar)
+            print(f"✅ {len(rutas)} archivo(s) con {args.n:,} registros generados: {', '.join(rutas)}")
+        else:
+            ruta = generar_csv_ventas(args.archivo, args.n, seed=args.seed)
+            print(f"✅ Archivo '{ruta}' con {args.n:,} registros generado.")
+    elif args.cmd == "indexar":
+        ruta = indexar_ventas(args.archivo, args.salida)
+        meta = _leer_meta_almacen(ruta)
+        bloques = sum(len(p["bloques"]) for p in meta["productos"])
+        print(f"✅ Almacén '{ruta}': {meta['n']:,} registros, {len(meta['productos'])} productos, "
+              f"{bloques:,} bloques.")
     elif args.cmd == "analizar":
-        if args.modo == "stream":
-            metrics = analizar_ventas_streaming(args.archivo)
+        if args.profile == "sample":
+            with MuestreadorPilas(args.profile_hz) as muestreador:
+                _analizar_cli(args)
+            muestreador.guardar_colapsado(args.profile_out)
+            _imprimir_perfil(muestreador, args.profile_out)
         else:
-            metrics = analizar_ventas_pandas(args.archivo, chunksize=args.chunksize)
-        _imprimir_resultados(metrics)
+            _analizar_cli(args)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,101 @@
+# app/overload.py
+import asyncio, time
+
+POLICIES = ("block", "drop-oldest", "drop-newest", "sample")
+
+class OverloadQueue(asyncio.Queue):
+    """asyncio.Queue con política de sobrecarga y telemetría.
+
+    Políticas para put() cuando la cola está sobrecargada:
+      - block:       espera lugar (comportamiento de asyncio.Queue).
+      - drop-oldest: descarta el item más viejo de la cola y encola el nuevo.
+      - drop-newest: descarta el item entrante.
+      - sample:      admite solo una fracción sample_rate de los entrantes.
+
+    "Sobrecargada" es: llena, o (con latency_budget) el item más viejo de la
+    cola lleva más de latency_budget segundos desde su "ts". Así se descarta
+    antes de que la cola se llene y las ventanas siguen saliendo a tiempo.
+    latency_budget no se admite con block, que nunca descarta.
+    Con drop-oldest y drop-newest, por presupuesto se descartan todos los
+    items vencidos de la cabeza (nunca el entrante, que es el más fresco);
+    drop-newest solo rechaza el entrante si la cola sigue llena.
+
+    Contadores en posts: un item con "items" (lote del pipeline) cuenta
+    len(item["items"]) posts. dropped (descartes por cola llena), shed
+    (descartes por presupuesto o muestreo antes de llenarse), admitted.
+    depth y high_water (profundidad máxima observada) van en items.
+    """
+
+    def __init__(self, maxsize=10000, policy="block", latency_budget=None,
+                 sample_rate=0.5, clock=time.time):
+        if policy not in POLICIES:
+            raise ValueError(f"política desconocida: {policy!r} (usar {', '.join(POLICIES)})")
+        if policy == "block" and latency_budget is not None:
+            # block nunca descarta: el presupuesto se ignoraría en silencio
+            raise ValueError("latency_budget requiere una política que descarte (no block)")
+        if not 0.0 < sample_rate <= 1.0:
+            raise ValueError("sample_rate debe estar en (0, 1]")
+        super().__init__(maxsize)
+        self.policy = policy
+        self.latency_budget = latency_budget
+        self.sample_rate = sample_rate
+        self.clock = clock
+        self.admitted = self.dropped = self.shed = self.high_water = 0
+        self._credit = 0.0  # muestreo determinista: admite cuando acumula 1
+
+    @staticmethod
+    def _posts(item):
+        return len(item["items"]) if "items" in item else 1
+
+    def _put(self, item):
+        super()._put(item)
+        self.admitted += self._posts(item)
+        if len(self._queue) > self.high_water:
+            self.high_water = len(self._queue)
+
+    def _age(self, item):
+        return self.clock() - item["ts"]
+
+    def lagging(self):
+        """True si el item más viejo ya excede el presupuesto de latencia."""
+        return (self.latency_budget is not None and bool(self._queue)
+                and self._age(self._queue[0]) > self.latency_budget)
+
+    def _evict_head(self):
+        item = self._queue.popleft()
+        self.task_done()  # el item descartado no va a pasar por un consumidor
+        return self._posts(item)
+
+    async def put(self, item):
+        """Encola según la política; devuelve False si el item se descartó."""
+        if self.policy == "block":
+            await super().put(item)
+            return True
+        return self.offer(item)
+
+    def offer(self, item):
+        """Versión sin espera de put() para políticas que descartan."""
+        if self.policy in ("drop-oldest", "drop-newest"):
+            while self.lagging():
+                self.shed += self._evict_head()
+            if self.full():
+                if self.policy == "drop-newest":
+                    self.dropped += self._posts(item)
+                    return False
+                self.dropped += self._evict_head()
+        elif self.policy == "sample":
+            if self.full():
+                self.dropped += self._posts(item)
+                return False
+            if self.lagging():
+                self._credit += self.sample_rate
+                if self._credit < 1.0:
+                    self.shed += self._posts(item)
+                    return False
+                self._credit -= 1.0
+        self.put_nowait(item)
+        return True
+
+    def telemetry(self):
+        return {"policy": self.policy, "depth": self.qsize(), "high_water": self.high_water,
+                "admitted": self.admitted, "dropped": self.dropped, "shed": self.shed}
@@ -1,9 +1,69 @@
 # app/pipe.py
 import asyncio
-from .stream import simulated_stream, extract_hashtags
+import itertools
+import logging
+from .stream import simulated_stream, extract_hashtags, extract_hashtags_batch
+from .overload import OverloadQueue
 
-async def start_pipeline(n_workers=4):
-    in_q, out_q = asyncio.Queue(10000), asyncio.Queue(10000)
+log = logging.getLogger(__name__)
+
+async def _drain(in_q: asyncio.Queue, batch_size: int, linger_sec: float) -> list:
+    """Espera un post y junta hasta batch_size, sin esperar más de linger_sec."""
+    posts = [await in_q.get()]
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + linger_sec
+    while len(posts) < batch_size:
+        try:
+            posts.append(in_q.get_nowait())
+            continue
+        except asyncio.QueueEmpty:
+            pass
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        # asyncio.wait + cancel (y no wait_for) para no perder un post si
+        # llega justo cuando vence el linger
+        getter = asyncio.ensure_future(in_q.get())
+        done, _ = await asyncio.wait({getter}, timeout=remaining)
+        if getter in done:
+            posts.append(getter.result())
+            continue
+        getter.cancel()
+        try:
+            posts.append(await getter)
+        except asyncio.CancelledError:
+            pass
+        break
+    return posts
+
+async def start_pipeline(n_workers=4, batch_size=1, linger_sec=0.005,
+                         executor=None, max_in_flight=None, batch_fn=extract_hashtags_batch,
+                         maxsize=10000, policy="block", latency_budget=None, sample_rate=0.5):
+    """Arma productor y workers.
+
+    Con batch_size=1 cada worker publica un item por post: {"ts", "tags"}.
+    Con batch_size>1 drena hasta batch_size posts por despertar (esperando
+    como mucho linger_sec a que se complete el lote) y publica un solo
+    objeto {"ts", "items": [{"ts", "tags"}, ...]}.
+
+    Con executor (p. ej. un ProcessPoolExecutor) el trabajo de CPU sale del
+    event loop: un despachador arma lotes y llama a batch_fn(textos) con
+    run_in_executor, con a lo sumo max_in_flight lotes en vuelo (default:
+    2 * n_workers), y un emisor publica los resultados en orden con su
+    número de secuencia: {"seq", "ts", "items"}. batch_fn debe ser
+    picklable (función de módulo) si el executor es de procesos. Si
+    batch_fn lanza una excepción el lote se registra en el log y se
+    descarta (su seq queda sin publicar); el pipeline sigue.
+
+    in_q y out_q son OverloadQueue de maxsize items con la política de
+    sobrecarga policy (block, drop-oldest, drop-newest, sample) y, si se
+    da, latency_budget en segundos desde el "ts" del post; ver
+    app/overload.py. Su telemetry() da descartes (en posts, también en
+    out_q con lotes) y high-water marks.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size debe ser >= 1")
+    in_q, out_q = (OverloadQueue(maxsize, policy, latency_budget, sample_rate) for _ in range(2))
 
     async def producer():
         async for post in simulated_stream():
@@ -16,5 +76,58 @@ async def start_pipeline(n_workers=4):
             await out_q.put({"ts": post["ts"], "tags": tags})
             in_q.task_done()
 
-    workers = [asyncio.create_task(worker()) for _ in range(n_workers)]
+    async def batch_worker():
+        while True:
+            posts = await _drain(in_q, batch_size, linger_sec)
+            tags = extract_hashtags_batch([p["text"] for p in posts])
+            items = [{"ts": p["ts"], "tags": t} for p, t in zip(posts, tags)]
+            await out_q.put({"ts": posts[0]["ts"], "items": items})
+            for _ in posts:
+                in_q.task_done()
+
+    if executor is not None:
+        workers = _start_offload(in_q, out_q, executor, batch_fn, batch_size, linger_sec,
+                                 max_in_flight or 2 * n_workers)
+        return producer, workers, in_q, out_q
+
+    loop_fn = worker if batch_size == 1 else batch_worker
+    workers = [asyncio.create_task(loop_fn()) for _ in range(n_workers)]
     return producer, workers, in_q, out_q
+
+def _start_offload(in_q, out_q, executor, batch_fn, batch_size, linger_sec, max_in_flight):
+    """Despachador + emisor para procesar lotes en un executor, en orden."""
+    if max_in_flight < 1:
+        raise ValueError("max_in_flight debe ser >= 1")
+    slots = asyncio.Semaphore(max_in_flight)
+    pending = asyncio.Queue()  # (seq, posts, future) en orden de envío
+
+    async def dispatcher():
+        loop = asyncio.get_running_loop()
+        for seq in itertools.count():
+            # el semáforo se toma antes de leer in_q: si el pool está
+            # saturado, la cola de entrada absorbe la presión
+            await slots.acquire()
+            posts = await _drain(in_q, batch_size, linger_sec)
+            fut = loop.run_in_executor(executor, batch_fn, [p["text"] for p in posts])
+            pending.put_nowait((seq, posts, fut))
+
+    async def emitter():
+        while True:
+            seq, posts, fut = await pending.get()
+            try:
+                tags = await fut
+            except Exception:
+                # un lote que falla no puede matar al emisor: sin él nadie
+                # libera slots y el despachador se queda bloqueado
+                log.exception("batch_fn falló en el lote %d (%d posts); se descarta", seq, len(posts))
+                for _ in posts:
+                    in_q.task_done()
+                continue
+            finally:
+                slots.release()
+            items = [{"ts": p["ts"], "tags": t} for p, t in zip(posts, tags)]
+            await out_q.put({"seq": seq, "ts": posts[0]["ts"], "items": items})
+            for _ in posts:
+                in_q.task_done()
+
+    return [asyncio.create_task(dispatcher()), asyncio.create_task(emitter())]
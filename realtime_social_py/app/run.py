@@ -5,23 +5,37 @@ from .windows import tumbling
 from .trends import TrendTopK
 from .sentiment import score_text
 import time
+from concurrent.futures import ProcessPoolExecutor
 
-async def main():
-    producer, workers, in_q, out_q = await start_pipeline()
+async def main(batch_size=1, linger_sec=0.005, processes=0, policy="block", latency_budget=None):
+    # por defecto: colas acotadas que bloquean, sin descartes. Lotes
+    # (batch_size > 1), pool de procesos (processes > 0) y descartes
+    # (policy drop-oldest/drop-newest/sample, latency_budget) son opt-in.
+    executor = ProcessPoolExecutor(processes) if processes else None
+    producer, workers, in_q, out_q = await start_pipeline(batch_size=batch_size, linger_sec=linger_sec,
+                                                          executor=executor, policy=policy,
+                                                          latency_budget=latency_budget)
     trends = TrendTopK(k=5, ttl_sec=60)
     asyncio.create_task(producer())
 
-    async for batch in tumbling(out_q, window_sec=5):
-        # actualizar tendencias + sentimiento
-        scores = []
-        for it in batch["items"]:
-            trends.ingest(it["tags"], it["ts"])
-            if it["tags"]:
-                scores.append(score_text(" ".join(it["tags"])))
-        trends.sweep(time.time())
-        top = trends.topk()
-        avg = round(stats.fmean(scores), 3) if scores else 0.0
-        print(f"[{int(batch['start'])}-{int(batch['end'])}] top={top} sentiment_avg={avg}")
+    try:
+        async for batch in tumbling(out_q, window_sec=5):
+            # actualizar tendencias + sentimiento
+            scores = []
+            for it in batch["items"]:
+                trends.ingest(it["tags"], it["ts"])
+                if it["tags"]:
+                    scores.append(score_text(" ".join(it["tags"])))
+            trends.sweep(time.time())
+            top = trends.topk()
+            avg = round(stats.fmean(scores), 3) if scores else 0.0
+            print(f"[{int(batch['start'])}-{int(batch['end'])}] top={top} sentiment_avg={avg}")
+            print(f"  in_q={in_q.telemetry()} out_q={out_q.telemetry()}")
+    finally:
+        for w in workers:
+            w.cancel()
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -12,3 +12,8 @@ async def simulated_stream(rate_hz: float = 20.0):
 
 def extract_hashtags(text: str) -> list[str]:
     return [h.lower() for h in HASHTAG_RE.findall(text)]
+
+def extract_hashtags_batch(texts: list[str]) -> list[list[str]]:
+    """Como extract_hashtags, pero para un lote (lookups resueltos una vez)."""
+    findall = HASHTAG_RE.findall
+    return [[h.lower() for h in findall(t)] for t in texts]
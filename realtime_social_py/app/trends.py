@@ -1,25 +1,181 @@
 # app/trends.py
 from collections import Counter
-import heapq, time
+import math
+
+class _Node:
+    __slots__ = ("count", "tags", "up", "down")
+
+    def __init__(self, count):
+        self.count = count
+        self.tags = {}      # dict como conjunto ordenado: empates por orden de llegada
+        self.up = None      # nodo con más ocurrencias
+        self.down = None    # nodo con menos ocurrencias
+
+class _FrequencyList:
+    """Lista doblemente enlazada de conteos distintos, de mayor a menor.
+
+    Cada nodo guarda los tags que tienen exactamente ese conteo; where indexa
+    tag -> nodo. Sumar 1 mueve el tag al nodo vecino (O(1)); restar c solo
+    recorre los conteos distintos intermedios; top(k) lee desde head en O(k).
+    """
+
+    def __init__(self):
+        self.head = None    # conteo más alto
+        self.tail = None    # conteo más bajo
+        self.where = {}
+
+    def _link_above(self, node, count):
+        new = _Node(count)
+        new.down, new.up = node, node.up
+        if node.up is None:
+            self.head = new
+        else:
+            node.up.down = new
+        node.up = new
+        return new
+
+    def _link_below(self, node, count):
+        new = _Node(count)
+        new.up, new.down = node, node.down
+        if node.down is None:
+            self.tail = new
+        else:
+            node.down.up = new
+        node.down = new
+        return new
+
+    def _unlink(self, node):
+        if node.up is None:
+            self.head = node.down
+        else:
+            node.up.down = node.down
+        if node.down is None:
+            self.tail = node.up
+        else:
+            node.down.up = node.up
+
+    def _move(self, tag, old, new):
+        del old.tags[tag]
+        if not old.tags:
+            self._unlink(old)
+        new.tags[tag] = None
+        self.where[tag] = new
+
+    def incr(self, tag):
+        node = self.where.get(tag)
+        if node is None:
+            tail = self.tail
+            if tail is None:
+                tail = self.head = self.tail = _Node(1)
+            elif tail.count != 1:
+                tail = self._link_below(tail, 1)
+            tail.tags[tag] = None
+            self.where[tag] = tail
+            return
+        up = node.up
+        if up is None or up.count != node.count + 1:
+            up = self._link_above(node, node.count + 1)
+        self._move(tag, node, up)
+
+    def decr(self, tag, c):
+        node = self.where[tag]
+        left = node.count - c
+        if left <= 0:
+            del node.tags[tag]
+            if not node.tags:
+                self._unlink(node)
+            del self.where[tag]
+            return
+        below = node
+        while below.down is not None and below.down.count >= left:
+            below = below.down
+        if below.count != left:
+            below = self._link_below(below, left)
+        self._move(tag, node, below)
+
+    def top(self, k):
+        out, node = [], self.head
+        while node is not None and len(out) < k:
+            for t in node.tags:
+                out.append((t, node.count))
+                if len(out) == k:
+                    break
+            node = node.down
+        return out
 
 class TrendTopK:
-    def __init__(self, k=10, ttl_sec=60):
+    """Top-K de hashtags en una ventana deslizante de ttl_sec segundos.
+
+    Las ocurrencias se cuentan en buckets de bucket_sec segundos guardados en
+    un anillo: la memoria es O(tags distintos × buckets), no una entrada por
+    ocurrencia, y sweep descarta buckets enteros. Un post con ts cuenta como
+    si fuera del inicio de su bucket (floor(ts / bucket_sec) * bucket_sec)
+    y vence cuando ese instante + ttl_sec <= now; con bucket_sec=1 y ts
+    enteros coincide exactamente con contar cada ocurrencia por separado.
+
+    El top-K se mantiene en una lista de frecuencias que ingest y sweep
+    actualizan en el momento, así topk() cuesta O(k) y no O(tags distintos).
+    """
+
+    def __init__(self, k=10, ttl_sec=60, bucket_sec=1.0):
+        if bucket_sec <= 0:
+            raise ValueError("bucket_sec debe ser > 0")
         self.k = k
         self.ttl = ttl_sec
+        self.bucket_sec = bucket_sec
         self.acc = Counter()
-        self.decay = []  # [(expire_ts, tag, count)]
+        self._freq = _FrequencyList()
+        # un slot más que los buckets vivos: el anillo nunca pisa uno vigente
+        n = math.ceil(ttl_sec / bucket_sec) + 1
+        self._ids = [None] * n          # índice de bucket que ocupa cada slot
+        self._buckets = [Counter() for _ in range(n)]
+        self._last_idx, self._last_bucket = None, None
+
+    def _drop(self, slot):
+        acc, decr = self.acc, self._freq.decr
+        for t, c in self._buckets[slot].items():
+            decr(t, c)
+            left = acc[t] - c
+            if left > 0:
+                acc[t] = left
+            else:
+                del acc[t]
+        self._buckets[slot].clear()
+        self._ids[slot] = None
+
+    def _bucket_for(self, idx):
+        slot = idx % len(self._ids)
+        current = self._ids[slot]
+        if current != idx:
+            if current is not None and current > idx:
+                return None  # más viejo que todo el anillo: ya vencido
+            if current is not None:
+                self._drop(slot)
+            self._ids[slot] = idx
+        return self._buckets[slot]
 
     def ingest(self, tags: list[str], ts: float):
+        if not tags:
+            return
+        idx = math.floor(ts / self.bucket_sec)
+        if idx == self._last_idx and self._ids[idx % len(self._ids)] == idx:
+            bucket = self._last_bucket  # caso común: mismo bucket que el post anterior
+        else:
+            bucket = self._bucket_for(idx)
+            if bucket is None:
+                return
+            self._last_idx, self._last_bucket = idx, bucket
+        acc, incr = self.acc, self._freq.incr
         for t in tags:
-            self.acc[t] += 1
-            heapq.heappush(self.decay, (ts + self.ttl, t, 1))
+            bucket[t] += 1
+            acc[t] += 1
+            incr(t)
 
     def sweep(self, now: float):
-        while self.decay and self.decay[0][0] <= now:
-            _, t, c = heapq.heappop(self.decay)
-            self.acc[t] -= c
-            if self.acc[t] <= 0:
-                del self.acc[t]
+        # O(buckets): se descartan buckets enteros, no ocurrencias
+        for slot, idx in enumerate(self._ids):
+            if idx is not None and idx * self.bucket_sec + self.ttl <= now:
+                self._drop(slot)
 
     def topk(self):
-        return heapq.nlargest(self.k, self.acc.items(), key=lambda x: x[1])
+        return self._freq.top(self.k)
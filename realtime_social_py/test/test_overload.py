@@ -0,0 +1,90 @@
+# tests/test_overload.py
+import asyncio
+import pytest
+from app.overload import OverloadQueue
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+    def __call__(self):
+        return self.now
+
+def _post(ts):
+    return {"ts": ts, "text": "x"}
+
+def test_drop_newest_and_oldest_when_full():
+    q = OverloadQueue(maxsize=2, policy="drop-newest")
+    assert [q.offer(_post(t)) for t in (1, 2, 3)] == [True, True, False]
+    assert [q.get_nowait()["ts"] for _ in range(2)] == [1, 2]
+    assert q.telemetry() == {"policy": "drop-newest", "depth": 0, "high_water": 2,
+                             "admitted": 2, "dropped": 1, "shed": 0}
+
+    q = OverloadQueue(maxsize=2, policy="drop-oldest")
+    for t in (1, 2, 3):
+        assert q.offer(_post(t))
+    assert [q.get_nowait()["ts"] for _ in range(2)] == [2, 3]
+    assert (q.dropped, q.shed, q.high_water) == (1, 0, 2)
+
+def test_latency_budget_sheds_before_full():
+    clock = Clock()
+    q = OverloadQueue(maxsize=100, policy="drop-oldest", latency_budget=1.0, clock=clock)
+    q.offer(_post(99.5))
+    q.offer(_post(99.8))
+    clock.now = 101.0  # ambos vencidos
+    q.offer(_post(100.9))
+    assert [q.get_nowait()["ts"] for _ in range(q.qsize())] == [100.9]
+    assert (q.shed, q.dropped) == (2, 0)
+
+    # drop-newest también descarta la cabeza vencida, no el post fresco
+    q = OverloadQueue(maxsize=100, policy="drop-newest", latency_budget=1.0, clock=clock)
+    q.offer(_post(99.0))
+    assert q.offer(_post(101.0)) and q.shed == 1
+    assert [q.get_nowait()["ts"] for _ in range(q.qsize())] == [101.0]
+
+def test_counters_are_in_posts_for_batches():
+    def batch(ts, n):
+        return {"ts": ts, "items": [_post(ts)] * n}
+
+    q = OverloadQueue(maxsize=2, policy="drop-newest")
+    assert [q.offer(batch(t, 32)) for t in (1, 2, 3)] == [True, True, False]
+    assert (q.admitted, q.dropped, q.high_water) == (64, 32, 2)
+
+    clock = Clock()
+    q = OverloadQueue(maxsize=2, policy="drop-oldest", latency_budget=1.0, clock=clock)
+    q.offer(batch(98.0, 5))
+    q.offer(batch(100.0, 7))
+    q.offer(batch(100.0, 3))  # la cabeza vencida sale por presupuesto
+    q.offer(batch(100.0, 4))  # llena: sale el lote de 7
+    assert (q.admitted, q.shed, q.dropped, q.qsize()) == (19, 5, 7, 2)
+
+def test_sample_admits_fraction_while_lagging():
+    clock = Clock()
+    q = OverloadQueue(maxsize=100, policy="sample", latency_budget=1.0, sample_rate=0.25, clock=clock)
+    q.offer(_post(98.0))  # cabeza vencida: la cola está atrasada
+    admitted = [q.offer(_post(100.0)) for _ in range(8)]
+    assert admitted.count(True) == 2 and q.shed == 6
+
+def test_block_policy_waits_and_join_counts_evictions():
+    async def run():
+        q = OverloadQueue(maxsize=1, policy="block")
+        await q.put(_post(1))
+        waiter = asyncio.create_task(q.put(_post(2)))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        q.get_nowait(); q.task_done()
+        await asyncio.wait_for(waiter, 1.0)
+
+        d = OverloadQueue(maxsize=1, policy="drop-oldest")
+        d.offer(_post(1)); d.offer(_post(2))  # el 1 se descarta sin consumidor
+        d.get_nowait(); d.task_done()
+        await asyncio.wait_for(d.join(), 1.0)
+
+    asyncio.run(run())
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        OverloadQueue(policy="lifo")
+
+def test_block_rejects_latency_budget():
+    with pytest.raises(ValueError):
+        OverloadQueue(policy="block", latency_budget=1.0)
@@ -0,0 +1,138 @@
+# tests/test_pipe.py
+import asyncio
+from app.pipe import start_pipeline
+
+def _posts(n):
+    return [{"ts": float(i), "text": f"Post {i} #AI #p{i % 2}"} for i in range(n)]
+
+async def _collect(out_q, n_items, timeout=1.0):
+    batches, seen = [], 0
+    while seen < n_items:
+        b = await asyncio.wait_for(out_q.get(), timeout)
+        batches.append(b)
+        seen += len(b["items"]) if "items" in b else 1
+    return batches
+
+def test_batch_worker_drains_up_to_batch_size():
+    async def run():
+        _, workers, in_q, out_q = await start_pipeline(n_workers=1, batch_size=4, linger_sec=0.05)
+        for p in _posts(10):
+            in_q.put_nowait(p)
+        batches = await _collect(out_q, 10)
+        await asyncio.wait_for(in_q.join(), 1.0)
+        for w in workers:
+            w.cancel()
+        return batches
+
+    batches = asyncio.run(run())
+    assert [len(b["items"]) for b in batches] == [4, 4, 2]
+    items = [it for b in batches for it in b["items"]]
+    assert [it["ts"] for it in items] == [float(i) for i in range(10)]
+    assert items[3]["tags"] == ["#ai", "#p1"]
+    assert all(b["ts"] == b["items"][0]["ts"] for b in batches)
+
+def test_batch_worker_linger_bounds_latency():
+    async def run():
+        _, workers, in_q, out_q = await start_pipeline(n_workers=1, batch_size=100, linger_sec=0.02)
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        in_q.put_nowait(_posts(1)[0])
+        batch = await asyncio.wait_for(out_q.get(), 1.0)
+        elapsed = loop.time() - t0
+        for w in workers:
+            w.cancel()
+        return batch, elapsed
+
+    batch, elapsed = asyncio.run(run())
+    assert len(batch["items"]) == 1
+    assert 0.015 <= elapsed < 0.5
+
+def test_single_item_mode_unchanged():
+    async def run():
+        _, workers, in_q, out_q = await start_pipeline(n_workers=2)
+        for p in _posts(3):
+            in_q.put_nowait(p)
+        out = await _collect(out_q, 3)
+        for w in workers:
+            w.cancel()
+        return out
+
+    out = asyncio.run(run())
+    assert sorted(o["ts"] for o in out) == [0.0, 1.0, 2.0]
+    assert all("tags" in o and "items" not in o for o in out)
+
+def test_executor_offload_keeps_order():
+    from concurrent.futures import ProcessPoolExecutor
+
+    async def run(executor):
+        _, workers, in_q, out_q = await start_pipeline(n_workers=2, batch_size=3, linger_sec=0.01,
+                                                        executor=executor, max_in_flight=2)
+        for p in _posts(10):
+            await in_q.put(p)
+        batches = await _collect(out_q, 10, timeout=10.0)
+        await asyncio.wait_for(in_q.join(), 1.0)
+        for w in workers:
+            w.cancel()
+        return batches
+
+    with ProcessPoolExecutor(2) as executor:
+        batches = asyncio.run(run(executor))
+    assert [b["seq"] for b in batches] == list(range(len(batches)))
+    items = [it for b in batches for it in b["items"]]
+    assert [it["ts"] for it in items] == [float(i) for i in range(10)]
+    assert items[4]["tags"] == ["#ai", "#p0"]
+
+def test_executor_offload_bounds_in_flight():
+    import threading, time
+    from concurrent.futures import ThreadPoolExecutor
+    lock, state = threading.Lock(), {"now": 0, "max": 0}
+
+    def slow_batch(texts):
+        with lock:
+            state["now"] += 1
+            state["max"] = max(state["max"], state["now"])
+        time.sleep(0.01)
+        with lock:
+            state["now"] -= 1
+        return [[] for _ in texts]
+
+    async def run(executor):
+        _, workers, in_q, out_q = await start_pipeline(batch_size=1, executor=executor,
+                                                        max_in_flight=2, batch_fn=slow_batch)
+        for p in _posts(12):
+            in_q.put_nowait(p)
+        batches = await _collect(out_q, 12, timeout=5.0)
+        for w in workers:
+            w.cancel()
+        return batches
+
+    with ThreadPoolExecutor(8) as executor:
+        batches = asyncio.run(run(executor))
+    assert [b["seq"] for b in batches] == list(range(12))
+    assert state["max"] == 2
+
+def test_executor_offload_survives_failing_batch(caplog):
+    from concurrent.futures import ThreadPoolExecutor
+
+    def flaky_batch(texts):
+        if any("boom" in t for t in texts):
+            raise ValueError("boom")
+        return [["#ok"] for _ in texts]
+
+    async def run(executor):
+        _, workers, in_q, out_q = await start_pipeline(batch_size=1, executor=executor,
+                                                        max_in_flight=1, batch_fn=flaky_batch)
+        posts = _posts(5)
+        posts[1]["text"] = posts[3]["text"] = "boom"
+        for p in posts:
+            in_q.put_nowait(p)
+        batches = await _collect(out_q, 3, timeout=5.0)
+        await asyncio.wait_for(in_q.join(), 1.0)
+        for w in workers:
+            w.cancel()
+        return batches
+
+    with ThreadPoolExecutor(2) as executor:
+        batches = asyncio.run(run(executor))
+    assert [b["seq"] for b in batches] == [0, 2, 4]
+    assert sum("batch_fn falló" in r.message for r in caplog.records) == 2
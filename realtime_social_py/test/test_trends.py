@@ -0,0 +1,92 @@
+# tests/test_trends.py
+import heapq, math, random
+from collections import Counter
+from app.trends import TrendTopK
+
+class HeapTopK:
+    """Versión de referencia: una entrada de heap por ocurrencia."""
+    def __init__(self, k, ttl_sec):
+        self.k, self.ttl, self.acc, self.decay = k, ttl_sec, Counter(), []
+    def ingest(self, tags, ts):
+        for t in tags:
+            self.acc[t] += 1
+            heapq.heappush(self.decay, (ts + self.ttl, t, 1))
+    def sweep(self, now):
+        while self.decay and self.decay[0][0] <= now:
+            _, t, c = heapq.heappop(self.decay)
+            self.acc[t] -= c
+            if self.acc[t] <= 0:
+                del self.acc[t]
+    def topk(self):
+        return heapq.nlargest(self.k, self.acc.items(), key=lambda x: x[1])
+
+def _stream(n, seed=1):
+    rnd = random.Random(seed)
+    tags = [f"#t{i}" for i in range(30)]
+    ts = 0.0
+    for _ in range(n):
+        ts += rnd.random() * 0.2
+        yield rnd.sample(tags, rnd.randint(0, 3)), ts
+
+def test_matches_heap_at_bucket_granularity():
+    for bucket_sec in (1.0, 0.5, 2.5):
+        ref, ring = HeapTopK(5, 10), TrendTopK(k=5, ttl_sec=10, bucket_sec=bucket_sec)
+        for i, (tags, ts) in enumerate(_stream(3000)):
+            ring.ingest(tags, ts)
+            ref.ingest(tags, math.floor(ts / bucket_sec) * bucket_sec)
+            if i % 37 == 0:
+                ring.sweep(ts)
+                ref.sweep(ts)
+                assert ring.acc == ref.acc
+                # entre empates el orden depende del orden de inserción en acc
+                assert [c for _, c in ring.topk()] == [c for _, c in ref.topk()]
+
+def test_integer_ts_identical_to_heap():
+    ref, ring = HeapTopK(3, 5), TrendTopK(k=3, ttl_sec=5)
+    for ts in range(40):
+        tags = ["#a"] * (ts % 3) + ["#b"] * (ts % 5 == 0) + ["#c"]
+        ring.ingest(tags, ts)
+        ref.ingest(tags, ts)
+        ring.sweep(ts + 0.5)
+        ref.sweep(ts + 0.5)
+        assert ring.acc == ref.acc
+        # entre empates el orden es el de llegada a ese conteo, no el de acc
+        assert [c for _, c in ring.topk()] == [c for _, c in ref.topk()]
+        assert all(ring.acc[t] == c for t, c in ring.topk())
+
+def test_memory_bounded_by_buckets():
+    ring = TrendTopK(k=3, ttl_sec=10, bucket_sec=1.0)
+    for tags, ts in _stream(20000):
+        ring.ingest(tags, ts)
+    assert len(ring._ids) == 11
+    assert sum(len(b) for b in ring._buckets) <= 11 * 30
+    ring.sweep(10_000.0)
+    assert not ring.acc and all(i is None for i in ring._ids)
+
+def test_late_post_older_than_ring_is_ignored():
+    ring = TrendTopK(k=3, ttl_sec=3, bucket_sec=1.0)
+    ring.ingest(["#new"], 100.0)
+    ring.ingest(["#old"], 96.0)  # mismo slot que 100, ya vencido
+    assert dict(ring.acc) == {"#new": 1}
+
+def test_incremental_topk_matches_full_scan():
+    ring = TrendTopK(k=7, ttl_sec=4, bucket_sec=0.5)
+    for i, (tags, ts) in enumerate(_stream(4000, seed=3)):
+        ring.ingest(tags, ts)
+        if i % 11 == 0:
+            ring.sweep(ts)
+        if i % 5 == 0:
+            top = ring.topk()
+            expected = heapq.nlargest(7, ring.acc.items(), key=lambda x: x[1])
+            assert [c for _, c in top] == [c for _, c in expected]
+            assert all(ring.acc[t] == c for t, c in top)
+    # invariantes de la lista: conteos estrictamente decrecientes y sin nodos vacíos
+    node, counts = ring._freq.head, []
+    while node is not None:
+        assert node.tags and all(ring._freq.where[t] is node for t in node.tags)
+        counts.append(node.count)
+        node = node.down
+    assert counts == sorted(set(counts), reverse=True)
+    assert sum(len(ring._freq.where[t].tags) > 0 for t in ring.acc) == len(ring.acc)
+    ring.sweep(1e9)
+    assert ring.topk() == [] and ring._freq.head is None and not ring._freq.where